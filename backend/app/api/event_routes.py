@@ -1,39 +1,70 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from app.db.database import db_dependency
 from app.db.models import models
+from app.core.cache import response_cache
+from app.core.utils.flag_utils import flag_image_url
 from app.schemas.event_schemas import Event, MainEvent
 from datetime import datetime
-import pycountry
+from sqlalchemy import String, cast, func
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.orm import Session, aliased
 
 router = APIRouter()
 
-def _get_flag_image_url(location: str) -> str:
-    """
-    Finds a flag image from the location string using flagcdn.com.
-    """
-    SPECIAL_CASES = {
-        "England": "gb-eng",
-        "Scotland": "gb-sct",
-        "Wales": "gb-wls",
-        "Northern Ireland": "gb-nir",
-        "Russia": "ru",
-    }
-
-    country_name = location.split(",")[-1].strip()
-    country = pycountry.countries.get(name=country_name)
-    country_code = country.alpha_2 if country else ""
+def _events_window_etag(db: Session, upcoming: bool, offset: int, limit: int):
+    """Aggregate the ids and max ``last_updated_at`` of one page of upcoming or past events."""
+
+    query = db.query(models.Event.id, models.Event.last_updated_at)
+    if upcoming:
+        query = query.filter(models.Event.date >= datetime.now()).order_by(models.Event.date)
+    else:
+        query = query.filter(models.Event.date < datetime.now()).order_by(models.Event.date.desc())
+    window = query.offset(offset).limit(limit).subquery()
+
+    return tuple(
+        db.query(
+            func.max(window.c.last_updated_at),
+            func.string_agg(cast(window.c.id, String), aggregate_order_by(",", window.c.id)),
+        ).one()
+    )
 
-    if country_name in SPECIAL_CASES:
-        country_code = SPECIAL_CASES[country_name]
+def _upcoming_events_etag(db: Session, offset: int = 0, limit: int = 10):
+    return _events_window_etag(db, True, offset, limit)
 
-    if not country_code:
-        return ""
+def _past_events_etag(db: Session, offset: int = 0, limit: int = 10):
+    return _events_window_etag(db, False, offset, limit)
 
-    return f"https://flagcdn.com/w320/{country_code.lower()}.png"
+def _main_events_etag(db: Session, limit: int = 3):
+    """Aggregate the max ``last_updated_at`` of the upcoming events, their fights and fighters."""
 
+    window = (
+        db.query(models.Event.id, models.Event.last_updated_at)
+        .filter(models.Event.date >= datetime.now())
+        .order_by(models.Event.date)
+        .limit(limit)
+        .subquery()
+    )
+    fighter_1 = aliased(models.Fighter)
+    fighter_2 = aliased(models.Fighter)
+
+    return tuple(
+        db.query(
+            func.max(window.c.last_updated_at),
+            func.max(models.Fight.last_updated_at),
+            func.max(fighter_1.last_updated_at),
+            func.max(fighter_2.last_updated_at),
+            func.string_agg(cast(window.c.id, String), aggregate_order_by(",", window.c.id)),
+        )
+        .select_from(window)
+        .outerjoin(models.Fight, models.Fight.event_id == window.c.id)
+        .outerjoin(fighter_1, models.Fight.fighter_1_id == fighter_1.id)
+        .outerjoin(fighter_2, models.Fight.fighter_2_id == fighter_2.id)
+        .one()
+    )
 
 @router.get("/upcoming")
-def get_upcoming_events(db: db_dependency, offset: int = 0, limit: int = 10) -> list[Event]:
+@response_cache.cached("events", ttl=300, etag=_upcoming_events_etag)
+def get_upcoming_events(request: Request, db: db_dependency, offset: int = 0, limit: int = 10) -> list[Event]:
     """Return a paginated list of upcoming events from the database."""
 
     if limit <= 0:
@@ -56,12 +87,13 @@ def get_upcoming_events(db: db_dependency, offset: int = 0, limit: int = 10) ->
         title=event.title,
         date=event.date,
         location=event.location,
-        location_flag=_get_flag_image_url(event.location),
+        location_flag=flag_image_url(event.flag_code),
         organizer=event.organizer,
     ) for event in db_events]
 
 @router.get("/past")
-def get_past_events(db: db_dependency, offset: int = 0, limit: int = 10) -> list[Event]:
+@response_cache.cached("events", ttl=300, etag=_past_events_etag)
+def get_past_events(request: Request, db: db_dependency, offset: int = 0, limit: int = 10) -> list[Event]:
     """Return a paginated list of past events from the database."""
 
     if limit <= 0:
@@ -84,12 +116,13 @@ def get_past_events(db: db_dependency, offset: int = 0, limit: int = 10) -> list
         title=event.title,
         date=event.date,
         location=event.location,
-        location_flag=_get_flag_image_url(event.location),
+        location_flag=flag_image_url(event.flag_code),
         organizer=event.organizer,
     ) for event in db_events]
 
 @router.get("/main-events")
-def get_main_events(db: db_dependency, limit: int = 3) -> list[MainEvent]:
+@response_cache.cached("events", "events:main", ttl=300, etag=_main_events_etag)
+def get_main_events(request: Request, db: db_dependency, limit: int = 3) -> list[MainEvent]:
     """Return the main events for the home page."""
 
     db_events = (
@@ -1,20 +1,75 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from app.db.database import db_dependency
 from app.db.models import models
+from app.core.cache import response_cache
 from app.schemas.fight_schemas import Fight, FightResult, ResultType
 from datetime import datetime
 from zoneinfo import ZoneInfo
-from app.core.utils.string_utils import get_flag_image_url
+from app.core.utils.flag_utils import flag_image_url
+from sqlalchemy import func
+from sqlalchemy.orm import Session, aliased
 
 router = APIRouter()
 
 
+def _fight_with_fighters_query(db: Session):
+    """Return a query yielding ``(Fight, fighter_1, fighter_2)`` rows in one round trip."""
+
+    fighter_1 = aliased(models.Fighter)
+    fighter_2 = aliased(models.Fighter)
+
+    return (
+        db.query(models.Fight, fighter_1, fighter_2)
+        .join(fighter_1, models.Fight.fighter_1_id == fighter_1.id)
+        .join(fighter_2, models.Fight.fighter_2_id == fighter_2.id)
+    )
+
+def _to_fight_schema(fight: models.Fight, fighter_1: models.Fighter, fighter_2: models.Fighter) -> Fight:
+    return Fight(
+        id=fight.id,
+        fighter_1_id=fighter_1.id,
+        fighter_2_id=fighter_2.id,
+        fighter_1_name=fighter_1.name,
+        fighter_2_name=fighter_2.name,
+        fighter_1_image=fighter_1.image_url,
+        fighter_2_image=fighter_2.image_url,
+        fighter_1_ranking=fighter_1.ranking,
+        fighter_2_ranking=fighter_2.ranking,
+        fighter_1_flag=flag_image_url(fighter_1.flag_code),
+        fighter_2_flag=flag_image_url(fighter_2.flag_code),
+        weight_class=fight.weight_class,
+        winner=fight.winner,
+        method=fight.method,
+        round=fight.round,
+        time=fight.time
+    )
+
+def _fight_card_etag(db: Session, event_id: int):
+    """Aggregate the max ``last_updated_at`` of an event's fights and their fighters."""
+
+    fighter_1 = aliased(models.Fighter)
+    fighter_2 = aliased(models.Fighter)
+
+    return tuple(
+        db.query(
+            func.count(models.Fight.id),
+            func.max(models.Fight.last_updated_at),
+            func.max(fighter_1.last_updated_at),
+            func.max(fighter_2.last_updated_at),
+        )
+        .join(fighter_1, models.Fight.fighter_1_id == fighter_1.id)
+        .join(fighter_2, models.Fight.fighter_2_id == fighter_2.id)
+        .filter(models.Fight.event_id == event_id)
+        .one()
+    )
+
 @router.get("/event/{event_id}")
-def get_fights_by_event(event_id: int, db: db_dependency) -> list[Fight]:
+@response_cache.cached("fights", "fights:event:{event_id}", etag=_fight_card_etag)
+def get_fights_by_event(event_id: int, request: Request, db: db_dependency) -> list[Fight]:
     """Return a list of fights for a given event."""
 
     db_fights = (
-        db.query(models.Fight)
+        _fight_with_fighters_query(db)
         .filter(models.Fight.event_id == event_id)
         .order_by(models.Fight.match_number)
         .all()
@@ -22,98 +77,24 @@ def get_fights_by_event(event_id: int, db: db_dependency) -> list[Fight]:
 
     if not db_fights:
         raise HTTPException(status_code=404, detail="No fights found for this event")
-    
-    fights = []
-
-    for fight in db_fights:
-        fight_fighter_1 = (
-            db.query(models.Fighter)
-            .filter(models.Fighter.id == fight.fighter_1_id)
-            .first()
-        )
 
-        if not fight_fighter_1:
-            raise HTTPException(status_code=404, detail="Fighter 1 not found")
-        
-        fight_fighter_2 = (
-            db.query(models.Fighter)
-            .filter(models.Fighter.id == fight.fighter_2_id)
-            .first()
-        )
-        
-        if not fight_fighter_2:
-            raise HTTPException(status_code=404, detail="Fighter 2 not found")
-        
-        fights.append(Fight(
-            id=fight.id,
-            fighter_1_id=fight_fighter_1.id,
-            fighter_2_id=fight_fighter_2.id,
-            fighter_1_name=fight_fighter_1.name,
-            fighter_2_name=fight_fighter_2.name,
-            fighter_1_image=fight_fighter_1.image_url,
-            fighter_2_image=fight_fighter_2.image_url,
-            fighter_1_ranking=fight_fighter_1.ranking,
-            fighter_2_ranking=fight_fighter_2.ranking,
-            fighter_1_flag=get_flag_image_url(fight_fighter_1.country),
-            fighter_2_flag=get_flag_image_url(fight_fighter_2.country),
-            weight_class=fight.weight_class,
-            winner=fight.winner,
-            method=fight.method,
-            round=fight.round,
-            time=fight.time
-        ))
-
-    return fights
+    return [_to_fight_schema(fight, fighter_1, fighter_2) for fight, fighter_1, fighter_2 in db_fights]
 
 @router.get("/fight/{fight_id}")
 def get_fight_by_id(fight_id: int, db: db_dependency) -> Fight:
     """Return a fight by its ID."""
 
     db_fight = (
-        db.query(models.Fight)
+        _fight_with_fighters_query(db)
         .filter(models.Fight.id == fight_id)
         .first()
     )
 
     if not db_fight:
         raise HTTPException(status_code=404, detail="Fight not found")
-    
-    fight_fighter_1 = (
-        db.query(models.Fighter)
-        .filter(models.Fighter.id == db_fight.fighter_1_id)
-        .first()
-    )
-
-    if not fight_fighter_1:
-        raise HTTPException(status_code=404, detail="Fighter 1 not found")
-    
-    fight_fighter_2 = (
-        db.query(models.Fighter)
-        .filter(models.Fighter.id == db_fight.fighter_2_id)
-        .first()
-    )
 
-    if not fight_fighter_2:
-        raise HTTPException(status_code=404, detail="Fighter 2 not found")
-    
-    return Fight(
-        id=db_fight.id,
-        fighter_1_id=fight_fighter_1.id,
-        fighter_2_id=fight_fighter_2.id,
-        fighter_1_name=fight_fighter_1.name,
-        fighter_2_name=fight_fighter_2.name,
-        fighter_1_image=fight_fighter_1.image_url,
-        fighter_2_image=fight_fighter_2.image_url,
-        fighter_1_ranking=fight_fighter_1.ranking,
-        fighter_2_ranking=fight_fighter_2.ranking,
-        fighter_1_flag=get_flag_image_url(fight_fighter_1.country),
-        fighter_2_flag=get_flag_image_url(fight_fighter_2.country),
-        weight_class=db_fight.weight_class,
-        winner=db_fight.winner,
-        method=db_fight.method,
-        round=db_fight.round,
-        time=db_fight.time
-    )
+    fight, fighter_1, fighter_2 = db_fight
+    return _to_fight_schema(fight, fighter_1, fighter_2)
 
 @router.get("/result/{fight_id}")
 def get_fight_result_by_id(fight_id: int, db: db_dependency) -> FightResult | None:
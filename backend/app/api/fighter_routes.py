@@ -1,9 +1,13 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request
 from app.db.database import db_dependency
 from app.db.models import models
-from app.schemas.fighter_schemas import Fighter, FighterSearchResponse
+from app.core.cache import response_cache
+from app.services.search.fighter_search import FighterSearch
+from app.services.search.fighter_typeahead import fighter_typeahead_index
+from sqlalchemy.orm import Session
+from app.schemas.fighter_schemas import Fighter, FighterSearchResponse, FighterSuggestion
 from app.schemas.fight_schemas import FighterFightHistory
-from app.core.utils.string_utils import get_flag_image_url
+from app.core.utils.flag_utils import flag_image_url
 router = APIRouter()
 
 @router.get("/")
@@ -34,15 +38,14 @@ def get_all_fighters(
     ]
 
 @router.get("/search")
-def search_fighters(db: db_dependency, q: str = Query(..., description="Search query")) -> FighterSearchResponse:
-    """Search fighters by name, nickname, weight class, or country"""
-    query = f"%{q.lower()}%"
-    fighters = db.query(models.Fighter).filter(
-        models.Fighter.name.ilike(query) |
-        models.Fighter.nickname.ilike(query) |
-        models.Fighter.weight_class.ilike(query) |
-        models.Fighter.country.ilike(query)
-    ).all()
+def search_fighters(
+    db: db_dependency,
+    q: str = Query(..., description="Search query"),
+    offset: int = Query(0, ge=0, description="Number of fighters to skip"),
+    limit: int = Query(20, ge=1, le=100, description="Number of fighters to return"),
+) -> FighterSearchResponse:
+    """Search fighters by name, nickname, weight class, or country, most relevant first"""
+    fighters, total = FighterSearch(db).search(q, offset, limit)
     
     fighters = [
             Fighter(
@@ -64,11 +67,36 @@ def search_fighters(db: db_dependency, q: str = Query(..., description="Search q
     
     return FighterSearchResponse(
         fighters=fighters,
-        total=len(fighters)
+        total=total
+    )
+
+@router.get("/autocomplete")
+def autocomplete_fighters(
+    q: str = Query(..., description="Partial fighter name or nickname"),
+    limit: int = Query(10, ge=1, le=25, description="Number of suggestions to return"),
+) -> list[FighterSuggestion]:
+    """Suggest fighters for search-as-you-type from the in-memory typeahead index"""
+    return [
+        FighterSuggestion(
+            id=suggestion.id,
+            name=suggestion.name,
+            nickname=suggestion.nickname,
+            image_url=suggestion.image_url,
+        )
+        for suggestion in fighter_typeahead_index.suggest(q, limit)
+    ]
+
+def _fighter_etag(db: Session, fighter_id: int):
+    return tuple(
+        db.query(models.Fighter.id, models.Fighter.last_updated_at)
+        .filter(models.Fighter.id == fighter_id)
+        .first()
+        or ()
     )
 
 @router.get("/{fighter_id}")
-def get_fighter_by_id(fighter_id: int, db: db_dependency) -> Fighter:
+@response_cache.cached("fighters", "fighters:{fighter_id}", etag=_fighter_etag)
+def get_fighter_by_id(fighter_id: int, request: Request, db: db_dependency) -> Fighter:
     """Get a specific fighter by ID"""
     fighter = db.query(models.Fighter).filter(models.Fighter.id == fighter_id).first()
     
@@ -140,7 +168,7 @@ def get_fighter_fight_history(fighter_id: int, db: db_dependency) -> list[Fighte
             opponent_name=opponent.name,
             opponent_image=opponent.image_url,
             opponent_country=opponent.country,
-            opponent_flag=get_flag_image_url(opponent.country),
+            opponent_flag=flag_image_url(opponent.flag_code),
             weight_class=fight.weight_class,
             result=result,
             method=fight.method,
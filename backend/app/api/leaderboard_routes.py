@@ -0,0 +1,59 @@
+from fastapi import APIRouter, HTTPException, Query
+from app.db.database import db_dependency
+from app.db.models import models
+from app.schemas.leaderboard_schemas import LeaderboardEntry
+from app.services.leaderboard.backends import GLOBAL_SCOPE, event_scope, get_leaderboard
+
+router = APIRouter()
+
+@router.get("")
+def get_leaderboard_standings(
+    db: db_dependency,
+    event_id: int | None = Query(None, description="Event to rank; omit for the all-time leaderboard"),
+    offset: int = Query(0, ge=0, description="Number of entries to skip"),
+    limit: int = Query(10, ge=1, le=100, description="Number of entries to return"),
+) -> list[LeaderboardEntry]:
+    """Return the top users of the all-time or per-event leaderboard."""
+
+    scope = event_scope(event_id) if event_id is not None else GLOBAL_SCOPE
+    standings = get_leaderboard(db).top(scope, offset, limit)
+
+    if not standings:
+        raise HTTPException(status_code=404, detail="No leaderboard entries found")
+
+    usernames = dict(
+        db.query(models.User.id, models.User.username)
+        .filter(models.User.id.in_([user_id for user_id, _ in standings]))
+        .all()
+    )
+
+    return [
+        LeaderboardEntry(
+            rank=offset + position,
+            user_id=user_id,
+            username=usernames.get(user_id, ""),
+            points=points,
+        )
+        for position, (user_id, points) in enumerate(standings, start=1)
+    ]
+
+@router.get("/rank/{user_id}")
+def get_user_rank(
+    user_id: int,
+    db: db_dependency,
+    event_id: int | None = Query(None, description="Event to rank; omit for the all-time leaderboard"),
+) -> LeaderboardEntry:
+    """Return the rank and points of a single user."""
+
+    scope = event_scope(event_id) if event_id is not None else GLOBAL_SCOPE
+    standing = get_leaderboard(db).rank(scope, user_id)
+
+    if standing is None:
+        raise HTTPException(status_code=404, detail="User is not ranked")
+
+    user = db.query(models.User).filter(models.User.id == user_id).first()
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    rank, points = standing
+    return LeaderboardEntry(rank=rank, user_id=user_id, username=user.username, points=points)
@@ -1,8 +1,10 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Query, status
 from app.schemas.predict_schemas import PredictionCreate, PredictionOutMakePrediction, PredictionOutPredict, PredictionResult
 from app.db.database import db_dependency
 from app.db.models import models
+from sqlalchemy import and_, or_
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import aliased
 from datetime import datetime
 from zoneinfo import ZoneInfo
 
@@ -111,125 +113,100 @@ async def get_prediction(user_id: int, fight_id: int, db: db_dependency) -> Pred
     )
 
 @router.get("/all")
-async def get_all_predictions(user_id: int, db: db_dependency) -> list[PredictionOutPredict]:
-    """Return all predictions for a given *user_id*."""
-    db_predictions = (
-        db.query(models.Prediction)
+async def get_all_predictions(
+    user_id: int,
+    db: db_dependency,
+    after_id: int | None = Query(None, description="Keyset cursor: id of the last prediction already received"),
+    limit: int | None = Query(None, ge=1, le=500, description="Maximum number of predictions to return"),
+) -> list[PredictionOutPredict]:
+    """
+    Return the predictions for a given *user_id*, oldest event first.
+    Pass the ``id`` of the last prediction received as *after_id* to fetch the next page.
+    """
+    fighter_1 = aliased(models.Fighter)
+    fighter_2 = aliased(models.Fighter)
+    winner = aliased(models.Fighter)
+
+    query = (
+        db.query(
+            models.Prediction.id,
+            models.Prediction.method,
+            models.Prediction.round,
+            models.Event.title,
+            models.Event.date,
+            fighter_1.name.label("fighter_1_name"),
+            fighter_2.name.label("fighter_2_name"),
+            winner.name.label("winner_name"),
+            models.PredictionScore.fighter_correct,
+            models.PredictionScore.method_correct,
+            models.PredictionScore.round_correct,
+            models.PredictionScore.points,
+        )
         .join(models.Fight, models.Prediction.fight_id == models.Fight.id)
         .join(models.Event, models.Fight.event_id == models.Event.id)
+        .join(fighter_1, models.Fight.fighter_1_id == fighter_1.id)
+        .join(fighter_2, models.Fight.fighter_2_id == fighter_2.id)
+        .join(winner, models.Prediction.fighter_id == winner.id)
+        .outerjoin(models.PredictionScore, models.PredictionScore.prediction_id == models.Prediction.id)
         .filter(models.Prediction.user_id == user_id)
-        .order_by(models.Event.date.asc(), models.Fight.match_number.desc())       
-        .all()
     )
 
-    if not db_predictions:
-        raise HTTPException(status_code=404, detail="No predictions found")
-    
-    predictions = []
-
-    for prediction in db_predictions:
-        db_fight = (
-            db.query(models.Fight)
-            .filter(models.Fight.id == prediction.fight_id)
-            .first()
+    if after_id is not None:
+        cursor = (
+            db.query(
+                models.Event.date.label("event_date"),
+                models.Fight.match_number.label("match_number"),
+                models.Prediction.id.label("prediction_id"),
+            )
+            .join(models.Fight, models.Prediction.fight_id == models.Fight.id)
+            .join(models.Event, models.Fight.event_id == models.Event.id)
+            .filter(models.Prediction.id == after_id, models.Prediction.user_id == user_id)
+            .subquery()
         )
-
-        if not db_fight:
-            raise HTTPException(status_code=404, detail="Fight not found")
-
-        db_event = (
-            db.query(models.Event)
-            .filter(models.Event.id == db_fight.event_id)
-            .first()
+        query = query.join(
+            cursor,
+            or_(
+                models.Event.date > cursor.c.event_date,
+                and_(
+                    models.Event.date == cursor.c.event_date,
+                    or_(
+                        models.Fight.match_number < cursor.c.match_number,
+                        and_(
+                            models.Fight.match_number == cursor.c.match_number,
+                            models.Prediction.id > cursor.c.prediction_id,
+                        ),
+                    ),
+                ),
+            ),
         )
 
-        if not db_event:
-            raise HTTPException(status_code=404, detail="Event not found")
-        
-        db_fighter_1 = (
-            db.query(models.Fighter)
-            .filter(models.Fighter.id == db_fight.fighter_1_id)
-            .first()
-        )
+    query = query.order_by(models.Event.date.asc(), models.Fight.match_number.desc(), models.Prediction.id.asc())
 
-        if not db_fighter_1:
-            raise HTTPException(status_code=404, detail="Fighter 1 not found")
-        
-        db_fighter_2 = (    
-            db.query(models.Fighter)
-            .filter(models.Fighter.id == db_fight.fighter_2_id)
-            .first()
-        )
+    if limit is not None:
+        query = query.limit(limit)
 
-        if not db_fighter_2:
-            raise HTTPException(status_code=404, detail="Fighter 2 not found")
-        
-        db_winner = (
-            db.query(models.Fighter)
-            .filter(models.Fighter.id == prediction.fighter_id)
-            .first()
-        )
-        
-        if not db_winner:
-            raise HTTPException(status_code=404, detail="Winner not found")
-
-        db_fight_result = (
-            db.query(models.Fight)
-            .filter(models.Fight.id == prediction.fight_id)
-            .first()
-        )
+    rows = query.all()
 
-        if not db_fight_result:
-            raise HTTPException(status_code=404, detail="Fight result not found")
-
-        if not db_fight_result.winner:
-            result = None
-        elif db_fight_result.winner.lower() in ["draw", "no contest"]:
-            result = PredictionResult(fighter=False, method=False, round=False)
-        else:
-            winner_id = db_fight_result.fighter_1_id
-            predicted_fighter_id = db_winner.id
-
-            if winner_id != predicted_fighter_id:
-                result = PredictionResult(fighter=False, method=False, round=False)
-            else:
-                fighter_correct = True
-
-                method_correct = False
-                if db_fight_result.method and prediction.method:
-
-                    normalized_actual = None
-                    if "decision" in db_fight_result.method.lower():
-                        normalized_actual = "DECISION"
-                    elif "submission" in db_fight_result.method.lower() or db_fight_result.method.lower().startswith("sub"):
-                        normalized_actual = "SUBMISSION"
-                    elif any(term in db_fight_result.method.lower() for term in ["ko", "tko", "knockout", "technical knockout"]):
-                        normalized_actual = "KO"
-
-                    method_correct = normalized_actual == prediction.method
-
-                round_correct = False
-                if normalized_actual == "DECISION":
-                    round_correct = True
-                elif db_fight_result.round and prediction.round:
-                    round_correct = db_fight_result.round == prediction.round
-
-                result = PredictionResult(
-                    fighter=fighter_correct,
-                    method=method_correct,
-                    round=round_correct
-                )
-        
-        
-        predictions.append(PredictionOutPredict(
-            event_title=db_event.title,
-            event_date=db_event.date,
-            fighter_1_name=db_fighter_1.name,
-            fighter_2_name=db_fighter_2.name,
-            winner_name=db_winner.name,
-            method=prediction.method,
-            round=prediction.round,
-            result=result,
-        ))
+    # Past the last page the list just ends; only a user without predictions is not found
+    if not rows and after_id is None:
+        raise HTTPException(status_code=404, detail="No predictions found")
 
-    return predictions
\ No newline at end of file
+    return [
+        PredictionOutPredict(
+            id=row.id,
+            event_title=row.title,
+            event_date=row.date,
+            fighter_1_name=row.fighter_1_name,
+            fighter_2_name=row.fighter_2_name,
+            winner_name=row.winner_name,
+            method=row.method,
+            round=row.round,
+            result=PredictionResult(
+                fighter=row.fighter_correct,
+                method=row.method_correct,
+                round=row.round_correct,
+                points=row.points,
+            ) if row.points is not None else None,
+        )
+        for row in rows
+    ]
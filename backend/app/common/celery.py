@@ -53,10 +53,14 @@ celery_app.conf.event_queue_expires = 60.0  # Event expiration time
 
 celery_app.conf.task_routes = {
     "import_fighter": {"queue": "scrape"},
+    "scrape_fighter": {"queue": "scrape"},
     "scrape_event_fights": {"queue": "scrape"},
     "upsert_fight": {"queue": "db"},
+    "import_event_card": {"queue": "db"},
     "import_event": {"queue": "db"},
     "import_rankings": {"queue": "db"},
+    "import_event_datetimes": {"queue": "db"},
     "sync_all_ufc_events": {"queue": "db"},
     "sync_recent_ufc_events": {"queue": "db"},
+    "rescore_predictions": {"queue": "db"},
 }
\ No newline at end of file
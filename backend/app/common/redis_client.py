@@ -0,0 +1,11 @@
+import redis
+
+redis_url = "redis://redis:6379/2"
+
+redis_client = redis.Redis.from_url(
+    redis_url,
+    decode_responses=True,
+    socket_timeout=2,
+    socket_connect_timeout=2,
+    health_check_interval=30,
+)
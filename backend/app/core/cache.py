@@ -0,0 +1,302 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from redis import RedisError
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.common.redis_client import redis_client
+
+class ResponseCache:
+    """
+    Two-tier cache for JSON responses of read endpoints.
+
+    Entries live in a small in-process LRU in front of Redis and are grouped under tags
+    (e.g. ``fights:event:42``). Importers invalidate tags after they commit; the invalidation
+    deletes the Redis entries and is broadcast over pub/sub so every API process drops its
+    local copies as well.
+
+    Every invalidation also bumps a generation per tag. A response built from a read that
+    raced an import is only stored if none of its tags' generations moved in the meantime,
+    so a body read before the commit cannot outlive the invalidation that followed it.
+    """
+
+    KEY_PREFIX = "response-cache:"
+    TAG_PREFIX = "response-cache-tag:"
+    GENERATION_PREFIX = "response-cache-generation:"
+    CHANNEL = "response-cache-invalidate"
+    # KEYS: the entry, then each tag's generation, then each tag's key set.
+    # ARGV: the payload, its TTL, the tag TTL, the cache key, then the expected generations.
+    _STORE_IF_CURRENT = (
+        "local n = (#KEYS - 1) / 2 "
+        "for i = 1, n do "
+        "if (redis.call('GET', KEYS[1 + i]) or '') ~= ARGV[4 + i] then return 0 end end "
+        "redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2]) "
+        "for i = 1, n do "
+        "redis.call('SADD', KEYS[1 + n + i], ARGV[4]) "
+        "redis.call('EXPIRE', KEYS[1 + n + i], ARGV[3]) end "
+        "return 1"
+    )
+
+    def __init__(self, client, max_local_entries: int = 1024, local_ttl: int = 60, default_ttl: int = 3600):
+        self.client = client
+        self.max_local_entries = max_local_entries
+        self.local_ttl = local_ttl
+        self.default_ttl = default_ttl
+        # When False every lookup misses and nothing is stored, so routes always run their queries
+        self.enabled = True
+        self._local: OrderedDict[str, tuple[float, str, str | None, frozenset[str]]] = OrderedDict()
+        # Bumped on every local eviction; guards the local tier the way tag generations guard Redis
+        self._local_generation = 0
+        self._lock = threading.Lock()
+        self._listener: threading.Thread | None = None
+        self._invalidation_callbacks = []
+        self.stats = {"local_hits": 0, "redis_hits": 0, "misses": 0, "invalidations": 0, "stale_writes": 0, "redis_errors": 0}
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.stats[name] += 1
+
+    def lookup(self, key: str) -> tuple[str, str | None] | None:
+        """Return the cached ``(body, etag)`` for *key*, looking in the local LRU first and then in Redis."""
+        if not self.enabled:
+            self._count("misses")
+            return None
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._local.get(key)
+            if entry and entry[0] > now:
+                self._local.move_to_end(key)
+                self.stats["local_hits"] += 1
+                return entry[1], entry[2]
+            generation = self._local_generation
+
+        try:
+            cached = self.client.get(self.KEY_PREFIX + key)
+        except RedisError:
+            self._count("redis_errors")
+            cached = None
+
+        if cached is None:
+            self._count("misses")
+            return None
+
+        entry = json.loads(cached)
+        # Entries written before ETags were stored with the body have no "etag"
+        etag = entry.get("etag")
+        self._store_local(key, entry["body"], etag, frozenset(entry["tags"]), now, generation)
+        self._count("redis_hits")
+        return entry["body"], etag
+
+    def generations(self, tags: list[str]) -> tuple[int, list[str] | None]:
+        """
+        Snapshot the generations of *tags*; take it before reading the data a response is built
+        from and pass it to :meth:`store`. The Redis half is None when Redis cannot be reached.
+        """
+        with self._lock:
+            local = self._local_generation
+        try:
+            shared = self.client.mget([self.GENERATION_PREFIX + tag for tag in tags]) if tags else []
+            shared = [value or "" for value in shared]
+        except RedisError:
+            self._count("redis_errors")
+            shared = None
+        return local, shared
+
+    def store(
+        self,
+        key: str,
+        body: str,
+        etag: str | None,
+        tags: list[str],
+        generations: tuple[int, list[str] | None],
+        ttl: int | None = None,
+    ) -> None:
+        """
+        Store *body* and its *etag* as one entry under *key* in both tiers and index it under
+        every tag, unless one of the tags was invalidated since *generations* was taken.
+        """
+        if not self.enabled:
+            return
+        local, shared = generations
+        self._store_local(key, body, etag, frozenset(tags), time.monotonic(), local)
+        if shared is None:
+            return
+        try:
+            stored = self.client.eval(
+                self._STORE_IF_CURRENT,
+                1 + 2 * len(tags),
+                self.KEY_PREFIX + key,
+                *[self.GENERATION_PREFIX + tag for tag in tags],
+                *[self.TAG_PREFIX + tag for tag in tags],
+                json.dumps({"body": body, "etag": etag, "tags": tags}),
+                ttl or self.default_ttl,
+                self.default_ttl,
+                key,
+                *shared,
+            )
+            if not stored:
+                self._count("stale_writes")
+        except RedisError:
+            self._count("redis_errors")
+
+    def _store_local(
+        self, key: str, body: str, etag: str | None, tags: frozenset[str], now: float, generation: int | None = None
+    ) -> None:
+        with self._lock:
+            if generation is not None and generation != self._local_generation:
+                self.stats["stale_writes"] += 1
+                return
+            self._local[key] = (now + self.local_ttl, body, etag, tags)
+            self._local.move_to_end(key)
+            while len(self._local) > self.max_local_entries:
+                self._local.popitem(last=False)
+
+    def _evict_local(self, tags: set[str]) -> None:
+        with self._lock:
+            self._local_generation += 1
+            for key in [key for key, (_, _, _, entry_tags) in self._local.items() if entry_tags & tags]:
+                del self._local[key]
+
+    def invalidate(self, tags: set[str]) -> None:
+        """Drop every entry indexed under any of *tags*, in Redis and in every API process."""
+        if not tags:
+            return
+        self._evict_local(tags)
+        self._count("invalidations")
+        try:
+            tags = sorted(tags)
+            pipe = self.client.pipeline(transaction=False)
+            for tag in tags:
+                pipe.smembers(self.TAG_PREFIX + tag)
+            keys = set().union(*pipe.execute())
+
+            pipe = self.client.pipeline(transaction=False)
+            for key in keys:
+                pipe.delete(self.KEY_PREFIX + key)
+            for tag in tags:
+                pipe.delete(self.TAG_PREFIX + tag)
+                # Outlives any request in flight, so a snapshot can never see the counter reset
+                pipe.incr(self.GENERATION_PREFIX + tag)
+                pipe.expire(self.GENERATION_PREFIX + tag, self.default_ttl)
+            pipe.execute()
+            self.client.publish(self.CHANNEL, json.dumps(tags))
+        except RedisError:
+            self._count("redis_errors")
+
+    def add_invalidation_listener(self, callback) -> None:
+        """Call ``callback(tags)`` from the listener thread whenever tags are invalidated anywhere."""
+        self._invalidation_callbacks.append(callback)
+
+    def _notify(self, tags: set[str]) -> None:
+        self._evict_local(tags)
+        for callback in self._invalidation_callbacks:
+            try:
+                callback(tags)
+            except Exception as exc:
+                print(f"Response cache invalidation listener failed: {exc}")
+
+    def start_listener(self) -> None:
+        """Subscribe to invalidation broadcasts so local LRU entries are evicted promptly."""
+        if self._listener is not None:
+            return
+
+        def listen() -> None:
+            while True:
+                try:
+                    pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                    pubsub.subscribe(self.CHANNEL)
+                    for message in pubsub.listen():
+                        self._notify(set(json.loads(message["data"])))
+                except RedisError:
+                    self._count("redis_errors")
+                    # Local entries are only trusted for local_ttl while we cannot hear invalidations
+                    time.sleep(self.local_ttl)
+
+        self._listener = threading.Thread(target=listen, name="response-cache-listener", daemon=True)
+        self._listener.start()
+
+    def cached(self, *tags: str, ttl: int | None = None, etag=None):
+        """
+        Decorator for read endpoints. The cache key is derived from the route function and its
+        scalar parameters; *tags* are formatted with those parameters, e.g. ``"fighters:{fighter_id}"``.
+
+        If *etag* is given it is called as ``etag(db, **params)`` and must return the values the
+        response depends on (typically ``max(last_updated_at)`` from an aggregate query). The
+        resulting strong ETag is cached in the same entry as the body, so the two are always
+        served together, and a request whose ``If-None-Match`` matches it is answered with 304.
+        The route must then accept ``db`` and ``request`` parameters.
+        """
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                params = {
+                    name: value for name, value in kwargs.items()
+                    if value is None or isinstance(value, (str, int, float, bool))
+                }
+                key = f"{func.__module__}.{func.__name__}:" + "&".join(
+                    f"{name}={params[name]}" for name in sorted(params)
+                )
+                entry_tags = [tag.format(**params) for tag in tags]
+
+                entry = self.lookup(key)
+                if entry is not None:
+                    body, etag_value = entry
+                    if etag_value and etag_matches(kwargs["request"], etag_value):
+                        return Response(status_code=304, headers={"ETag": etag_value})
+                else:
+                    # Taken before anything that gets stored is read
+                    generations = self.generations(entry_tags)
+                    etag_value = None
+                    if etag is not None:
+                        # Read before the payload: a commit landing in between pairs an older
+                        # ETag with a newer body, which the client just refetches, never the
+                        # other way round, which would pin it to a stale body through 304s
+                        etag_value = make_etag(etag(kwargs["db"], **params))
+                        if etag_matches(kwargs["request"], etag_value):
+                            return Response(status_code=304, headers={"ETag": etag_value})
+                    result = func(*args, **kwargs)
+                    if isinstance(result, Response):
+                        return result
+                    body = json.dumps(jsonable_encoder(result))
+                    self.store(key, body, etag_value, entry_tags, generations, ttl)
+
+                headers = {"ETag": etag_value} if etag_value else None
+                return Response(content=body, media_type="application/json", headers=headers)
+            return wrapper
+        return decorator
+
+def make_etag(values) -> str:
+    """Build a strong ETag from the values a response depends on."""
+    digest = hashlib.sha1(repr(values).encode()).hexdigest()
+    return f'"{digest}"'
+
+def etag_matches(request: Request, etag_value: str) -> bool:
+    """Return True if the request's ``If-None-Match`` header matches *etag_value*."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [candidate.strip() for candidate in header.split(",")]
+    return "*" in candidates or any(candidate.removeprefix("W/") == etag_value for candidate in candidates)
+
+response_cache = ResponseCache(redis_client)
+
+def invalidate_on_commit(db: Session, *tags: str) -> None:
+    """Queue cache *tags* for invalidation once *db* commits; they are discarded on rollback."""
+    pending = db.info.get("response_cache_tags")
+    if pending is None:
+        pending = db.info["response_cache_tags"] = set()
+        event.listen(db, "after_commit", _invalidate_pending, once=True)
+        event.listen(db, "after_rollback", _discard_pending, once=True)
+    pending.update(tags)
+
+def _invalidate_pending(session: Session) -> None:
+    response_cache.invalidate(session.info.pop("response_cache_tags", set()))
+
+def _discard_pending(session: Session) -> None:
+    session.info.pop("response_cache_tags", None)
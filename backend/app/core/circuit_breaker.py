@@ -0,0 +1,66 @@
+import random
+import time
+from redis import RedisError
+
+class RedisCircuitBreaker:
+    """
+    Circuit breaker shared through Redis by every worker that scrapes the same site.
+
+    Blocks (403/429) are counted in fixed windows. Once ``threshold`` blocks land in one window
+    the breaker opens and every caller of :meth:`wait` pauses until it closes again; repeated
+    trips double the cooldown (up to 16x). A Retry-After from the server opens the breaker for
+    at least that long on its own. While open, nobody retries, so the site sees silence instead
+    of a thundering herd of re-warmed sessions.
+    """
+
+    KEY_PREFIX = "circuit:"
+    MAX_BACKOFF_EXPONENT = 4
+
+    def __init__(self, client, name: str, threshold: int = 20, window: int = 60, cooldown: int = 60):
+        self.client = client
+        self.prefix = f"{self.KEY_PREFIX}{name}:"
+        self.threshold = threshold
+        self.window = window
+        self.cooldown = cooldown
+
+    def open_for(self) -> float:
+        """Seconds until the breaker closes, 0 when it is closed."""
+        try:
+            remaining_ms = self.client.pttl(self.prefix + "open")
+        except RedisError:
+            return 0
+        return remaining_ms / 1000 if remaining_ms and remaining_ms > 0 else 0
+
+    def wait(self) -> None:
+        """Sleep while the breaker is open; the jitter spreads the wake-ups of waiting greenlets."""
+        while True:
+            remaining = self.open_for()
+            if not remaining:
+                return
+            time.sleep(remaining + random.uniform(0, min(5.0, self.cooldown / 10)))
+
+    def record_block(self, retry_after: float | None = None) -> None:
+        """Count a blocked request and open the breaker if blocks are sustained."""
+        window_key = f"{self.prefix}blocks:{int(time.time() // self.window)}"
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            pipe.incr(window_key)
+            pipe.expire(window_key, self.window * 2)
+            blocks = pipe.execute()[0]
+
+            pause = retry_after or 0
+            if blocks == self.threshold:
+                trips = self.client.incr(self.prefix + "trips")
+                self.client.expire(self.prefix + "trips", self.cooldown * 2 ** (self.MAX_BACKOFF_EXPONENT + 1))
+                pause = max(pause, self.cooldown * 2 ** min(trips - 1, self.MAX_BACKOFF_EXPONENT))
+            if pause and self.client.set(self.prefix + "open", "1", px=int(pause * 1000), nx=True):
+                print(f"Circuit {self.prefix[:-1]} open for {pause:.0f}s after {blocks} blocks in {self.window}s")
+        except RedisError as exc:
+            print(f"Circuit breaker unavailable: {exc}")
+
+    def state(self) -> dict:
+        try:
+            trips = int(self.client.get(self.prefix + "trips") or 0)
+        except RedisError:
+            trips = 0
+        return {"open_for": round(self.open_for(), 1), "recent_trips": trips}
@@ -0,0 +1,175 @@
+import time
+from datetime import datetime, timezone
+from redis import RedisError
+
+# Refill the bucket from the elapsed time at the current adaptive rate, then take one token or
+# report how long to wait for one. Uses the Redis clock so every worker process agrees on the refill.
+_TOKEN_BUCKET_SCRIPT = """
+local max_rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local idle_ttl = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts', 'rate')
+local rate = tonumber(state[3]) or max_rate
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate / 1000)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = math.ceil((1 - tokens) * 1000 / rate)
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], idle_ttl)
+return wait
+"""
+
+# AIMD: every successful request adds increase/rate (about +increase per second of traffic),
+# a block multiplies the rate by the decrease factor, at most once per interval so a burst of
+# blocked greenlets counts as one congestion signal.
+_ADJUST_RATE_SCRIPT = """
+local blocked = tonumber(ARGV[1])
+local max_rate = tonumber(ARGV[2])
+local min_rate = tonumber(ARGV[3])
+local increase = tonumber(ARGV[4])
+local factor = tonumber(ARGV[5])
+local interval = tonumber(ARGV[6])
+local idle_ttl = tonumber(ARGV[7])
+local rate = tonumber(redis.call('HGET', KEYS[1], 'rate')) or max_rate
+if blocked == 1 then
+    local clock = redis.call('TIME')
+    local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+    local last = tonumber(redis.call('HGET', KEYS[1], 'decreased_at')) or 0
+    if now - last >= interval then
+        rate = math.max(min_rate, rate * factor)
+        redis.call('HSET', KEYS[1], 'decreased_at', tostring(now))
+    end
+else
+    rate = math.min(max_rate, rate + increase / rate)
+end
+redis.call('HSET', KEYS[1], 'rate', tostring(rate))
+redis.call('PEXPIRE', KEYS[1], idle_ttl)
+return tostring(rate)
+"""
+
+class RedisTokenBucket:
+    """
+    Token bucket shared by every process and greenlet that uses the same Redis key.
+
+    Tokens are added at the current rate up to ``capacity`` (the allowed burst); each request
+    takes one. The rate adapts AIMD-style between ``min_rate`` and ``rate`` as callers report
+    blocked and successful requests through :meth:`record`. When Redis is unavailable the
+    limiter lets requests through rather than stalling the scrapers.
+    """
+
+    KEY_PREFIX = "rate-limit:"
+    IDLE_TTL_MS = 10 * 60 * 1000
+
+    def __init__(
+        self,
+        client,
+        name: str,
+        rate: float,
+        capacity: int,
+        min_rate: float | None = None,
+        increase: float = 0.5,
+        decrease_factor: float = 0.5,
+        decrease_interval: float = 5.0,
+    ):
+        self.client = client
+        self.key = self.KEY_PREFIX + name
+        self.rate = rate
+        self.capacity = capacity
+        self.min_rate = min_rate if min_rate is not None else rate / 20
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self.decrease_interval = decrease_interval
+        self._script = client.register_script(_TOKEN_BUCKET_SCRIPT)
+        self._adjust = client.register_script(_ADJUST_RATE_SCRIPT)
+        self._warned = False
+
+    def _unavailable(self, exc: RedisError) -> None:
+        if not self._warned:
+            print(f"Rate limiter unavailable, not throttling: {exc}")
+            self._warned = True
+
+    def try_acquire(self) -> float:
+        """Take a token if one is available; returns 0, or the seconds to wait before retrying."""
+        try:
+            wait_ms = self._script(keys=[self.key], args=[self.rate, self.capacity, self.IDLE_TTL_MS])
+        except RedisError as exc:
+            self._unavailable(exc)
+            return 0
+        return int(wait_ms) / 1000
+
+    def acquire(self) -> None:
+        """Block (cooperatively under gevent) until a token is available."""
+        while True:
+            wait = self.try_acquire()
+            if not wait:
+                return
+            time.sleep(wait)
+
+    def record(self, blocked: bool) -> float:
+        """Adjust the shared rate after a request; returns the new rate in requests per second."""
+        try:
+            return float(self._adjust(
+                keys=[self.key],
+                args=[
+                    int(blocked), self.rate, self.min_rate, self.increase,
+                    self.decrease_factor, int(self.decrease_interval * 1000), self.IDLE_TTL_MS,
+                ],
+            ))
+        except RedisError as exc:
+            self._unavailable(exc)
+            return self.rate
+
+    def current_rate(self) -> float:
+        try:
+            rate = self.client.hget(self.key, "rate")
+        except RedisError:
+            return self.rate
+        return float(rate) if rate is not None else self.rate
+
+class RequestMetrics:
+    """Per-minute request and block counters in Redis, kept for a day."""
+
+    KEY_PREFIX = "request-metrics:"
+    RETENTION = 24 * 3600
+
+    def __init__(self, client, name: str):
+        self.client = client
+        self.prefix = f"{self.KEY_PREFIX}{name}:"
+
+    def record(self, blocked: bool) -> None:
+        key = self.prefix + str(int(time.time() // 60))
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            pipe.hincrby(key, "requests", 1)
+            if blocked:
+                pipe.hincrby(key, "blocked", 1)
+            pipe.expire(key, self.RETENTION)
+            pipe.execute()
+        except RedisError:
+            pass
+
+    def history(self, minutes: int = 60) -> list[dict]:
+        """Counters for the last *minutes* minutes, oldest first, with the block rate per minute."""
+        current = int(time.time() // 60)
+        buckets = list(range(current - minutes + 1, current + 1))
+        pipe = self.client.pipeline(transaction=False)
+        for bucket in buckets:
+            pipe.hgetall(self.prefix + str(bucket))
+        history = []
+        for bucket, counters in zip(buckets, pipe.execute()):
+            requests = int(counters.get("requests", 0))
+            blocked = int(counters.get("blocked", 0))
+            history.append({
+                "minute": datetime.fromtimestamp(bucket * 60, tz=timezone.utc).isoformat(),
+                "requests": requests,
+                "blocked": blocked,
+                "block_rate": round(blocked / requests, 3) if requests else 0.0,
+            })
+        return history
@@ -0,0 +1,64 @@
+import json
+import time
+from app.common.redis_client import redis_client
+
+class SyncRunRegistry:
+    """
+    Per-sync-run record of fighter pages that have already been scraped.
+
+    A full sync fans out one chord per event, and a veteran appears on dozens of cards. The
+    first task to claim a fighter URL scrapes it and stores the result under the run id; later
+    tasks in the same run reuse that result, or poll while the claim is in flight (the scrape
+    workers run on gevent, so waiting is cheap). Claims expire, so a crashed worker only delays
+    the others by ``lock_ttl`` seconds.
+    """
+
+    KEY_PREFIX = "sync-run:"
+
+    def __init__(self, client, run_id: str, ttl: int = 24 * 3600, lock_ttl: int = 300):
+        self.client = client
+        self.run_id = run_id
+        self.ttl = ttl
+        self.lock_ttl = lock_ttl
+        self._results_key = f"{self.KEY_PREFIX}{run_id}:fighters"
+
+    def _lock_key(self, url: str) -> str:
+        return f"{self.KEY_PREFIX}{self.run_id}:lock:{url}"
+
+    def result(self, url: str) -> dict | None:
+        """Return the fighter stored for *url* in this run, if it has been scraped already."""
+        cached = self.client.hget(self._results_key, url)
+        return json.loads(cached) if cached is not None else None
+
+    def claim(self, url: str) -> bool:
+        """Try to become the task that scrapes *url*; False while another task holds the claim."""
+        return bool(self.client.set(self._lock_key(url), "1", nx=True, ex=self.lock_ttl))
+
+    def acquire(self, url: str, poll_interval: float = 1.0) -> dict | None:
+        """
+        Return the fighter already stored for *url*, waiting out any claim in flight.
+        Returns None once the caller holds the claim and must scrape the page itself.
+        """
+        while True:
+            fighter = self.result(url)
+            if fighter is not None:
+                return fighter
+            if self.claim(url):
+                return None
+            time.sleep(poll_interval)
+
+    def store(self, url: str, fighter: dict) -> None:
+        """Publish the scraped fighter to the rest of the run and drop the claim."""
+        pipe = self.client.pipeline(transaction=False)
+        pipe.hset(self._results_key, url, json.dumps(fighter))
+        pipe.expire(self._results_key, self.ttl)
+        pipe.delete(self._lock_key(url))
+        pipe.execute()
+
+    def release(self, url: str) -> None:
+        """Drop the claim on *url* after a failed scrape so the next attempt can take it."""
+        self.client.delete(self._lock_key(url))
+
+def sync_run_registry(run_id: str | None) -> SyncRunRegistry | None:
+    """Registry for *run_id*, or None for imports that are not part of a sync run."""
+    return SyncRunRegistry(redis_client, run_id) if run_id else None
@@ -0,0 +1,101 @@
+import difflib
+from functools import lru_cache
+import pycountry
+from app.core.utils.string_utils import normalize_search_text
+
+FLAG_URL_TEMPLATE = "https://flagcdn.com/w320/{code}.png"
+
+# Names Sherdog/UFC use that pycountry does not know (or maps differently); codes are flagcdn.com codes
+FLAG_CODE_ALIASES = {
+    "England": "gb-eng",
+    "Scotland": "gb-sct",
+    "Wales": "gb-wls",
+    "Northern Ireland": "gb-nir",
+    "United Kingdom": "gb",
+    "Great Britain": "gb",
+    "UK": "gb",
+    "United States of America": "us",
+    "USA": "us",
+    "US": "us",
+    "Russia": "ru",
+    "South Korea": "kr",
+    "Korea": "kr",
+    "North Korea": "kp",
+    "Czech Republic": "cz",
+    "Ivory Coast": "ci",
+    "Kosovo": "xk",
+    "Macedonia": "mk",
+    "Holland": "nl",
+    "Turkey": "tr",
+    "Vietnam": "vn",
+    "Taiwan": "tw",
+    "Republic of Ireland": "ie",
+    "Republic of Korea": "kr",
+    "Korea, South": "kr",
+    "Korea, North": "kp",
+    "Republic of Georgia": "ge",
+    "UAE": "ae",
+    "DR Congo": "cd",
+    "DRC": "cd",
+    "Democratic Republic of the Congo": "cd",
+    "Cape Verde": "cv",
+    "Swaziland": "sz",
+    "Burma": "mm",
+    "Macau": "mo",
+}
+
+# Only single-word names are fuzzy-matched, to catch typos such as "Brazill"; multi-word names
+# share too many words ("Republic of ...") for a string ratio to tell them apart
+FUZZY_MATCH_CUTOFF = 0.9
+
+def _build_code_table() -> dict[str, str]:
+    """Precompute a normalised country name/alias -> flag code table."""
+    table: dict[str, str] = {}
+    for country in pycountry.countries:
+        code = country.alpha_2.lower()
+        for attribute in ("name", "official_name", "common_name", "alpha_3"):
+            value = getattr(country, attribute, None)
+            if value:
+                table.setdefault(normalize_search_text(value), code)
+    for alias, code in FLAG_CODE_ALIASES.items():
+        table[normalize_search_text(alias)] = code
+    return table
+
+_CODE_BY_NAME = _build_code_table()
+_SINGLE_WORD_NAMES = [name for name in _CODE_BY_NAME if " " not in name and "," not in name]
+
+@lru_cache(maxsize=4096)
+def resolve_flag_code(location: str | None) -> str:
+    """
+    Return the flagcdn.com code for a country name or free-form location such as
+    "Las Vegas, Nevada, United States", or "" if no country can be recognised.
+    Tries an exact lookup of the last two comma-separated parts (for names like "Korea, South"),
+    then of the last part, then a fuzzy match of a single-word last part.
+    """
+    if not location:
+        return ""
+
+    parts = [normalize_search_text(part) for part in location.split(",")]
+    country_name = parts[-1]
+    if not country_name:
+        return ""
+
+    if len(parts) >= 2:
+        code = _CODE_BY_NAME.get(f"{parts[-2]}, {country_name}")
+        if code:
+            return code
+
+    code = _CODE_BY_NAME.get(country_name)
+    if code:
+        return code
+
+    if " " in country_name:
+        return ""
+    close = difflib.get_close_matches(country_name, _SINGLE_WORD_NAMES, n=1, cutoff=FUZZY_MATCH_CUTOFF)
+    return _CODE_BY_NAME[close[0]] if close else ""
+
+def flag_image_url(flag_code: str | None) -> str:
+    """Return the flag image URL for a stored ``flag_code``, or "" if there is none."""
+    if not flag_code:
+        return ""
+    return FLAG_URL_TEMPLATE.format(code=flag_code)
@@ -0,0 +1,15 @@
+import hashlib
+import json
+
+# Bookkeeping columns that change on every write without saying anything about the row
+UNHASHED_COLUMNS = {"content_hash", "last_updated_at"}
+
+def content_hash(values: dict) -> str:
+    """
+    Return a SHA-256 digest of the column *values* an importer writes for one row, stored per row to
+    detect unchanged imports. Derived columns (flag codes, search text) are part of the digest, so
+    changing how they are computed rewrites the affected rows on their next import.
+    """
+
+    hashed = {column: value for column, value in values.items() if column not in UNHASHED_COLUMNS}
+    return hashlib.sha256(json.dumps(hashed, sort_keys=True, default=str).encode()).hexdigest()
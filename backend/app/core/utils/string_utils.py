@@ -1,6 +1,5 @@
 import unicodedata
 from app.schemas.predict_schemas import Method
-import pycountry
 
 def strip_accents(text: str) -> str:
     """Return a copy of *text* with accents/diacritics removed."""
@@ -11,30 +10,15 @@ def strip_accents(text: str) -> str:
     normalized = unicodedata.normalize("NFKD", text)
     return "".join(c for c in normalized if not unicodedata.combining(c))
 
-def get_flag_image_url(location: str) -> str:
-    """
-    Finds a flag image from the location string using flagcdn.com.
-    """
-    SPECIAL_CASES = {
-        "England": "gb-eng",
-        "Scotland": "gb-sct",
-        "Wales": "gb-wls",
-        "Northern Ireland": "gb-nir",
-        "Russia": "ru",
-        "South Korea": "kr",
-    }
-
-    country_name = location.split(",")[-1].strip()
-    country = pycountry.countries.get(name=country_name)
-    country_code = country.alpha_2 if country else ""
-
-    if country_name in SPECIAL_CASES:
-        country_code = SPECIAL_CASES[country_name]
-
-    if not country_code:
-        return ""
+def normalize_search_text(text: str) -> str:
+    """Return *text* lower-cased, accent-stripped and with whitespace collapsed, for search matching."""
+
+    return " ".join(strip_accents(text).lower().split())
+
+def fighter_search_text(name: str, nickname: str | None, weight_class: str | None, country: str | None) -> str:
+    """Return the normalised text a fighter is searchable by."""
 
-    return f"https://flagcdn.com/w320/{country_code.lower()}.png"
+    return normalize_search_text(" ".join(part for part in (name, nickname, weight_class, country) if part))
 
 def simplify_method(method: str) -> Method:
     """Simplify a method string to the simplified :class:`Method` enum."""
@@ -0,0 +1,119 @@
+from typing import Callable
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from app.core.utils.string_utils import fighter_search_text
+from app.core.utils.flag_utils import resolve_flag_code
+
+def _enable_pg_trgm(conn: Connection) -> None:
+    """Install pg_trgm if the server ships it; search falls back to plain ILIKE otherwise."""
+    conn.execute(text("SAVEPOINT enable_pg_trgm"))
+    try:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        conn.execute(text("RELEASE SAVEPOINT enable_pg_trgm"))
+    except Exception as exc:
+        conn.execute(text("ROLLBACK TO SAVEPOINT enable_pg_trgm"))
+        print(f"pg_trgm is not available, fighter search will not use a trigram index: {exc}")
+
+def _add_fighter_search_text(conn: Connection) -> None:
+    conn.execute(text("ALTER TABLE fighters ADD COLUMN IF NOT EXISTS search_text VARCHAR"))
+
+    rows = conn.execute(text(
+        "SELECT id, name, nickname, weight_class, country FROM fighters WHERE search_text IS NULL"
+    )).all()
+    if rows:
+        conn.execute(
+            text("UPDATE fighters SET search_text = :search_text WHERE id = :id"),
+            [
+                {"id": row.id, "search_text": fighter_search_text(row.name, row.nickname, row.weight_class, row.country)}
+                for row in rows
+            ],
+        )
+
+    has_trgm = conn.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")).first()
+    if has_trgm:
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_fighters_search_text_trgm "
+            "ON fighters USING gin (search_text gin_trgm_ops)"
+        ))
+
+def _add_flag_codes(conn: Connection) -> None:
+    """Denormalise the country flag code onto fighters and events so requests do no lookup."""
+    for table, source in (("fighters", "country"), ("events", "location")):
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS flag_code VARCHAR"))
+        rows = conn.execute(text(f"SELECT id, {source} AS source FROM {table} WHERE flag_code IS NULL")).all()
+        if rows:
+            conn.execute(
+                text(f"UPDATE {table} SET flag_code = :flag_code WHERE id = :id"),
+                [{"id": row.id, "flag_code": resolve_flag_code(row.source)} for row in rows],
+            )
+
+def _add_event_date_source(conn: Connection) -> None:
+    conn.execute(text("ALTER TABLE events ADD COLUMN IF NOT EXISTS date_source VARCHAR"))
+
+def _add_content_hashes(conn: Connection) -> None:
+    """Hash of the last imported payload per row; NULL until the next import writes it."""
+    for table in ("events", "fighters", "fights"):
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS content_hash VARCHAR"))
+
+def _add_secondary_indexes(conn: Connection) -> None:
+    """Indexes declared with ``index=True`` after the tables existed; names match what create_all uses."""
+    for name, table, column in (
+        ("ix_events_date", "events", "date"),
+        ("ix_fighters_name", "fighters", "name"),
+        ("ix_fights_fighter_1_id", "fights", "fighter_1_id"),
+        ("ix_fights_fighter_2_id", "fights", "fighter_2_id"),
+        ("ix_predictions_fight_id", "predictions", "fight_id"),
+    ):
+        conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({column})"))
+
+def _refresh_flag_codes(conn: Connection) -> None:
+    """Re-resolve every stored flag code after the resolver stopped fuzzy-matching multi-word names."""
+    for table, source in (("fighters", "country"), ("events", "location")):
+        rows = conn.execute(text(f"SELECT id, {source} AS source, flag_code FROM {table}")).all()
+        changed = [
+            {"id": row.id, "flag_code": flag_code}
+            for row in rows
+            if (flag_code := resolve_flag_code(row.source)) != row.flag_code
+        ]
+        if changed:
+            conn.execute(text(f"UPDATE {table} SET flag_code = :flag_code WHERE id = :id"), changed)
+
+def _reset_espn_start_times(conn: Connection) -> None:
+    """
+    Hand events back to Sherdog's date after ESPN start times were read as UTC and dates without
+    a time got a default one. Clearing the hash makes the next sync rewrite the date; the next
+    ESPN import then applies the real start times again.
+    """
+    conn.execute(text("UPDATE events SET date_source = NULL, content_hash = NULL WHERE date_source = 'espn'"))
+
+# Applied in order, each exactly once. Append new steps; never edit or reorder applied ones.
+MIGRATIONS: list[tuple[str, Callable[[Connection], None]]] = [
+    ("0001_enable_pg_trgm", _enable_pg_trgm),
+    ("0002_fighter_search_text", _add_fighter_search_text),
+    ("0003_flag_codes", _add_flag_codes),
+    ("0004_event_date_source", _add_event_date_source),
+    ("0005_content_hashes", _add_content_hashes),
+    ("0006_secondary_indexes", _add_secondary_indexes),
+    ("0007_refresh_flag_codes", _refresh_flag_codes),
+    ("0008_reset_espn_start_times", _reset_espn_start_times),
+]
+
+def run_migrations(engine: Engine) -> None:
+    """
+    Apply pending schema migrations for changes ``create_all`` cannot make on an existing
+    database (new columns, extensions, special indexes).
+    """
+    with engine.begin() as conn:
+        conn.execute(text("SELECT pg_advisory_xact_lock(hashtext('predictmma_migrations'))"))
+        conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            "name VARCHAR PRIMARY KEY, applied_at TIMESTAMPTZ NOT NULL DEFAULT now())"
+        ))
+        applied = {row.name for row in conn.execute(text("SELECT name FROM schema_migrations"))}
+
+        for name, apply in MIGRATIONS:
+            if name in applied:
+                continue
+            print(f"Applying migration {name}")
+            apply(conn)
+            conn.execute(text("INSERT INTO schema_migrations (name) VALUES (:name)"), {"name": name})
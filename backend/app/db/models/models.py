@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Date, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, Date, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from app.db.database import Base
 
@@ -17,9 +17,13 @@ class Event(Base):
     id = Column(Integer, primary_key=True)
     url = Column(String, unique=True, nullable=False)
     title = Column(String, nullable=False)
-    date = Column(DateTime(timezone=True))
+    date = Column(DateTime(timezone=True), index=True)
+    # "espn" once the start time was reconciled from ESPN, None for Sherdog's date
+    date_source = Column(String)
     location = Column(String)
     organizer = Column(String)
+    flag_code = Column(String)
+    content_hash = Column(String)
     last_updated_at = Column(DateTime(timezone=True), nullable=True)
 
     fights = relationship("Fight", back_populates="event", cascade="all, delete-orphan")
@@ -29,7 +33,7 @@ class Fighter(Base):
 
     id = Column(Integer, primary_key=True)
     url = Column(String, unique=True, nullable=False)
-    name = Column(String, nullable=False)
+    name = Column(String, nullable=False, index=True)
     nickname = Column(String)
     image_url = Column(String)
     record = Column(String)
@@ -40,6 +44,9 @@ class Fighter(Base):
     height = Column(String)
     weight_class = Column(String)
     association = Column(String)
+    search_text = Column(String)
+    flag_code = Column(String)
+    content_hash = Column(String)
     last_updated_at = Column(DateTime(timezone=True), nullable=True)    
 
     __table_args__ = (
@@ -53,14 +60,15 @@ class Fight(Base):
 
     id = Column(Integer, primary_key=True)
     event_id = Column(Integer, ForeignKey("events.id", ondelete="CASCADE"), nullable=False)
-    fighter_1_id = Column(Integer, ForeignKey("fighters.id", ondelete="CASCADE"), nullable=False)
-    fighter_2_id = Column(Integer, ForeignKey("fighters.id", ondelete="CASCADE"), nullable=False)
+    fighter_1_id = Column(Integer, ForeignKey("fighters.id", ondelete="CASCADE"), nullable=False, index=True)
+    fighter_2_id = Column(Integer, ForeignKey("fighters.id", ondelete="CASCADE"), nullable=False, index=True)
     match_number = Column(Integer, nullable=False)
     weight_class = Column(String)
     winner = Column(String)
     method = Column(String)
     round = Column(Integer)
     time = Column(String)
+    content_hash = Column(String)
     last_updated_at = Column(DateTime(timezone=True), nullable=True)
     
     __table_args__ = (
@@ -77,7 +85,7 @@ class Prediction(Base):
 
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
-    fight_id = Column(Integer, ForeignKey("fights.id", ondelete="CASCADE"), nullable=False)
+    fight_id = Column(Integer, ForeignKey("fights.id", ondelete="CASCADE"), nullable=False, index=True)
     fighter_id = Column(Integer, ForeignKey("fighters.id", ondelete="CASCADE"), nullable=False)
     method = Column(String, nullable=False)
     round = Column(Integer, nullable=True)
@@ -88,4 +96,48 @@ class Prediction(Base):
 
     user = relationship("User", back_populates="predictions")
     fight = relationship("Fight", back_populates="predictions")
-    fighter = relationship("Fighter", back_populates="predictions")
\ No newline at end of file
+    fighter = relationship("Fighter", back_populates="predictions")
+    score = relationship("PredictionScore", back_populates="prediction", uselist=False, cascade="all, delete-orphan")
+
+class PredictionScore(Base):
+    __tablename__ = "prediction_scores"
+
+    id = Column(Integer, primary_key=True)
+    prediction_id = Column(Integer, ForeignKey("predictions.id", ondelete="CASCADE"), unique=True, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    fight_id = Column(Integer, ForeignKey("fights.id", ondelete="CASCADE"), nullable=False, index=True)
+    fighter_correct = Column(Boolean, nullable=False)
+    method_correct = Column(Boolean, nullable=False)
+    round_correct = Column(Boolean, nullable=False)
+    points = Column(Integer, nullable=False)
+    scored_at = Column(DateTime(timezone=True), nullable=True)
+
+    prediction = relationship("Prediction", back_populates="score")
+
+class LeaderboardEntry(Base):
+    __tablename__ = "leaderboard_entries"
+
+    id = Column(Integer, primary_key=True)
+    scope = Column(String, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    points = Column(Integer, nullable=False, default=0)
+    last_updated_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint("scope", "user_id", name="uix_scope_user"),
+        Index("ix_leaderboard_scope_points", "scope", points.desc(), "user_id"),
+    )
+
+class CrawlState(Base):
+    __tablename__ = "crawl_state"
+
+    id = Column(Integer, primary_key=True)
+    kind = Column(String, nullable=False)
+    url = Column(String, nullable=False)
+    freshness = Column(String, nullable=False)
+    last_crawled_at = Column(DateTime(timezone=True), nullable=False)
+    next_crawl_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("kind", "url", name="uix_crawl_kind_url"),
+    )
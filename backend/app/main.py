@@ -1,12 +1,17 @@
 from fastapi import FastAPI, Depends
 from app.core.config import add_cors
-from app.db.database import engine, get_db
+from app.db.database import engine, get_db, sessionLocal
 from app.db.models import models
+from app.db.migrations import run_migrations
+from app.core.cache import response_cache
+from app.services.search.fighter_typeahead import fighter_typeahead_index
+from app.services.scrapers.http_client import sherdog_session
 from app.api.auth_routes import router as auth_routes
 from app.api.predict_routes import router as predict_routes
 from app.api.event_routes import router as event_routes
 from app.api.fight_routes import router as fight_routes
 from app.api.fighter_routes import router as fighter_routes
+from app.api.leaderboard_routes import router as leaderboard_routes
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import OperationalError
 import time
@@ -24,6 +29,7 @@ def init_db_with_retry() -> None:
     for attempt in range(1, retries + 1):
         try:
             models.Base.metadata.create_all(bind=engine)
+            run_migrations(engine)
             return
         except OperationalError as exc:
             last_error = exc
@@ -39,6 +45,31 @@ app.include_router(predict_routes, prefix="/predict", tags=["Predict"])
 app.include_router(event_routes, prefix="/events", tags=["Events"])
 app.include_router(fight_routes, prefix="/fights", tags=["Fights"])
 app.include_router(fighter_routes, prefix="/fighters", tags=["Fighters"])
+app.include_router(leaderboard_routes, prefix="/leaderboard", tags=["Leaderboard"])
+
+@app.on_event("startup")
+def start_response_cache_listener() -> None:
+    response_cache.add_invalidation_listener(fighter_typeahead_index.handle_invalidation)
+    response_cache.start_listener()
+
+@app.on_event("startup")
+def build_fighter_typeahead_index() -> None:
+    db = sessionLocal()
+    try:
+        fighter_typeahead_index.build(db)
+        print(f"Fighter typeahead index built with {len(fighter_typeahead_index)} fighters")
+    finally:
+        db.close()
+
+@app.get("/scraper/stats")
+def get_scraper_stats(minutes: int = 60) -> dict:
+    """Return the Sherdog request rate, circuit breaker state and per-minute block rate."""
+    return sherdog_session.stats(min(max(minutes, 1), 24 * 60))
+
+@app.get("/cache/stats")
+def get_cache_stats() -> dict[str, int]:
+    """Return the response cache hit/miss counters of this API process."""
+    return dict(response_cache.stats)
 
 @app.get("/")
 def read_root(db: Session = Depends(get_db)):
@@ -14,6 +14,12 @@ class Fighter(BaseModel):
     weight_class: str
     association: str
 
+class FighterSuggestion(BaseModel):
+    id: int
+    name: str
+    nickname: str
+    image_url: str
+
 class FighterSearchResponse(BaseModel):
     fighters: list[Fighter]
     total: int
\ No newline at end of file
@@ -0,0 +1,7 @@
+from pydantic import BaseModel
+
+class LeaderboardEntry(BaseModel):
+    rank: int
+    user_id: int
+    username: str
+    points: int
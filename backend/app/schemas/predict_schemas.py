@@ -23,8 +23,10 @@ class PredictionResult(BaseModel):
     fighter: bool
     method: bool
     round: bool
+    points: int
 
 class PredictionOutPredict(BaseModel):
+    id: int
     event_title: str
     event_date: datetime
     fighter_1_name: str
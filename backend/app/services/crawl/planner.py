@@ -0,0 +1,135 @@
+import os
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import func, or_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app.db.models.models import (
+    CrawlState as CrawlStateModel,
+    Event as EventModel,
+    Fight as FightModel,
+    Fighter as FighterModel,
+)
+from app.schemas.sherdog_schemas import Event as EventSchema
+
+EVENT = "event"
+FIGHTER = "fighter"
+
+# How long a crawl stays valid for each freshness class.
+# Override per class in seconds with CRAWL_TTL_<CLASS>, e.g. CRAWL_TTL_UPCOMING_EVENT=1800.
+DEFAULT_TTLS = {
+    "upcoming_event": timedelta(hours=1),
+    "recent_event": timedelta(days=1),
+    "past_event": timedelta(days=90),
+    "upcoming_fighter": timedelta(days=1),
+    "active_fighter": timedelta(days=7),
+    "retired_fighter": timedelta(days=30),
+}
+
+RECENT_EVENT_WINDOW = timedelta(days=30)
+RETIRED_AFTER = timedelta(days=2 * 365)
+
+def crawl_ttls() -> dict[str, timedelta]:
+    """Return DEFAULT_TTLS with any CRAWL_TTL_<CLASS> environment overrides applied."""
+    return {
+        name: timedelta(seconds=int(os.getenv(f"CRAWL_TTL_{name.upper()}") or ttl.total_seconds()))
+        for name, ttl in DEFAULT_TTLS.items()
+    }
+
+def _as_utc(value: datetime) -> datetime:
+    return value.astimezone(timezone.utc) if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+class CrawlPlanner:
+    """
+    Decides which events and fighters are due for a re-crawl.
+
+    Every successful crawl is recorded in ``crawl_state`` with the freshness class the entity
+    had at the time. An entity is due when it has never been crawled, when its TTL has run out,
+    or when its class changed (e.g. an upcoming card that has now taken place).
+    """
+
+    def __init__(self, db: Session, ttls: dict[str, timedelta] | None = None):
+        self.db = db
+        self.ttls = ttls or crawl_ttls()
+        self.now = datetime.now(timezone.utc)
+
+    def event_freshness(self, event: EventSchema, is_upcoming: bool) -> str:
+        if is_upcoming:
+            return "upcoming_event"
+        if self.now - _as_utc(event.date) <= RECENT_EVENT_WINDOW:
+            return "recent_event"
+        return "past_event"
+
+    def fighter_freshness(self, urls: list[str]) -> dict[str, str]:
+        """Classify the stored fighters among *urls* by the date of their latest bout."""
+        last_fights = (
+            self.db.query(FighterModel.url, func.max(EventModel.date))
+            .outerjoin(FightModel, or_(FightModel.fighter_1_id == FighterModel.id, FightModel.fighter_2_id == FighterModel.id))
+            .outerjoin(EventModel, EventModel.id == FightModel.event_id)
+            .filter(FighterModel.url.in_(urls))
+            .group_by(FighterModel.url)
+            .all()
+        )
+        freshness = {}
+        for url, last_fight in last_fights:
+            if last_fight is not None and _as_utc(last_fight) > self.now:
+                freshness[url] = "upcoming_fighter"
+            elif last_fight is not None and self.now - _as_utc(last_fight) <= RETIRED_AFTER:
+                freshness[url] = "active_fighter"
+            else:
+                freshness[url] = "retired_fighter"
+        return freshness
+
+    def due_events(self, events: list[EventSchema], is_upcoming: bool) -> list[EventSchema]:
+        freshness = {event.url: self.event_freshness(event, is_upcoming) for event in events}
+        due = self._due(EVENT, freshness)
+        return [event for event in events if event.url in due]
+
+    def due_fighters(self, urls: list[str]) -> set[str]:
+        freshness = self.fighter_freshness(urls)
+        # Fighters we have never stored are always due
+        return self._due(FIGHTER, freshness) | (set(urls) - freshness.keys())
+
+    def mark_events(self, events: list[EventSchema], is_upcoming: bool) -> None:
+        self._mark(EVENT, {event.url: self.event_freshness(event, is_upcoming) for event in events})
+
+    def mark_fighters(self, urls: list[str]) -> None:
+        self._mark(FIGHTER, self.fighter_freshness(urls))
+
+    def _due(self, kind: str, freshness: dict[str, str]) -> set[str]:
+        if not freshness:
+            return set()
+        states = {
+            state.url: state
+            for state in self.db.query(CrawlStateModel.url, CrawlStateModel.freshness, CrawlStateModel.next_crawl_at)
+            .filter(CrawlStateModel.kind == kind, CrawlStateModel.url.in_(list(freshness)))
+        }
+        return {
+            url
+            for url, current in freshness.items()
+            if url not in states
+            or states[url].freshness != current
+            or _as_utc(states[url].next_crawl_at) <= self.now
+        }
+
+    def _mark(self, kind: str, freshness: dict[str, str]) -> None:
+        if not freshness:
+            return
+        stmt = insert(CrawlStateModel).values([
+            {
+                "kind": kind,
+                "url": url,
+                "freshness": current,
+                "last_crawled_at": self.now,
+                "next_crawl_at": self.now + self.ttls[current],
+            }
+            for url, current in freshness.items()
+        ])
+        stmt = stmt.on_conflict_do_update(
+            constraint="uix_crawl_kind_url",
+            set_={
+                "freshness": stmt.excluded.freshness,
+                "last_crawled_at": stmt.excluded.last_crawled_at,
+                "next_crawl_at": stmt.excluded.next_crawl_at,
+            },
+        )
+        self.db.execute(stmt)
@@ -0,0 +1,120 @@
+import re
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from difflib import SequenceMatcher
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from app.db.models.models import Event as EventModel
+from app.core.cache import invalidate_on_commit
+from app.core.utils.string_utils import normalize_search_text
+
+# Sherdog's date and ESPN's start time of one event can fall on neighbouring days
+DATE_WINDOW = timedelta(days=2)
+MIN_SCORE = 0.6
+DATE_SOURCE_ESPN = "espn"
+
+_TITLE_SEPARATOR = re.compile(r"\s*:\s*|\s+-\s+")
+
+def normalize_event_title(title: str) -> str:
+    """Title reduced to lower-case alphanumeric words, e.g. "UFC 300: Pereira vs. Hill" -> "ufc 300 pereira vs hill"."""
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", normalize_search_text(title)).split())
+
+def split_event_title(title: str) -> tuple[str, str]:
+    """
+    Split a title into its normalised event name and headline bout, e.g. both
+    "UFC 300 - Pereira vs. Hill" and "UFC 300: Pereira vs. Hill" give ("ufc 300", "pereira hill").
+    """
+    parts = _TITLE_SEPARATOR.split(title, maxsplit=1)
+    name = normalize_event_title(parts[0])
+    headline = normalize_event_title(parts[1]) if len(parts) > 1 else ""
+    return name, " ".join(word for word in headline.split() if word != "vs")
+
+def title_similarity(a: tuple[str, str], b: tuple[str, str]) -> float:
+    """Score in [0, 1] of two split titles naming the same event."""
+    name_a, headline_a = a
+    name_b, headline_b = b
+    # A numbered card ("UFC 300", "UFC Fight Night 240") identifies the event on its own
+    if name_a == name_b and any(char.isdigit() for char in name_a):
+        return 1.0
+    score = SequenceMatcher(None, f"{name_a} {headline_a}", f"{name_b} {headline_b}").ratio()
+    if headline_a and headline_b:
+        # ESPN drops the card number of Fight Nights, so the headline bout carries the match
+        score = max(score, SequenceMatcher(None, headline_a, headline_b).ratio())
+    return score
+
+def _day(value: datetime) -> int:
+    return value.astimezone(timezone.utc).date().toordinal()
+
+class EventReconciler:
+    """
+    Merges ESPN start times into the Sherdog events in one pass.
+
+    Sherdog's event times are unreliable and ESPN's titles don't match ours exactly, so each
+    ESPN event is only compared with the stored events within :data:`DATE_WINDOW` of it, scored
+    by title similarity, and the best pairs are taken greedily, one ESPN event per stored event.
+    Corrected dates are written in a single bulk update and marked with ``date_source``, so the
+    next Sherdog sync keeps them.
+    """
+
+    def __init__(self, db: Session, organizer: str = "UFC"):
+        self.db = db
+        self.organizer = organizer
+
+    def reconcile(self, espn_events: dict[str, datetime]) -> dict[str, int]:
+        """
+        Apply *espn_events* (title -> UTC start time) to the stored events. Only pass events
+        ESPN lists a start time for: every match is written as authoritative.
+        Returns counts of matched and updated events and of unmatched ESPN events.
+        """
+        if not espn_events:
+            return {"matched": 0, "updated": 0, "unmatched": 0}
+
+        earliest = min(espn_events.values()) - DATE_WINDOW
+        latest = max(espn_events.values()) + DATE_WINDOW
+        stored = (
+            self.db.query(EventModel.id, EventModel.title, EventModel.date, EventModel.date_source)
+            .filter(
+                EventModel.organizer == self.organizer,
+                EventModel.date.between(earliest, latest),
+            )
+            .all()
+        )
+
+        # Block by day, so every ESPN event is only scored against the few cards around it
+        by_day = defaultdict(list)
+        for event in stored:
+            by_day[_day(event.date)].append((event, split_event_title(event.title)))
+
+        window_days = DATE_WINDOW.days
+        candidates = []
+        for espn_title, start_time in espn_events.items():
+            espn_split = split_event_title(espn_title)
+            day = _day(start_time)
+            for offset in range(-window_days, window_days + 1):
+                for event, event_split in by_day.get(day + offset, ()):
+                    score = title_similarity(espn_split, event_split)
+                    if score >= MIN_SCORE:
+                        candidates.append((score, -abs(offset), espn_title, event))
+
+        matched_titles = set()
+        matched_ids = set()
+        updates = []
+        now = datetime.now()
+        for score, _, espn_title, event in sorted(candidates, key=lambda c: c[:2], reverse=True):
+            if espn_title in matched_titles or event.id in matched_ids:
+                continue
+            matched_titles.add(espn_title)
+            matched_ids.add(event.id)
+            start_time = espn_events[espn_title]
+            if event.date != start_time or event.date_source != DATE_SOURCE_ESPN:
+                updates.append({"id": event.id, "date": start_time, "date_source": DATE_SOURCE_ESPN, "last_updated_at": now})
+
+        if updates:
+            invalidate_on_commit(self.db, "events")
+            self.db.execute(update(EventModel), updates)
+
+        return {
+            "matched": len(matched_ids),
+            "updated": len(updates),
+            "unmatched": len(espn_events) - len(matched_titles),
+        }
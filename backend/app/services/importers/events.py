@@ -2,16 +2,39 @@ from sqlalchemy.orm import Session
 from datetime import datetime
 from app.db.models.models import Event as EventModel
 from app.schemas.sherdog_schemas import Event as EventSchema
+from app.core.cache import invalidate_on_commit
+from app.core.utils.flag_utils import resolve_flag_code
+from app.core.utils.hash_utils import content_hash
+from app.services.importers.event_reconciler import DATE_SOURCE_ESPN, DATE_WINDOW
 
 class EventsImporter:
     """
     Class for importing events.
+    Events whose written values are unchanged since the last import are not written;
+    ``counts`` tallies inserted, updated and unchanged events.
     """
 
     def __init__(self, db: Session):
         self.db = db
+        self.counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+
+    @staticmethod
+    def _values(event: EventSchema) -> dict:
+        """Return the column values written for *event*, with their content hash."""
+        values = {
+            "url": event.url,
+            "title": event.title,
+            "date": event.date,
+            "location": event.location,
+            "organizer": event.organizer,
+            "flag_code": resolve_flag_code(event.location),
+        }
+        values["content_hash"] = content_hash(values)
+        return values
 
     def upsert(self, event: EventSchema) -> EventModel:
+        values = self._values(event)
+
         existing = (
             self.db.query(EventModel)
             .filter_by(url=event.url)
@@ -20,29 +43,34 @@ class EventsImporter:
         if not existing:
             existing = (
                 self.db.query(EventModel)
-                .filter_by(
-                    date=event.date,
-                    location=event.location,
-                    organizer=event.organizer,
+                .filter(
+                    EventModel.date.between(event.date - DATE_WINDOW, event.date + DATE_WINDOW),
+                    EventModel.location == event.location,
+                    EventModel.organizer == event.organizer,
                 )
                 .first()
             )
+        if existing and existing.content_hash == values["content_hash"]:
+            self.counts["unchanged"] += 1
+            return existing
+
+        invalidate_on_commit(self.db, "events")
         if existing:
             existing.title = event.title
-            existing.date = event.date
+            # Keep a reconciled ESPN start time unless Sherdog has moved the event
+            if existing.date_source != DATE_SOURCE_ESPN or abs(existing.date - event.date) > DATE_WINDOW:
+                existing.date = event.date
+                existing.date_source = None
             existing.location = event.location
             existing.organizer = event.organizer
+            existing.flag_code = values["flag_code"]
+            existing.content_hash = values["content_hash"]
             existing.last_updated_at = datetime.now()
+            self.counts["updated"] += 1
             return existing
         
-        new_event = EventModel(
-            url=event.url,
-            title=event.title,
-            date=event.date,
-            location=event.location,
-            organizer=event.organizer,
-            last_updated_at=datetime.now(),
-        )
+        new_event = EventModel(**values, last_updated_at=datetime.now())
         self.db.add(new_event)
         self.db.flush()
-        return new_event
\ No newline at end of file
+        self.counts["inserted"] += 1
+        return new_event
@@ -1,15 +1,49 @@
+from sqlalchemy import literal_column, or_, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 from datetime import datetime
-from app.db.models.models import Fighter as FighterModel
+from app.db.models.models import Fighter as FighterModel, Fight as FightModel
 from app.schemas.sherdog_schemas import Fighter as FighterSchema
+from app.core.cache import invalidate_on_commit
+from app.core.utils.string_utils import fighter_search_text
+from app.core.utils.flag_utils import resolve_flag_code
+from app.core.utils.hash_utils import content_hash
 
 class FightersImporter:
     """
     Class for importing fighters.
+    Fighters whose written values are unchanged since the last import are not written;
+    ``counts`` tallies inserted, updated and unchanged fighters.
     """
 
+    UPSERT_CHUNK_SIZE = 500
+
     def __init__(self, db: Session):
         self.db = db
+        self.counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+
+    @staticmethod
+    def _values(fighter: FighterSchema) -> dict:
+        """Return the column values written for *fighter*, with their content hash."""
+        values = {
+            "url": fighter.url,
+            "name": fighter.name,
+            "nickname": fighter.nickname,
+            "image_url": fighter.image_url,
+            "record": fighter.record,
+            "ranking": fighter.ranking,
+            "country": fighter.country,
+            "city": fighter.city,
+            "dob": fighter.dob,
+            "height": fighter.height,
+            "weight_class": fighter.weight_class,
+            "association": fighter.association,
+            "search_text": fighter_search_text(fighter.name, fighter.nickname, fighter.weight_class, fighter.country),
+            "flag_code": resolve_flag_code(fighter.country),
+        }
+        values["content_hash"] = content_hash(values)
+        values["last_updated_at"] = datetime.now()
+        return values
 
     def upsert(self, fighter: FighterSchema) -> FighterModel:
         existing = (
@@ -25,37 +59,142 @@ class FightersImporter:
                 .first()
             )
             
+        values = self._values(fighter)
+        if existing and existing.content_hash == values["content_hash"]:
+            self.counts["unchanged"] += 1
+            return existing
+
         if existing:
-            existing.url = fighter.url
-            existing.name = fighter.name
-            existing.nickname = fighter.nickname
-            existing.image_url = fighter.image_url
-            existing.record = fighter.record
-            existing.ranking = fighter.ranking
-            existing.country = fighter.country
-            existing.city = fighter.city
-            existing.dob = fighter.dob
-            existing.height = fighter.height
-            existing.weight_class = fighter.weight_class
-            existing.association = fighter.association
-            existing.last_updated_at = datetime.now()
+            self._invalidate_cached(existing.id)
+            for column, value in values.items():
+                setattr(existing, column, value)
+            self.counts["updated"] += 1
             return existing
           
-        new_fighter = FighterModel(
-            url=fighter.url,
-            name=fighter.name,
-            nickname=fighter.nickname,
-            image_url=fighter.image_url,
-            record=fighter.record,
-            ranking=fighter.ranking,
-            country=fighter.country,
-            city=fighter.city,
-            dob=fighter.dob,
-            height=fighter.height,
-            weight_class=fighter.weight_class,
-            association=fighter.association,
-            last_updated_at=datetime.now(),
-        )
+        new_fighter = FighterModel(**values)
         self.db.add(new_fighter)
         self.db.flush()
-        return new_fighter
\ No newline at end of file
+        invalidate_on_commit(self.db, f"fighters:{new_fighter.id}")
+        self.counts["inserted"] += 1
+        return new_fighter
+
+    def upsert_many(self, fighters: list[FighterSchema]) -> dict[str, int]:
+        """
+        Upsert a batch of fighters with chunked ``INSERT ... ON CONFLICT (url) DO UPDATE`` statements.
+        Fighters whose URL is unknown but whose name and weight class match an existing row take over
+        that row, as in :meth:`upsert`. Rows whose content hash already matches are left untouched.
+        Returns a mapping of fighter URL to fighter id.
+        """
+        by_url: dict[str, FighterSchema] = {}
+        by_name_weight: dict[tuple[str, str], str] = {}
+        aliases: dict[str, str] = {}
+        for fighter in fighters:
+            key = (fighter.name, fighter.weight_class)
+            previous_url = by_name_weight.get(key)
+            if previous_url is not None and previous_url != fighter.url:
+                # Later duplicates win, exactly as repeated single upserts would overwrite the row
+                by_url.pop(previous_url, None)
+                aliases[previous_url] = fighter.url
+            aliases.pop(fighter.url, None)
+            by_url[fighter.url] = fighter
+            by_name_weight[key] = fighter.url
+
+        if not by_url:
+            return {}
+
+        urls = list(by_url)
+        known_urls = {
+            url
+            for start in range(0, len(urls), self.UPSERT_CHUNK_SIZE)
+            for (url,) in self.db.query(FighterModel.url).filter(FighterModel.url.in_(urls[start:start + self.UPSERT_CHUNK_SIZE]))
+        }
+
+        unknown = [by_url[url] for url in urls if url not in known_urls]
+        renames = []
+        for start in range(0, len(unknown), self.UPSERT_CHUNK_SIZE):
+            chunk = unknown[start:start + self.UPSERT_CHUNK_SIZE]
+            matches = (
+                self.db.query(FighterModel.id, FighterModel.name, FighterModel.weight_class)
+                .filter(tuple_(FighterModel.name, FighterModel.weight_class).in_(
+                    [(fighter.name, fighter.weight_class) for fighter in chunk]
+                ))
+                .all()
+            )
+            renames.extend(
+                {"id": match.id, "url": by_name_weight[(match.name, match.weight_class)]}
+                for match in matches
+            )
+        if renames:
+            # Point the name/weight-class matches at their new URL so the upsert below conflicts on it
+            self.db.execute(update(FighterModel), renames)
+
+        ids_by_url: dict[str, int] = {}
+        written_ids: list[int] = []
+        updated_ids: list[int] = []
+        stmt = insert(FighterModel)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[FighterModel.url],
+            set_={column: stmt.excluded[column] for column in self._values(fighters[0]) if column != "url"},
+            where=FighterModel.content_hash.is_distinct_from(stmt.excluded.content_hash),
+        ).returning(FighterModel.id, FighterModel.url, literal_column("xmax = 0").label("inserted"))
+        for start in range(0, len(urls), self.UPSERT_CHUNK_SIZE):
+            # executemany with RETURNING is sent as batched multi-row VALUES by the psycopg2 dialect
+            rows = [self._values(by_url[url]) for url in urls[start:start + self.UPSERT_CHUNK_SIZE]]
+            for row in self.db.execute(stmt, rows):
+                ids_by_url[row.url] = row.id
+                written_ids.append(row.id)
+                if row.inserted:
+                    self.counts["inserted"] += 1
+                else:
+                    updated_ids.append(row.id)
+                    self.counts["updated"] += 1
+
+        # Rows skipped by the WHERE clause return nothing, so look their ids up
+        unchanged_urls = [url for url in urls if url not in ids_by_url]
+        for start in range(0, len(unchanged_urls), self.UPSERT_CHUNK_SIZE):
+            chunk = unchanged_urls[start:start + self.UPSERT_CHUNK_SIZE]
+            ids_by_url.update(
+                self.db.query(FighterModel.url, FighterModel.id).filter(FighterModel.url.in_(chunk)).all()
+            )
+        self.counts["unchanged"] += len(unchanged_urls)
+
+        for old_url, new_url in aliases.items():
+            while new_url in aliases:
+                new_url = aliases[new_url]
+            ids_by_url[old_url] = ids_by_url[new_url]
+
+        self._invalidate_cached_many(written_ids, updated_ids)
+        return ids_by_url
+
+    def _invalidate_cached(self, fighter_id: int) -> None:
+        """Invalidate the cached profile of the fighter and every fight card they appear on."""
+        event_ids = (
+            self.db.query(FightModel.event_id)
+            .filter((FightModel.fighter_1_id == fighter_id) | (FightModel.fighter_2_id == fighter_id))
+            .distinct()
+            .all()
+        )
+        invalidate_on_commit(
+            self.db,
+            f"fighters:{fighter_id}",
+            "events:main",
+            *(f"fights:event:{event_id}" for (event_id,) in event_ids),
+        )
+
+    def _invalidate_cached_many(self, fighter_ids: list[int], updated_ids: list[int]) -> None:
+        """Bulk version of :meth:`_invalidate_cached`; only updated fighters can be on a cached card."""
+        event_ids = []
+        for start in range(0, len(updated_ids), self.UPSERT_CHUNK_SIZE):
+            chunk = updated_ids[start:start + self.UPSERT_CHUNK_SIZE]
+            event_ids.extend(
+                event_id
+                for (event_id,) in self.db.query(FightModel.event_id)
+                .filter(or_(FightModel.fighter_1_id.in_(chunk), FightModel.fighter_2_id.in_(chunk)))
+                .distinct()
+            )
+        invalidate_on_commit(
+            self.db,
+            "events:main",
+            *(f"fighters:{fighter_id}" for fighter_id in set(fighter_ids)),
+            *(f"fights:event:{event_id}" for event_id in set(event_ids)),
+        )
\ No newline at end of file
@@ -1,3 +1,4 @@
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 from datetime import datetime
 from app.db.models.models import (
@@ -6,14 +7,38 @@ from app.db.models.models import (
     Fighter as FighterModel,
 )
 from app.schemas.sherdog_schemas import Fight as FightSchema
+from app.services.scoring.prediction_scorer import PredictionScorer
+from app.core.cache import invalidate_on_commit
+from app.core.utils.hash_utils import content_hash
 
 class FightsImporter:
     """
     Class for importing fights.
+    Fights whose written values are unchanged since the last import are not written;
+    ``counts`` tallies inserted, updated and unchanged fights.
     """
 
     def __init__(self, db: Session):
         self.db = db
+        self.counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+
+    @staticmethod
+    def _values(fight: FightSchema, event_id: int, fighter_1_id: int, fighter_2_id: int) -> dict:
+        """Return the column values written for *fight*, with their content hash."""
+        values = {
+            "event_id": event_id,
+            "fighter_1_id": fighter_1_id,
+            "fighter_2_id": fighter_2_id,
+            "match_number": fight.match_number,
+            "weight_class": fight.weight_class,
+            "winner": fight.winner,
+            "method": fight.method,
+            "round": fight.round,
+            "time": fight.time,
+        }
+        values["content_hash"] = content_hash(values)
+        values["last_updated_at"] = datetime.now()
+        return values
 
     def upsert(self, fight: FightSchema) -> FightModel:
         event = (
@@ -45,31 +70,106 @@ class FightsImporter:
             .filter_by(event_id=event.id, match_number=fight.match_number)
             .first()
         )
+        values = self._values(fight, event.id, fighter_1.id, fighter_2.id)
+        if existing and existing.content_hash == values["content_hash"]:
+            self.counts["unchanged"] += 1
+            return existing
+
+        invalidate_on_commit(self.db, f"fights:event:{event.id}", "events:main")
         if existing:
-            existing.event_id = event.id
-            existing.fighter_1_id = fighter_1.id
-            existing.fighter_2_id = fighter_2.id
-            existing.match_number = fight.match_number
-            existing.weight_class = fight.weight_class
-            existing.winner = fight.winner
-            existing.method = fight.method
-            existing.round = fight.round
-            existing.time = fight.time
-            existing.last_updated_at = datetime.now()
+            result_changed = (
+                existing.winner != fight.winner
+                or existing.fighter_1_id != fighter_1.id
+                or existing.method != fight.method
+                or existing.round != fight.round
+            )
+            for column, value in values.items():
+                setattr(existing, column, value)
+            self.counts["updated"] += 1
+            if result_changed:
+                PredictionScorer(self.db).score_fight(existing)
             return existing
         
-        new_fight = FightModel(
-            event_id=event.id,
-            fighter_1_id=fighter_1.id,
-            fighter_2_id=fighter_2.id,
-            match_number=fight.match_number,
-            weight_class=fight.weight_class,
-            winner=fight.winner,
-            method=fight.method,
-            round=fight.round,
-            time=fight.time,
-            last_updated_at=datetime.now(),
-        )
+        new_fight = FightModel(**values)
         self.db.add(new_fight)
         self.db.flush()
-        return new_fight
\ No newline at end of file
+        self.counts["inserted"] += 1
+        return new_fight
+
+    def upsert_card(self, fights: list[FightSchema]) -> list[FightModel]:
+        """
+        Upsert every bout of one event card with a single ``INSERT ... ON CONFLICT`` on
+        ``uix_event_match_number``. The event and all fighters are resolved up front, so a card
+        costs a fixed handful of queries plus one rescore per fight whose result changed.
+        Bouts whose content hash already matches are left untouched; returns the written fights.
+        """
+        if not fights:
+            return []
+
+        event_urls = {fight.event_url for fight in fights}
+        if len(event_urls) != 1:
+            raise ValueError(f"Fights span several events: {sorted(event_urls)}")
+        event_url = event_urls.pop()
+
+        event_id = self.db.query(EventModel.id).filter_by(url=event_url).scalar()
+        if event_id is None:
+            raise ValueError(f"Event with URL {event_url} not found")
+
+        fighter_urls = {fight.fighter_1_url for fight in fights} | {fight.fighter_2_url for fight in fights}
+        fighter_ids = dict(
+            self.db.query(FighterModel.url, FighterModel.id)
+            .filter(FighterModel.url.in_(fighter_urls))
+            .all()
+        )
+        missing = fighter_urls - fighter_ids.keys()
+        if missing:
+            raise ValueError(f"Fighters with URLs {sorted(missing)} not found")
+
+        previous_results = {
+            row.match_number: (row.winner, row.fighter_1_id, row.method, row.round)
+            for row in self.db.query(
+                FightModel.match_number,
+                FightModel.winner,
+                FightModel.fighter_1_id,
+                FightModel.method,
+                FightModel.round,
+            ).filter_by(event_id=event_id)
+        }
+
+        # ON CONFLICT cannot touch the same row twice in one statement, so the last bout per slot wins
+        values_by_match = {
+            fight.match_number: self._values(
+                fight, event_id, fighter_ids[fight.fighter_1_url], fighter_ids[fight.fighter_2_url]
+            )
+            for fight in fights
+        }
+
+        stmt = insert(FightModel).values(list(values_by_match.values()))
+        stmt = stmt.on_conflict_do_update(
+            constraint="uix_event_match_number",
+            set_={
+                column: stmt.excluded[column]
+                for column in (
+                    "fighter_1_id", "fighter_2_id", "weight_class", "winner", "method", "round", "time",
+                    "content_hash", "last_updated_at",
+                )
+            },
+            where=FightModel.content_hash.is_distinct_from(stmt.excluded.content_hash),
+        ).returning(FightModel)
+        upserted = self.db.scalars(stmt, execution_options={"populate_existing": True}).all()
+
+        num_updated = sum(1 for fight in upserted if fight.match_number in previous_results)
+        self.counts["inserted"] += len(upserted) - num_updated
+        self.counts["updated"] += num_updated
+        self.counts["unchanged"] += len(values_by_match) - len(upserted)
+        if not upserted:
+            return []
+
+        invalidate_on_commit(self.db, f"fights:event:{event_id}", "events:main")
+
+        scorer = PredictionScorer(self.db)
+        for fight in upserted:
+            previous = previous_results.get(fight.match_number)
+            if previous is not None and previous != (fight.winner, fight.fighter_1_id, fight.method, fight.round):
+                scorer.score_fight(fight)
+        return upserted
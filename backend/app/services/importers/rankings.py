@@ -1,19 +1,44 @@
+from collections import defaultdict
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 from datetime import datetime
 from app.db.models.models import Fighter as FighterModel
+from app.core.cache import invalidate_on_commit
+from app.core.utils.string_utils import normalize_search_text
+
+# Spellings of a division on UFC.com and Sherdog, keyed by their normalised form
+WEIGHT_CLASS_ALIASES = {
+    "light heavy weight": "light heavyweight",
+    "light-heavyweight": "light heavyweight",
+    "lt heavyweight": "light heavyweight",
+}
+
+def name_key(name: str) -> tuple[str, ...]:
+    """Accent-stripped, lower-cased name tokens in sorted order, so "Jiří Procházka" == "Prochazka Jiri"."""
+    return tuple(sorted(normalize_search_text(name).replace("-", " ").split()))
+
+def weight_class_key(weight_class: str | None) -> str:
+    """Normalised division, ignoring the "Women's" prefix and known alternative spellings."""
+    key = normalize_search_text(weight_class or "")
+    for prefix in ("women's ", "womens "):
+        if key.startswith(prefix):
+            key = key[len(prefix):]
+    return WEIGHT_CLASS_ALIASES.get(key, key)
 
 class RankingsImporter:
     """
     Class for importing rankings.
+
+    Fighter names are resolved in memory against an index of every fighter loaded in one
+    query, and only the fighters whose ranking changed are written, in one bulk update.
     """
 
     def __init__(self, db: Session):
         self.db = db
-        self.reset_rankings()
     
     def apply_rankings(self, rankings: dict[str, list[tuple[str, str]]]) -> None:
         """
-        Applies the rankings to the fighters.
+        Applies the rankings to the fighters. Fighters missing from *rankings* lose their ranking.
         """
         total_fighters = sum(len(entries) for entries in rankings.values())
         ranked_count = 0
@@ -21,23 +46,39 @@ class RankingsImporter:
         missing_fighters = []
         
         print(f"📊 Starting rankings import for {total_fighters} fighters across {len(rankings)} weight classes")
-        
+
+        fighters = self.db.query(FighterModel.id, FighterModel.name, FighterModel.weight_class, FighterModel.ranking).all()
+        by_name_and_weight = {}
+        by_name = defaultdict(list)
+        for fighter in fighters:
+            key = name_key(fighter.name)
+            by_name_and_weight.setdefault((key, weight_class_key(fighter.weight_class)), fighter)
+            by_name[key].append(fighter)
+
+        new_rankings = {}
         for weight_class, entries in rankings.items():
             print(f"  Processing {weight_class}: {len(entries)} fighters")
             for name, rank in entries:
-                fighter = self._find_fighter_by_name_and_weight(name, weight_class)
+                fighter = self._resolve(by_name_and_weight, by_name, name, weight_class)
                 
                 if not fighter:
                     missing_fighters.append(f"{name} ({weight_class})")
                     missing_count += 1
                     continue
 
-                fighter.ranking = rank
-                fighter.last_updated_at = datetime.now()
+                new_rankings[fighter.id] = rank
                 ranked_count += 1
                 print(f"    ✓ Ranked {name} as {rank} in {weight_class}")
-        
-        self.db.flush()
+
+        now = datetime.now()
+        changes = [
+            {"id": fighter.id, "ranking": new_rankings.get(fighter.id, ""), "last_updated_at": now}
+            for fighter in fighters
+            if (fighter.ranking or "") != new_rankings.get(fighter.id, "")
+        ]
+        if changes:
+            invalidate_on_commit(self.db, "fighters", "fights", "events:main")
+            self.db.execute(update(FighterModel), changes)
         
         if missing_fighters:
             print(f"⚠️  Missing fighters ({len(missing_fighters)}):")
@@ -46,56 +87,23 @@ class RankingsImporter:
             if len(missing_fighters) > 10:
                 print(f"    ... and {len(missing_fighters) - 10} more")
         
-        print(f"✅ Rankings import completed: {ranked_count} fighters ranked, {missing_count} not found")
+        print(f"✅ Rankings import completed: {ranked_count} fighters ranked, {missing_count} not found, {len(changes)} rankings changed")
     
-    def _find_fighter_by_name_and_weight(self, name: str, weight_class: str) -> FighterModel:
+    def _resolve(self, by_name_and_weight: dict, by_name: dict, name: str, weight_class: str):
         """
-        Find fighter by name and weight class, trying multiple name formats and weight class variations.
-        First try the exact name. Then try the reversed name.
-        Also tries weight class variations (e.g., "Lightweight" vs "Light Heavyweight").
+        Find a ranked fighter in the name index: by name tokens and division first, then by
+        name tokens alone, since fighters change weight classes.
         """
-        # Try exact match first
-        fighter = (
-            self.db.query(FighterModel)
-            .filter_by(name=name, weight_class=weight_class)
-            .first()
-        )
-        
+        key = name_key(name)
+        fighter = by_name_and_weight.get((key, weight_class_key(weight_class)))
         if fighter:
             return fighter
-            
-        # Try reversed name with exact weight class
-        name_parts = name.split()
-        if len(name_parts) == 2:
-            reversed_name = f"{name_parts[1]} {name_parts[0]}"
-            fighter = (
-                self.db.query(FighterModel)
-                .filter_by(name=reversed_name, weight_class=weight_class)
-                .first()
-            )
-            
-            if fighter:
-                return fighter
-        
-        # If still not found, try to find by name only and log weight class mismatch
-        fighter = self.db.query(FighterModel).filter_by(name=name).first()
-        if fighter:
+
+        candidates = by_name.get(key)
+        if candidates:
+            # Prefer a namesake who is already ranked somewhere
+            fighter = next((candidate for candidate in candidates if candidate.ranking), candidates[0])
             print(f"    ⚠️ Found {name} but weight class mismatch: DB has '{fighter.weight_class}', looking for '{weight_class}'")
-            # Still return the fighter if found by name only, since fighters can change weight classes
             return fighter
-            
-        # Try reversed name without weight class constraint
-        if len(name_parts) == 2:
-            fighter = self.db.query(FighterModel).filter_by(name=reversed_name).first()
-            if fighter:
-                print(f"    ⚠️ Found {reversed_name} but weight class mismatch: DB has '{fighter.weight_class}', looking for '{weight_class}'")
-                return fighter
-        
-        return None
 
-    def reset_rankings(self) -> None:
-        """
-        Resets the rankings of all fighters.
-        """
-        self.db.query(FighterModel).update({"ranking": ""})
-        self.db.flush()
\ No newline at end of file
+        return None
\ No newline at end of file
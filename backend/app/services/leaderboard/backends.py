@@ -0,0 +1,366 @@
+import os
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime
+from redis import RedisError
+from sqlalchemy import and_, event, func, or_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app.db.models.models import (
+    Fight as FightModel,
+    LeaderboardEntry as LeaderboardEntryModel,
+    PredictionScore as PredictionScoreModel,
+)
+
+GLOBAL_SCOPE = "global"
+
+def event_scope(event_id: int) -> str:
+    """Return the leaderboard scope for a single event."""
+    return f"event:{event_id}"
+
+# Scopes whose stale flag could not be written to Redis either; retried on this process's next flush
+_unflagged_stale_scopes: set[str] = set()
+
+def _after_commit(db: Session, name: str, flush, factory=dict):
+    """
+    Return the per-transaction buffer *name* on *db*, created with *factory*.
+    The buffer is handed to *flush* once the transaction commits and dropped if it rolls back,
+    so Redis never sees writes the database did not keep.
+    """
+    key = f"leaderboard_{name}"
+    buffer = db.info.get(key)
+    if buffer is None:
+        buffer = db.info[key] = factory()
+        event.listen(db, "after_commit", lambda session: flush(session.info.pop(key, factory())), once=True)
+        event.listen(db, "after_rollback", lambda session: session.info.pop(key, None), once=True)
+    return buffer
+
+class LeaderboardBackend(ABC):
+    """
+    Sorted store of per-scope user points.
+    A scope is either :data:`GLOBAL_SCOPE` or :func:`event_scope`.
+    """
+
+    @abstractmethod
+    def apply_deltas(self, deltas: dict[tuple[str, int], int]) -> None:
+        """Add the ``points`` delta for every ``(scope, user_id)`` key."""
+
+    @abstractmethod
+    def top(self, scope: str, offset: int, limit: int) -> list[tuple[int, int]]:
+        """Return ``(user_id, points)`` pairs ordered by points, highest first."""
+
+    @abstractmethod
+    def rank(self, scope: str, user_id: int) -> tuple[int, int] | None:
+        """Return ``(rank, points)`` for *user_id* (rank 1 is the leader), or None if unranked."""
+
+    @abstractmethod
+    def rebuild(self, totals: dict[tuple[str, int], int]) -> None:
+        """Replace every standing with *totals*."""
+
+class RedisRankIndex:
+    """
+    Redis copy of the ``leaderboard_entries`` standings that answers rank lookups in O(log n).
+
+    Members are zero-padded user ids scored with their negated points, so ZRANK orders them like
+    the table's ``(points DESC, user_id)`` index. The table stays the source of truth: a scope is
+    loaded from it on its first lookup and expires after ``INDEX_TTL``, deltas are only sent after
+    commit and only to scopes that are loaded, and a member whose score disagrees with the table
+    is corrected rather than trusted. A delta lost to a Redis error can skew the ranks of others
+    until the scope expires and reloads.
+    """
+
+    KEY_PREFIX = "leaderboard_rank:"
+    INDEX_TTL = 3600
+    # Increment only scopes that are already loaded, so a delta never creates a partial index
+    _INCREMENT_LOADED = (
+        "if redis.call('EXISTS', KEYS[1]) == 1 then "
+        "return redis.call('ZINCRBY', KEYS[1], ARGV[1], ARGV[2]) end"
+    )
+
+    def __init__(self, db: Session, client=None):
+        if client is None:
+            from app.common.redis_client import redis_client as client
+        self.db = db
+        self.client = client
+
+    def _key(self, scope: str) -> str:
+        return f"{self.KEY_PREFIX}{scope}"
+
+    @staticmethod
+    def _member(user_id: int) -> str:
+        return f"{user_id:012d}"
+
+    def apply_deltas(self, deltas: dict[tuple[str, int], int]) -> None:
+        pending = _after_commit(self.db, "rank_deltas", self._flush)
+        for key, delta in deltas.items():
+            pending[key] = pending.get(key, 0) + delta
+
+    def _flush(self, pending: dict[tuple[str, int], int]) -> None:
+        pending = {key: delta for key, delta in pending.items() if delta}
+        if not pending:
+            return
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for (scope, user_id), delta in pending.items():
+                pipe.eval(self._INCREMENT_LOADED, 1, self._key(scope), -delta, self._member(user_id))
+            pipe.execute()
+        except RedisError as exc:
+            # Lookups notice the stale scores and correct them
+            print(f"Failed to update the leaderboard rank index: {exc}")
+
+    def clear(self) -> None:
+        """Drop every loaded scope once the transaction commits; each reloads on its next lookup."""
+        _after_commit(self.db, "rank_clear", lambda _: self._clear())
+
+    def _clear(self) -> None:
+        try:
+            keys = list(self.client.scan_iter(f"{self.KEY_PREFIX}*"))
+            if keys:
+                self.client.delete(*keys)
+        except RedisError as exc:
+            print(f"Failed to clear the leaderboard rank index: {exc}")
+
+    def _load(self, scope: str) -> None:
+        """Copy the standings of *scope* from the table, swapping them in with one RENAME."""
+        rows = (
+            self.db.query(LeaderboardEntryModel.user_id, LeaderboardEntryModel.points)
+            .filter(LeaderboardEntryModel.scope == scope)
+            .all()
+        )
+        if not rows:
+            return
+        loading_key = f"{self._key(scope)}:loading:{uuid.uuid4().hex}"
+        pipe = self.client.pipeline(transaction=False)
+        for start in range(0, len(rows), 5000):
+            pipe.zadd(loading_key, {self._member(row.user_id): -row.points for row in rows[start:start + 5000]})
+        pipe.rename(loading_key, self._key(scope))
+        pipe.expire(self._key(scope), self.INDEX_TTL)
+        pipe.execute()
+
+    def rank(self, scope: str, user_id: int, points: int) -> int | None:
+        """Return the rank of *user_id*, who has *points* in the table, or None if Redis can't tell."""
+        key, member = self._key(scope), self._member(user_id)
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            pipe.exists(key)
+            pipe.zscore(key, member)
+            loaded, score = pipe.execute()
+            if not loaded:
+                self._load(scope)
+            elif score is None or -int(score) != points:
+                self.client.zadd(key, {member: -points})
+            position = self.client.zrank(key, member)
+        except RedisError as exc:
+            print(f"Leaderboard rank index unavailable: {exc}")
+            return None
+        return position + 1 if position is not None else None
+
+class PostgresLeaderboard(LeaderboardBackend):
+    """
+    Leaderboard kept in the ``leaderboard_entries`` table.
+    Reads walk the ``(scope, points DESC, user_id)`` index; writes happen inside the caller's transaction.
+    Ranks come from *rank_index* when given, and otherwise from counting the rows ahead.
+    """
+
+    def __init__(self, db: Session, rank_index: RedisRankIndex | None = None):
+        self.db = db
+        self.rank_index = rank_index
+
+    def apply_deltas(self, deltas: dict[tuple[str, int], int]) -> None:
+        values = [
+            {"scope": scope, "user_id": user_id, "points": delta, "last_updated_at": datetime.now()}
+            for (scope, user_id), delta in deltas.items()
+            if delta
+        ]
+        if not values:
+            return
+
+        stmt = insert(LeaderboardEntryModel).values(values)
+        stmt = stmt.on_conflict_do_update(
+            constraint="uix_scope_user",
+            set_={
+                "points": LeaderboardEntryModel.points + stmt.excluded.points,
+                "last_updated_at": stmt.excluded.last_updated_at,
+            },
+        )
+        self.db.execute(stmt)
+        if self.rank_index is not None:
+            self.rank_index.apply_deltas(deltas)
+
+    def top(self, scope: str, offset: int, limit: int) -> list[tuple[int, int]]:
+        rows = (
+            self.db.query(LeaderboardEntryModel.user_id, LeaderboardEntryModel.points)
+            .filter(LeaderboardEntryModel.scope == scope)
+            .order_by(LeaderboardEntryModel.points.desc(), LeaderboardEntryModel.user_id)
+            .offset(offset)
+            .limit(limit)
+            .all()
+        )
+        return [(row.user_id, row.points) for row in rows]
+
+    def rank(self, scope: str, user_id: int) -> tuple[int, int] | None:
+        entry = (
+            self.db.query(LeaderboardEntryModel.points)
+            .filter_by(scope=scope, user_id=user_id)
+            .first()
+        )
+        if entry is None:
+            return None
+
+        if self.rank_index is not None:
+            rank = self.rank_index.rank(scope, user_id, entry.points)
+            if rank is not None:
+                return rank, entry.points
+
+        # Counting the rows ahead costs O(rank)
+        ahead = (
+            self.db.query(func.count(LeaderboardEntryModel.id))
+            .filter(
+                LeaderboardEntryModel.scope == scope,
+                or_(
+                    LeaderboardEntryModel.points > entry.points,
+                    and_(LeaderboardEntryModel.points == entry.points, LeaderboardEntryModel.user_id < user_id),
+                ),
+            )
+            .scalar()
+        )
+        return ahead + 1, entry.points
+
+    def rebuild(self, totals: dict[tuple[str, int], int]) -> None:
+        self.db.query(LeaderboardEntryModel).delete(synchronize_session=False)
+        values = [
+            {"scope": scope, "user_id": user_id, "points": points, "last_updated_at": datetime.now()}
+            for (scope, user_id), points in totals.items()
+        ]
+        for start in range(0, len(values), 1000):
+            self.db.execute(insert(LeaderboardEntryModel).values(values[start:start + 1000]))
+        if self.rank_index is not None:
+            self.rank_index.clear()
+
+class RedisLeaderboard(LeaderboardBackend):
+    """
+    Leaderboard kept in one Redis sorted set per scope, giving O(log n) rank and top-N reads.
+    Writes are buffered on the session and only sent once the database transaction commits,
+    so a rolled-back import never leaks points into Redis. The scores are committed by then, so
+    a write that fails cannot be retried; its scopes are flagged instead, and the next read of a
+    flagged scope rebuilds it from ``prediction_scores``.
+    """
+
+    KEY_PREFIX = "leaderboard:"
+    STALE_KEY = "leaderboard-stale"
+
+    def __init__(self, db: Session, client=None):
+        if client is None:
+            from app.common.redis_client import redis_client as client
+        self.db = db
+        self.client = client
+
+    def _key(self, scope: str) -> str:
+        return f"{self.KEY_PREFIX}{scope}"
+
+    def _pending(self) -> dict:
+        return _after_commit(self.db, "writes", self._flush, factory=lambda: {"rebuild": None, "deltas": {}})
+
+    def apply_deltas(self, deltas: dict[tuple[str, int], int]) -> None:
+        pending = self._pending()["deltas"]
+        for key, delta in deltas.items():
+            pending[key] = pending.get(key, 0) + delta
+
+    def _flush(self, pending: dict) -> None:
+        deltas = {key: delta for key, delta in pending["deltas"].items() if delta}
+        try:
+            if pending["rebuild"] is not None:
+                self._replace(pending["rebuild"])
+            if deltas:
+                pipe = self.client.pipeline(transaction=False)
+                for (scope, user_id), delta in deltas.items():
+                    pipe.zincrby(self._key(scope), delta, user_id)
+                pipe.execute()
+        except RedisError as exc:
+            print(f"Failed to update the Redis leaderboard, flagging its scopes for a rebuild: {exc}")
+            _unflagged_stale_scopes.update(scope for scope, _ in (pending["rebuild"] or {}))
+            _unflagged_stale_scopes.update(scope for scope, _ in deltas)
+        self._flag_stale()
+
+    def _flag_stale(self) -> None:
+        """Write the scopes of failed updates to the stale set; kept in process until that succeeds."""
+        if not _unflagged_stale_scopes:
+            return
+        scopes = list(_unflagged_stale_scopes)
+        try:
+            self.client.sadd(self.STALE_KEY, *scopes)
+        except RedisError as exc:
+            print(f"Failed to flag {len(scopes)} leaderboard scopes for a rebuild, retrying on the next update: {exc}")
+            return
+        _unflagged_stale_scopes.difference_update(scopes)
+
+    def _read(self, scope: str, queue) -> list:
+        """Run the reads *queue* adds to a pipeline, rebuilding *scope* first if it is flagged stale."""
+        for attempt in range(2):
+            pipe = self.client.pipeline(transaction=False)
+            pipe.sismember(self.STALE_KEY, scope)
+            queue(pipe)
+            stale, *results = pipe.execute()
+            if not stale or attempt:
+                return results
+            self._rebuild_scope(scope)
+
+    def _rebuild_scope(self, scope: str) -> None:
+        """Replace the standings of *scope* with the totals of the stored scores."""
+        # Unflag first: an update failing while the scores are read flags the scope again
+        self.client.srem(self.STALE_KEY, scope)
+        query = self.db.query(PredictionScoreModel.user_id, func.sum(PredictionScoreModel.points).label("points"))
+        if scope != GLOBAL_SCOPE:
+            event_id = int(scope.removeprefix("event:"))
+            query = (
+                query.join(FightModel, PredictionScoreModel.fight_id == FightModel.id)
+                .filter(FightModel.event_id == event_id)
+            )
+        members = {str(row.user_id): row.points for row in query.group_by(PredictionScoreModel.user_id)}
+
+        pipe = self.client.pipeline(transaction=True)
+        pipe.delete(self._key(scope))
+        if members:
+            pipe.zadd(self._key(scope), members)
+        pipe.execute()
+
+    def top(self, scope: str, offset: int, limit: int) -> list[tuple[int, int]]:
+        (entries,) = self._read(
+            scope, lambda pipe: pipe.zrevrange(self._key(scope), offset, offset + limit - 1, withscores=True)
+        )
+        return [(int(user_id), int(points)) for user_id, points in entries]
+
+    def rank(self, scope: str, user_id: int) -> tuple[int, int] | None:
+        def queue(pipe):
+            pipe.zrevrank(self._key(scope), user_id)
+            pipe.zscore(self._key(scope), user_id)
+
+        rank, points = self._read(scope, queue)
+        if rank is None:
+            return None
+        return rank + 1, int(points)
+
+    def rebuild(self, totals: dict[tuple[str, int], int]) -> None:
+        pending = self._pending()
+        # The totals already include every delta applied so far in this transaction
+        pending["deltas"].clear()
+        pending["rebuild"] = totals
+
+    def _replace(self, totals: dict[tuple[str, int], int]) -> None:
+        by_scope: dict[str, dict[str, int]] = {}
+        for (scope, user_id), points in totals.items():
+            by_scope.setdefault(scope, {})[str(user_id)] = points
+
+        pipe = self.client.pipeline(transaction=True)
+        for key in self.client.scan_iter(f"{self.KEY_PREFIX}*"):
+            pipe.delete(key)
+        for scope, members in by_scope.items():
+            pipe.zadd(self._key(scope), members)
+        pipe.execute()
+
+def get_leaderboard(db: Session) -> LeaderboardBackend:
+    """Return the leaderboard backend selected by ``LEADERBOARD_BACKEND`` (``postgres`` or ``redis``)."""
+    backend = os.getenv("LEADERBOARD_BACKEND", "postgres").lower()
+    if backend == "redis":
+        return RedisLeaderboard(db)
+    return PostgresLeaderboard(db, RedisRankIndex(db))
@@ -0,0 +1,226 @@
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert
+from datetime import datetime
+from app.db.models.models import (
+    Fight as FightModel,
+    Prediction as PredictionModel,
+    PredictionScore as PredictionScoreModel,
+)
+from app.services.leaderboard.backends import GLOBAL_SCOPE, event_scope, get_leaderboard
+
+FIGHTER_POINTS = 3
+METHOD_POINTS = 2
+ROUND_POINTS = 1
+
+def normalize_method(method: str | None) -> str | None:
+    """Map a raw Sherdog method string (e.g. "KO (Punches)") onto a prediction :class:`Method` value."""
+
+    if not method:
+        return None
+
+    method_lower = method.lower()
+    if "decision" in method_lower:
+        return "DECISION"
+    if "submission" in method_lower or method_lower.startswith("sub"):
+        return "SUBMISSION"
+    if any(term in method_lower for term in ["ko", "tko", "knockout", "technical knockout"]):
+        return "KO"
+    return None
+
+def score_prediction(
+    predicted_fighter_id: int,
+    predicted_method: str | None,
+    predicted_round: int | None,
+    fight_winner: str | None,
+    fight_winner_id: int,
+    fight_method: str | None,
+    fight_round: int | None,
+) -> tuple[bool, bool, bool, int] | None:
+    """
+    Score a single prediction against a fight result.
+    Returns ``(fighter_correct, method_correct, round_correct, points)``, or None if the fight has no result yet.
+    """
+    if not fight_winner:
+        return None
+
+    if fight_winner.lower() in ["draw", "no contest"] or fight_winner_id != predicted_fighter_id:
+        return False, False, False, 0
+
+    normalized_actual = normalize_method(fight_method)
+    method_correct = bool(predicted_method) and normalized_actual is not None and normalized_actual == predicted_method
+
+    round_correct = False
+    if normalized_actual == "DECISION":
+        round_correct = True
+    elif fight_round and predicted_round:
+        round_correct = fight_round == predicted_round
+
+    points = FIGHTER_POINTS + (METHOD_POINTS if method_correct else 0) + (ROUND_POINTS if round_correct else 0)
+    return True, method_correct, round_correct, points
+
+class PredictionScorer:
+    """
+    Class for materialising prediction scores into the ``prediction_scores`` table.
+    Every change in points is forwarded to the leaderboard as an incremental delta.
+    """
+
+    def __init__(self, db: Session, batch_size: int = 1000):
+        self.db = db
+        self.batch_size = batch_size
+
+    def score_fight(self, fight: FightModel) -> int:
+        """
+        Re-score every prediction made on *fight* and update the leaderboards by the change in points.
+        Returns the number of predictions scored.
+        """
+        rows = (
+            self.db.query(
+                PredictionModel.id,
+                PredictionModel.user_id,
+                PredictionModel.fighter_id,
+                PredictionModel.method,
+                PredictionModel.round,
+                PredictionScoreModel.points.label("previous_points"),
+            )
+            .outerjoin(PredictionScoreModel, PredictionScoreModel.prediction_id == PredictionModel.id)
+            .filter(PredictionModel.fight_id == fight.id)
+            .all()
+        )
+
+        deltas: dict[tuple[str, int], int] = {}
+
+        def add_delta(user_id: int, delta: int) -> None:
+            for scope in (GLOBAL_SCOPE, event_scope(fight.event_id)):
+                deltas[(scope, user_id)] = deltas.get((scope, user_id), 0) + delta
+
+        if not fight.winner:
+            for row in rows:
+                if row.previous_points:
+                    add_delta(row.user_id, -row.previous_points)
+            self.db.query(PredictionScoreModel).filter(
+                PredictionScoreModel.fight_id == fight.id
+            ).delete(synchronize_session=False)
+            get_leaderboard(self.db).apply_deltas(deltas)
+            return 0
+
+        scored_at = datetime.now()
+        values = []
+        for row in rows:
+            fighter_correct, method_correct, round_correct, points = score_prediction(
+                row.fighter_id, row.method, row.round,
+                fight.winner, fight.fighter_1_id, fight.method, fight.round,
+            )
+            values.append({
+                "prediction_id": row.id,
+                "user_id": row.user_id,
+                "fight_id": fight.id,
+                "fighter_correct": fighter_correct,
+                "method_correct": method_correct,
+                "round_correct": round_correct,
+                "points": points,
+                "scored_at": scored_at,
+            })
+            add_delta(row.user_id, points - (row.previous_points or 0))
+
+        self._write(values)
+        get_leaderboard(self.db).apply_deltas(deltas)
+        return len(values)
+
+    def rescore_all(self) -> int:
+        """
+        Backfill: re-score every prediction on every fight that has a result.
+        Streams the predictions in batches so the whole table is never held in memory.
+        Returns the number of predictions scored.
+        """
+        self.db.query(PredictionScoreModel).filter(
+            PredictionScoreModel.fight_id.in_(
+                self.db.query(FightModel.id).filter((FightModel.winner.is_(None)) | (FightModel.winner == ""))
+            )
+        ).delete(synchronize_session=False)
+
+        rows = (
+            self.db.query(
+                PredictionModel.id,
+                PredictionModel.user_id,
+                PredictionModel.fight_id,
+                PredictionModel.fighter_id,
+                PredictionModel.method,
+                PredictionModel.round,
+                FightModel.winner,
+                FightModel.fighter_1_id,
+                FightModel.method.label("fight_method"),
+                FightModel.round.label("fight_round"),
+            )
+            .join(FightModel, PredictionModel.fight_id == FightModel.id)
+            .filter(FightModel.winner.isnot(None), FightModel.winner != "")
+            .order_by(PredictionModel.id)
+            .yield_per(self.batch_size)
+        )
+
+        scored_at = datetime.now()
+        total = 0
+        values = []
+        for row in rows:
+            fighter_correct, method_correct, round_correct, points = score_prediction(
+                row.fighter_id, row.method, row.round,
+                row.winner, row.fighter_1_id, row.fight_method, row.fight_round,
+            )
+            values.append({
+                "prediction_id": row.id,
+                "user_id": row.user_id,
+                "fight_id": row.fight_id,
+                "fighter_correct": fighter_correct,
+                "method_correct": method_correct,
+                "round_correct": round_correct,
+                "points": points,
+                "scored_at": scored_at,
+            })
+            if len(values) >= self.batch_size:
+                self._write(values)
+                total += len(values)
+                values = []
+
+        self._write(values)
+        total += len(values)
+
+        self.rebuild_leaderboard()
+        return total
+
+    def rebuild_leaderboard(self) -> None:
+        """Recompute every leaderboard standing from the stored scores."""
+        rows = (
+            self.db.query(
+                PredictionScoreModel.user_id,
+                FightModel.event_id,
+                func.sum(PredictionScoreModel.points).label("points"),
+            )
+            .join(FightModel, PredictionScoreModel.fight_id == FightModel.id)
+            .group_by(PredictionScoreModel.user_id, FightModel.event_id)
+            .all()
+        )
+
+        totals: dict[tuple[str, int], int] = {}
+        for row in rows:
+            totals[(event_scope(row.event_id), row.user_id)] = row.points
+            totals[(GLOBAL_SCOPE, row.user_id)] = totals.get((GLOBAL_SCOPE, row.user_id), 0) + row.points
+
+        get_leaderboard(self.db).rebuild(totals)
+
+    def _write(self, values: list[dict]) -> None:
+        """Upsert a batch of score rows keyed on ``prediction_id``."""
+        if not values:
+            return
+
+        stmt = insert(PredictionScoreModel).values(values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[PredictionScoreModel.prediction_id],
+            set_={
+                "fighter_correct": stmt.excluded.fighter_correct,
+                "method_correct": stmt.excluded.method_correct,
+                "round_correct": stmt.excluded.round_correct,
+                "points": stmt.excluded.points,
+                "scored_at": stmt.excluded.scored_at,
+            },
+        )
+        self.db.execute(stmt)
@@ -0,0 +1,35 @@
+import os
+from bs4 import BeautifulSoup
+
+try:
+    import lxml.html
+except ImportError:  # pragma: no cover - lxml is in requirements.txt, html.parser is the fallback
+    lxml = None
+
+# "lxml" (default): C-backed tree building, and lxml/XPath for the hot parsers that have a
+# native implementation. "html.parser": the pure-Python BeautifulSoup path everywhere.
+HTML_PARSER = os.getenv("SCRAPER_HTML_PARSER", "lxml").lower()
+
+def use_lxml() -> bool:
+    return HTML_PARSER == "lxml" and lxml is not None
+
+def make_soup(html: str) -> BeautifulSoup:
+    """BeautifulSoup tree for *html*, built with lxml when it is available and selected."""
+    return BeautifulSoup(html, "lxml" if use_lxml() else "html.parser")
+
+def parse_document(html: str):
+    """lxml element tree for *html*; only valid when :func:`use_lxml` is True."""
+    return lxml.html.document_fromstring(html)
+
+def has_class(name: str) -> str:
+    """XPath predicate matching elements whose class list contains *name*, like ``find(class_=name)``."""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+def first(element, xpath: str):
+    """First match of *xpath* under *element*, or None."""
+    matches = element.xpath(xpath)
+    return matches[0] if matches else None
+
+def text_of(element) -> str:
+    """Stripped text content of *element*, or "" when it is missing."""
+    return element.text_content().strip() if element is not None else ""
@@ -0,0 +1,275 @@
+import gzip
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from abc import ABC, abstractmethod
+
+# Seconds a cached page is served without touching the network, first matching pattern wins.
+# Past that, the page is revalidated with If-None-Match / If-Modified-Since when the server
+# gave us validators, and re-downloaded otherwise.
+DEFAULT_TTL_POLICY = [
+    (r"sherdog\.com/organizations/", 10 * 60),
+    (r"sherdog\.com/events/", 60 * 60),
+    (r"sherdog\.com/fighter/", 24 * 3600),
+    (r"ufc\.com/rankings", 60 * 60),
+    (r"espn\.[a-z.]+/mma/schedule/", 24 * 3600),
+]
+
+class HttpCacheMiss(Exception):
+    """Raised in replay mode for a URL that has never been cached."""
+
+class CachedResponse:
+    """The subset of a ``requests.Response`` the scrapers use, rebuilt from a cache entry."""
+
+    from_cache = True
+
+    def __init__(self, url: str, text: str, status_code: int = 200, headers: dict | None = None):
+        self.url = url
+        self.text = text
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def raise_for_status(self) -> None:
+        pass
+
+class CacheStorage(ABC):
+    """Where cached pages live; entries are ``(metadata, body)`` keyed by URL."""
+
+    @abstractmethod
+    def load(self, url: str) -> tuple[dict, str] | None: ...
+
+    @abstractmethod
+    def save(self, url: str, metadata: dict, body: str | None = None) -> None:
+        """Store *metadata* and, unless None (a revalidation), a new *body* for *url*."""
+
+    def prune(self, max_age: float | None, max_bytes: int | None) -> int:
+        """
+        Drop the entries not stored or revalidated for *max_age* seconds, then the least recently
+        stored ones until at most *max_bytes* remain. Returns the number of entries dropped.
+        """
+        return 0
+
+class FileCacheStorage(CacheStorage):
+    """One gzip-compressed body and one JSON metadata file per URL, sharded by hash prefix."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def _paths(self, url: str) -> tuple[str, str]:
+        digest = hashlib.sha256(url.encode()).hexdigest()
+        base = os.path.join(self.directory, digest[:2], digest)
+        return base + ".json", base + ".html.gz"
+
+    def load(self, url: str) -> tuple[dict, str] | None:
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, encoding="utf-8") as meta_file:
+                metadata = json.load(meta_file)
+            with gzip.open(body_path, "rt", encoding="utf-8") as body_file:
+                return metadata, body_file.read()
+        except (OSError, ValueError):
+            return None
+
+    def save(self, url: str, metadata: dict, body: str | None = None) -> None:
+        meta_path, body_path = self._paths(url)
+        os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+        # Write to a temporary file and rename, so concurrent readers never see a partial entry
+        suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+        if body is not None:
+            with gzip.open(body_path + suffix, "wt", encoding="utf-8") as body_file:
+                body_file.write(body)
+            os.replace(body_path + suffix, body_path)
+        with open(meta_path + suffix, "w", encoding="utf-8") as meta_file:
+            json.dump(metadata, meta_file)
+        os.replace(meta_path + suffix, meta_path)
+
+    def prune(self, max_age: float | None, max_bytes: int | None) -> int:
+        # The metadata file is rewritten by every save, revalidations included, so its mtime
+        # is when the entry was last known to be current
+        now = time.time()
+        entries: dict[str, list] = {}
+        try:
+            shards = [shard.path for shard in os.scandir(self.directory) if shard.is_dir()]
+        except FileNotFoundError:
+            return 0
+        for shard in shards:
+            for file in os.scandir(shard):
+                try:
+                    stat = file.stat()
+                except FileNotFoundError:
+                    continue
+                if file.name.endswith(".tmp"):
+                    # Left behind by a writer that died mid-save
+                    if now - stat.st_mtime > 3600:
+                        self._remove(file.path)
+                    continue
+                entry = entries.setdefault(os.path.join(shard, file.name.split(".", 1)[0]), [0.0, 0])
+                if file.name.endswith(".json"):
+                    entry[0] = stat.st_mtime
+                entry[1] += stat.st_size
+
+        # Oldest first; a body without metadata (mtime 0) is unreadable and goes first
+        by_age = sorted(entries.items(), key=lambda item: item[1][0])
+        total_bytes = sum(size for _, (_, size) in by_age)
+        dropped = 0
+        for base, (mtime, size) in by_age:
+            expired = max_age is not None and now - mtime > max_age
+            if not expired and (max_bytes is None or total_bytes <= max_bytes):
+                break
+            # Metadata first, so a concurrent load() sees a miss rather than a body without it
+            self._remove(base + ".json")
+            self._remove(base + ".html.gz")
+            total_bytes -= size
+            dropped += 1
+        return dropped
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+class HttpCache:
+    """
+    Response cache for the scrapers' GET requests.
+
+    Modes: ``on`` serves fresh entries from storage and revalidates or re-downloads stale ones,
+    ``replay`` never touches the network (raising :class:`HttpCacheMiss` for unknown URLs), so
+    parser changes can be re-run over the stored corpus offline, and ``off`` bypasses the cache.
+
+    Storage is bounded by *max_age* and *max_bytes*: in ``on`` mode each process prunes it on its
+    first new entry and then at most once per *prune_interval* seconds. A pruned page is simply
+    fetched again, including a past year's ESPN schedule that would otherwise be kept for good.
+    """
+
+    MODES = ("on", "replay", "off")
+
+    def __init__(
+        self,
+        storage: CacheStorage | None,
+        mode: str = "on",
+        ttl_policy: list[tuple[str, int]] | None = None,
+        max_age: float | None = None,
+        max_bytes: int | None = None,
+        prune_interval: float = 3600,
+    ):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown HTTP cache mode {mode!r}, expected one of {self.MODES}")
+        self.storage = storage
+        self.mode = mode if storage is not None else "off"
+        self.ttl_policy = [(re.compile(pattern), ttl) for pattern, ttl in (ttl_policy or DEFAULT_TTL_POLICY)]
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.prune_interval = prune_interval
+        self._next_prune = 0.0
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "revalidated": 0, "misses": 0, "replay_misses": 0, "pruned": 0}
+
+    @classmethod
+    def from_env(cls) -> "HttpCache":
+        """
+        Configure from SCRAPER_CACHE_MODE (on/replay/off), SCRAPER_CACHE_DIR, and the storage
+        bounds SCRAPER_CACHE_MAX_AGE_DAYS (default 30) and SCRAPER_CACHE_MAX_MB (default 1024).
+        The default directory lives in the container's /tmp; point SCRAPER_CACHE_DIR at a volume
+        to keep the cache across restarts.
+        """
+        mode = os.getenv("SCRAPER_CACHE_MODE", "on").lower()
+        directory = os.getenv("SCRAPER_CACHE_DIR", "/tmp/predictmma-http-cache")
+        return cls(
+            FileCacheStorage(directory),
+            mode=mode,
+            max_age=float(os.getenv("SCRAPER_CACHE_MAX_AGE_DAYS", "30")) * 24 * 3600,
+            max_bytes=int(float(os.getenv("SCRAPER_CACHE_MAX_MB", "1024")) * 1024 * 1024),
+        )
+
+    def prune(self) -> int:
+        """Drop entries past the age and size bounds now; returns the number dropped."""
+        if self.storage is None or (self.max_age is None and self.max_bytes is None):
+            return 0
+        dropped = self.storage.prune(self.max_age, self.max_bytes)
+        with self._lock:
+            self.stats["pruned"] += dropped
+        return dropped
+
+    def _maybe_prune(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            if now < self._next_prune:
+                return
+            self._next_prune = now + self.prune_interval
+        try:
+            dropped = self.prune()
+        except OSError as exc:
+            print(f"Failed to prune the HTTP cache: {exc}")
+            return
+        if dropped:
+            print(f"Pruned {dropped} HTTP cache entries")
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.stats[name] += 1
+
+    def ttl_for(self, url: str) -> int:
+        for pattern, ttl in self.ttl_policy:
+            if pattern.search(url):
+                return ttl
+        return 0
+
+    def get(self, session, url: str, headers: dict | None = None, permanent_after: float | None = None, **kwargs):
+        """
+        ``session.get(url, ...)`` through the cache. Returns either the live response or a
+        :class:`CachedResponse`; only 200 responses are stored. An entry fetched at or after the
+        *permanent_after* timestamp is final and served without expiry, e.g. a schedule fetched
+        once its season was over; earlier entries follow the TTL policy.
+        """
+        if self.mode == "off":
+            return session.get(url, headers=headers, **kwargs)
+
+        entry = self.storage.load(url)
+        if self.mode == "replay":
+            if entry is None:
+                self._count("replay_misses")
+                raise HttpCacheMiss(url)
+            self._count("hits")
+            return CachedResponse(url, entry[1])
+
+        if entry is not None and (
+            (permanent_after is not None and entry[0]["fetched_at"] >= permanent_after)
+            or time.time() - entry[0]["fetched_at"] < self.ttl_for(url)
+        ):
+            self._count("hits")
+            return CachedResponse(url, entry[1])
+
+        request_headers = dict(headers or {})
+        if entry is not None:
+            if entry[0].get("etag"):
+                request_headers["If-None-Match"] = entry[0]["etag"]
+            if entry[0].get("last_modified"):
+                request_headers["If-Modified-Since"] = entry[0]["last_modified"]
+
+        response = session.get(url, headers=request_headers, **kwargs)
+        if response.status_code == 304 and entry is not None:
+            self._count("revalidated")
+            self.storage.save(url, {**entry[0], "fetched_at": time.time()})
+            return CachedResponse(url, entry[1])
+
+        self._count("misses")
+        if response.status_code == 200:
+            self.storage.save(
+                url,
+                {
+                    "url": url,
+                    "etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified"),
+                    "fetched_at": time.time(),
+                },
+                response.text,
+            )
+            self._maybe_prune()
+        return response
+
+http_cache = HttpCache.from_env()
@@ -0,0 +1,147 @@
+import os
+import threading
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import cloudscraper
+from cloudscraper import CipherSuiteAdapter
+from app.common.redis_client import redis_client
+from app.core.circuit_breaker import RedisCircuitBreaker
+from app.core.rate_limiter import RedisTokenBucket, RequestMetrics
+
+BROWSER = {"browser": "chrome", "platform": "windows", "mobile": False}
+BLOCK_STATUSES = (403, 429)
+MAX_RETRY_AFTER = 15 * 60
+
+def retry_after_seconds(response) -> float | None:
+    """Seconds requested by a Retry-After header (delta or HTTP date), capped at MAX_RETRY_AFTER."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds()
+        except (TypeError, ValueError):
+            return None
+    return min(max(seconds, 0), MAX_RETRY_AFTER)
+
+class SharedScraperSession:
+    """
+    One long-lived, connection-pooled cloudscraper session per worker process.
+
+    The scrape workers run 100 gevent greenlets per process; requests are cooperative under
+    gevent, so sharing a single session with a pool sized to the concurrency keeps connections
+    alive across tasks instead of paying a new TLS handshake per task. Every request waits for
+    the shared circuit breaker to be closed and takes a token from a Redis bucket shared by all
+    workers; its outcome feeds the bucket's adaptive rate, the breaker and the block metrics.
+    The session is rebuilt lazily after a fork and on demand via :meth:`rotate` (e.g. after a
+    Cloudflare block).
+    """
+
+    def __init__(
+        self,
+        limiter: RedisTokenBucket | None,
+        breaker: RedisCircuitBreaker | None = None,
+        metrics: RequestMetrics | None = None,
+        pool_size: int = 100,
+    ):
+        self.limiter = limiter
+        self.breaker = breaker
+        self.metrics = metrics
+        self.pool_size = pool_size
+        self._session = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _create(self):
+        session = cloudscraper.create_scraper(browser=BROWSER)
+        # Keep cloudscraper's TLS fingerprint, but let the pool hold one connection per greenlet
+        adapter = session.adapters["https://"]
+        session.mount(
+            "https://",
+            CipherSuiteAdapter(
+                cipherSuite=session.cipherSuite,
+                ecdhCurve=session.ecdhCurve,
+                server_hostname=session.server_hostname,
+                source_address=session.source_address,
+                ssl_context=adapter.ssl_context,
+                pool_connections=4,
+                pool_maxsize=self.pool_size,
+            ),
+        )
+        return session
+
+    @property
+    def session(self):
+        if self._session is None or self._pid != os.getpid():
+            with self._lock:
+                if self._session is None or self._pid != os.getpid():
+                    self._session = self._create()
+                    self._pid = os.getpid()
+        return self._session
+
+    def rotate(self, stale=None) -> None:
+        """
+        Replace the session, e.g. to drop cookies and tokens Cloudflare has blocked.
+        With *stale*, only rotate if that session is still current, so concurrent greenlets
+        hitting the same block rotate once.
+        """
+        with self._lock:
+            if stale is not None and self._session is not stale:
+                return
+            stale, self._session = self._session, self._create()
+            self._pid = os.getpid()
+        if stale is not None:
+            stale.close()
+
+    def get(self, url: str, **kwargs):
+        if self.breaker is not None:
+            self.breaker.wait()
+        if self.limiter is not None:
+            self.limiter.acquire()
+        response = self.session.get(url, **kwargs)
+        self._record(response)
+        return response
+
+    def _record(self, response) -> None:
+        blocked = response.status_code in BLOCK_STATUSES
+        if self.limiter is not None:
+            self.limiter.record(blocked)
+        if self.metrics is not None:
+            self.metrics.record(blocked)
+        if blocked and self.breaker is not None:
+            self.breaker.record_block(retry_after_seconds(response))
+
+    def stats(self, minutes: int = 60) -> dict:
+        return {
+            "rate_per_second": round(self.limiter.current_rate(), 2) if self.limiter else None,
+            "circuit": self.breaker.state() if self.breaker else None,
+            "history": self.metrics.history(minutes) if self.metrics else [],
+        }
+
+def _sherdog_limiter() -> RedisTokenBucket | None:
+    """
+    Bucket from SHERDOG_RATE_PER_SECOND (the ceiling the adaptive rate recovers to) and
+    SHERDOG_RATE_BURST; a rate of 0 disables it.
+    """
+    rate = float(os.getenv("SHERDOG_RATE_PER_SECOND", "5"))
+    burst = int(os.getenv("SHERDOG_RATE_BURST", "10"))
+    return RedisTokenBucket(redis_client, "sherdog", rate, burst) if rate > 0 else None
+
+def _sherdog_breaker() -> RedisCircuitBreaker:
+    """Breaker from SHERDOG_BREAKER_THRESHOLD blocks per SHERDOG_BREAKER_WINDOW seconds."""
+    return RedisCircuitBreaker(
+        redis_client,
+        "sherdog",
+        threshold=int(os.getenv("SHERDOG_BREAKER_THRESHOLD", "20")),
+        window=int(os.getenv("SHERDOG_BREAKER_WINDOW", "60")),
+        cooldown=int(os.getenv("SHERDOG_BREAKER_COOLDOWN", "60")),
+    )
+
+sherdog_session = SharedScraperSession(
+    _sherdog_limiter(),
+    breaker=_sherdog_breaker(),
+    metrics=RequestMetrics(redis_client, "sherdog"),
+    pool_size=int(os.getenv("SHERDOG_POOL_SIZE", "100")),
+)
@@ -0,0 +1,202 @@
+"""
+Offline replay harness and benchmark for the scraper parsers.
+
+    python -m app.services.scrapers.parser_bench record fighter https://www.sherdog.com/fighter/...
+    python -m app.services.scrapers.parser_bench run --repeat 20 --report bench.json
+    python -m app.services.scrapers.parser_bench run --baseline bench.json --tolerance 0.25
+
+Pages are recorded into a corpus directory (SCRAPER_FIXTURES_DIR, default ./scraper_fixtures) as
+gzip-compressed HTML, together with a manifest holding the parsed output at record time. ``run``
+re-parses every page offline, checks the output against that snapshot and reports per-page parse
+time and peak memory; it exits non-zero on a mismatch or, with ``--baseline``, on a slowdown.
+``run --update`` re-snapshots the expected output after an intended parser change.
+"""
+import argparse
+import gzip
+import json
+import os
+import re
+import statistics
+import sys
+import time
+import tracemalloc
+from fastapi.encoders import jsonable_encoder
+from app.services.scrapers.ufc_event_datetime_scraper import UFCEventDatetimeScraper
+from app.services.scrapers.ufc_ranking_scraper import UFCRankingScraper
+from app.services.scrapers.ufc_sherdog_scraper import UFCSherdogScraper
+
+MANIFEST = "manifest.json"
+PAGE_KINDS = (
+    "previous_events",
+    "upcoming_events",
+    "previous_card",
+    "upcoming_card",
+    "fighter",
+    "rankings",
+    "espn_schedule",
+)
+
+def _schedule_year(url: str) -> int:
+    match = re.search(r"/year/(\d{4})", url)
+    if not match:
+        raise ValueError(f"Cannot tell the schedule year from {url}")
+    return int(match.group(1))
+
+def _parsers(sherdog: UFCSherdogScraper) -> dict:
+    """Parser per page kind, all called as ``parse(html, url)``."""
+    rankings = UFCRankingScraper()
+    espn = UFCEventDatetimeScraper()
+    return {
+        "previous_events": lambda html, url: sherdog.parse_previous_events_page(html)[0],
+        "upcoming_events": lambda html, url: sherdog.parse_upcoming_events(html),
+        "previous_card": sherdog.parse_previous_event_fights,
+        "upcoming_card": sherdog.parse_upcoming_event_fights,
+        "fighter": sherdog.parse_fighter,
+        "rankings": lambda html, url: rankings.parse_rankings(html),
+        "espn_schedule": lambda html, url: espn.parse_schedule(html, _schedule_year(url)),
+    }
+
+def _load_manifest(corpus: str) -> dict:
+    try:
+        with open(os.path.join(corpus, MANIFEST), encoding="utf-8") as manifest_file:
+            return json.load(manifest_file)
+    except FileNotFoundError:
+        return {}
+
+def _save_manifest(corpus: str, manifest: dict) -> None:
+    with open(os.path.join(corpus, MANIFEST), "w", encoding="utf-8") as manifest_file:
+        json.dump(manifest, manifest_file, indent=2, sort_keys=True)
+
+def _read_page(corpus: str, entry: dict) -> str:
+    with gzip.open(os.path.join(corpus, entry["file"]), "rt", encoding="utf-8") as page_file:
+        return page_file.read()
+
+def _fetch(kind: str, url: str) -> str:
+    """Fetch *url* the way the scraper that owns *kind* does, through the HTTP cache."""
+    if kind == "rankings":
+        response = UFCRankingScraper()._get(url)
+    elif kind == "espn_schedule":
+        response = UFCEventDatetimeScraper()._get(url)
+    else:
+        response = UFCSherdogScraper()._get(url)
+    response.raise_for_status()
+    return response.text
+
+def record(corpus: str, kind: str, url: str, name: str | None = None) -> dict:
+    """Fetch *url*, store it in the corpus and snapshot its parsed output."""
+    return add_page(corpus, kind, url, _fetch(kind, url), name)
+
+def add_page(corpus: str, kind: str, url: str, html: str, name: str | None = None) -> dict:
+    """Store *html* as the page at *url* in the corpus and snapshot its parsed output."""
+    parse = _parsers(UFCSherdogScraper())[kind]
+    expected = jsonable_encoder(parse(html, url))
+
+    name = name or f"{kind}-{re.sub(r'[^A-Za-z0-9]+', '-', url.split('://', 1)[-1]).strip('-')}"
+    os.makedirs(corpus, exist_ok=True)
+    with gzip.open(os.path.join(corpus, name + ".html.gz"), "wt", encoding="utf-8") as page_file:
+        page_file.write(html)
+
+    manifest = _load_manifest(corpus)
+    manifest[name] = {"kind": kind, "url": url, "file": name + ".html.gz", "expected": expected}
+    _save_manifest(corpus, manifest)
+    print(f"Recorded {name} ({len(html) // 1024} KiB)")
+    return manifest[name]
+
+def run(corpus: str, repeat: int = 10, update: bool = False) -> list[dict]:
+    """Parse every recorded page offline; returns one result row per page."""
+    manifest = _load_manifest(corpus)
+    parsers = _parsers(UFCSherdogScraper())
+    results = []
+    for name, entry in sorted(manifest.items()):
+        html = _read_page(corpus, entry)
+        parse = parsers[entry["kind"]]
+
+        parsed = jsonable_encoder(parse(html, entry["url"]))
+        if update:
+            entry["expected"] = parsed
+
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            parse(html, entry["url"])
+            timings.append(time.perf_counter() - started)
+
+        tracemalloc.start()
+        parse(html, entry["url"])
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        results.append({
+            "name": name,
+            "kind": entry["kind"],
+            "ok": parsed == entry["expected"],
+            "items": len(parsed) if isinstance(parsed, (list, dict)) else 1,
+            "size_kib": round(len(html) / 1024, 1),
+            "median_ms": round(statistics.median(timings) * 1000, 2),
+            "peak_kib": round(peak / 1024, 1),
+        })
+
+    if update:
+        _save_manifest(corpus, manifest)
+    return results
+
+def regressions(results: list[dict], baseline: list[dict], tolerance: float) -> list[str]:
+    """Pages whose median parse time grew by more than *tolerance* over the baseline run."""
+    baseline_ms = {row["name"]: row["median_ms"] for row in baseline}
+    return [
+        f"{row['name']}: {baseline_ms[row['name']]} ms -> {row['median_ms']} ms"
+        for row in results
+        if row["name"] in baseline_ms and row["median_ms"] > baseline_ms[row["name"]] * (1 + tolerance)
+    ]
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=os.getenv("SCRAPER_FIXTURES_DIR", "scraper_fixtures"))
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record_parser = commands.add_parser("record", help="fetch a page into the corpus")
+    record_parser.add_argument("kind", choices=PAGE_KINDS)
+    record_parser.add_argument("url")
+    record_parser.add_argument("--name")
+
+    run_parser = commands.add_parser("run", help="parse the corpus offline and report timings")
+    run_parser.add_argument("--repeat", type=int, default=10)
+    run_parser.add_argument("--update", action="store_true", help="re-snapshot the expected output")
+    run_parser.add_argument("--report", help="write the results as JSON")
+    run_parser.add_argument("--baseline", help="results JSON of an earlier run to compare against")
+    run_parser.add_argument("--tolerance", type=float, default=0.25)
+
+    args = parser.parse_args(argv)
+    if args.command == "record":
+        record(args.corpus, args.kind, args.url, args.name)
+        return 0
+
+    results = run(args.corpus, repeat=args.repeat, update=args.update)
+    if not results:
+        print(f"No recorded pages in {args.corpus}")
+        return 1
+
+    print(f"{'page':<60} {'kind':<16} {'ok':<3} {'items':>6} {'KiB':>8} {'median ms':>10} {'peak KiB':>9}")
+    for row in results:
+        print(
+            f"{row['name'][:60]:<60} {row['kind']:<16} {'yes' if row['ok'] else 'NO':<3} {row['items']:>6} "
+            f"{row['size_kib']:>8} {row['median_ms']:>10} {row['peak_kib']:>9}"
+        )
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as report_file:
+            json.dump(results, report_file, indent=2)
+
+    failed = [row["name"] for row in results if not row["ok"]]
+    for name in failed:
+        print(f"Parsed output changed: {name}")
+    slower = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            slower = regressions(results, json.load(baseline_file), args.tolerance)
+        for line in slower:
+            print(f"Slower than baseline: {line}")
+    return 1 if failed or slower else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
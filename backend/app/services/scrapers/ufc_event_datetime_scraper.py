@@ -1,53 +1,93 @@
+import os
 import requests
 from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from requests.adapters import HTTPAdapter
 from urllib.parse import urljoin
 import re
 from typing import Dict, List, Optional
+from zoneinfo import ZoneInfo
+from app.services.scrapers.http_cache import http_cache
+from app.services.scrapers.html_parser import make_soup
+
+FIRST_UFC_YEAR = 1993
+# ESPN UK lists dates and times in UK local time
+ESPN_TIMEZONE = ZoneInfo("Europe/London")
 
 class UFCEventDatetimeScraper:
-    def __init__(self):
+    def __init__(self, max_workers: int | None = None):
         self.base_url = "https://www.espn.co.uk"
+        self.max_workers = max_workers or int(os.getenv("ESPN_CRAWL_WORKERS", "4"))
         self.scraper = requests.Session()
+        # One pooled connection per crawl thread
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_workers)
+        self.scraper.mount("https://", adapter)
         self.headers = {
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/137.0.0.0 Safari/537.36",
     }
 
-    def get_all_events_datetimes(self) -> Dict[str, datetime]:
+    def get_all_events_datetimes(self, start_year: int = FIRST_UFC_YEAR, end_year: int | None = None) -> Dict[str, datetime]:
         """
-        Scrape all UFC events and their datetimes from ESPN UK from 2025 down to 1993.
+        Scrape UFC events and their datetimes from ESPN UK for start_year..end_year (inclusive),
+        fetching up to max_workers years concurrently. end_year defaults to next year.
+        
+        A past year's page fetched after that year ended is cached permanently by the HTTP cache,
+        so repeat crawls only hit the network for the current and next year, and for past years
+        last fetched while they were still running.
         
         Returns:
-            Dict[str, datetime]: Dictionary mapping event names to their datetime objects
+            Dict[str, datetime]: Dictionary mapping event names to their UTC start times; events
+            listed without a start time are left out
         """
+        current_year = datetime.now(timezone.utc).year
+        end_year = end_year if end_year is not None else current_year + 1
+        years = list(range(end_year, start_year - 1, -1))
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            results = dict(zip(years, executor.map(self._get_year, years)))
+
         all_events = {}
+        # Merge newest year first, as the sequential crawl did
+        for year in years:
+            all_events.update(results[year])
         
-        # Loop through years from 2025 down to 1993
-        for year in range(2025, 1992, -1):  # 1992 is exclusive, so it stops at 1993
-            print(f"Scraping events for year {year}...")
-            
-            url = urljoin(self.base_url, f"/mma/schedule/_/year/{year}/league/ufc")
+        print(f"Total events found: {len(all_events)}")
+        return all_events
+
+    def _get(self, url: str, permanent_after: float | None = None):
+        """GET through the HTTP response cache on the pooled session."""
+        return http_cache.get(self.scraper, url, headers=self.headers, permanent_after=permanent_after, timeout=30)
+
+    def _get_year(self, year: int) -> Dict[str, datetime]:
+        """Fetch and parse one year's schedule; errors are logged and yield no events."""
+        url = urljoin(self.base_url, f"/mma/schedule/_/year/{year}/league/ufc")
+        try:
+            # A year's schedule no longer changes once the year is over, but a copy fetched before
+            # then may still miss its last events and times
+            year_end = datetime(year + 1, 1, 1, tzinfo=timezone.utc).timestamp()
+            response = self._get(url, permanent_after=year_end)
             
-            try:
-                response = self.scraper.get(url, headers=self.headers)
-                
-                if response.status_code != 200:
-                    print(f"Warning: Failed to fetch page for year {year}: {response.status_code}")
-                    continue
-                    
-                soup = BeautifulSoup(response.text, "html.parser")
-                year_events = self._extract_event_datetimes(soup, year)
-                
-                # Add events from this year to the main dictionary
-                all_events.update(year_events)
-                print(f"Found {len(year_events)} events for year {year}")
+            if response.status_code != 200:
+                print(f"Warning: Failed to fetch page for year {year}: {response.status_code}")
+                return {}
                 
-            except Exception as e:
-                print(f"Error scraping events for year {year}: {e}")
-                continue
+            year_events = self.parse_schedule(response.text, year)
+            print(f"Found {len(year_events)} events for year {year}")
+            return year_events
+            
+        except Exception as e:
+            print(f"Error scraping events for year {year}: {e}")
+            return {}
+    
+    def parse_schedule(self, html: str, year: int) -> Dict[str, datetime]:
+        """
+        Parse the ESPN schedule page of one year.
         
-        print(f"Total events found: {len(all_events)}")
-        return all_events
+        Returns:
+            Dict[str, datetime]: Dictionary mapping event names to their UTC start times
+        """
+        return self._extract_event_datetimes(make_soup(html), year)
     
     def _extract_event_datetimes(self, soup: BeautifulSoup, year: int) -> Dict[str, datetime]:
         """
@@ -58,7 +98,7 @@ class UFCEventDatetimeScraper:
             year: The year being scraped
             
         Returns:
-            Dict[str, datetime]: Dictionary mapping event names to their datetime objects
+            Dict[str, datetime]: Dictionary mapping event names to their UTC start times
         """
         events = {}
         
@@ -91,6 +131,7 @@ class UFCEventDatetimeScraper:
             
         Returns:
             Optional[tuple[str, datetime]]: Tuple of (event_name, datetime) or None if parsing fails
+            or the row has no start time (TBD, or a result in place of the time)
         """
         try:
             # Extract date from the first column
@@ -117,9 +158,12 @@ class UFCEventDatetimeScraper:
                 return None
             event_name = event_link.get_text(strip=True)
             
-            # Parse datetime (with or without time)
-            event_datetime = self._parse_datetime(date_text, time_text, year)
-            if not event_datetime:
+            parsed = self._parse_datetime(date_text, time_text, year)
+            if not parsed:
+                return None
+            event_datetime, has_time = parsed
+            # A date alone would give the event a made-up start time
+            if not has_time:
                 return None
                 
             return event_name, event_datetime
@@ -128,9 +172,9 @@ class UFCEventDatetimeScraper:
             print(f"Error parsing event row: {e}")
             return None
     
-    def _parse_datetime(self, date_text: str, time_text: Optional[str], year: int) -> Optional[datetime]:
+    def _parse_datetime(self, date_text: str, time_text: Optional[str], year: int) -> Optional[tuple[datetime, bool]]:
         """
-        Parse date and time strings into a datetime object.
+        Parse UK local date and time strings into a UTC datetime.
         
         Args:
             date_text: Date string like "13 Sep"
@@ -138,7 +182,8 @@ class UFCEventDatetimeScraper:
             year: The year for this event
             
         Returns:
-            Optional[datetime]: Parsed datetime object or None if parsing fails
+            Optional[tuple[datetime, bool]]: The datetime, and whether a time was actually parsed
+            (otherwise it is the default time), or None if parsing fails
         """
         try:
             
@@ -163,6 +208,7 @@ class UFCEventDatetimeScraper:
             # Default time values (used when time_text is None)
             hour = 20  # 8 PM default (typical UFC main card time)
             minute = 0
+            has_time = False
             
             # Parse time if available (format: "8:00 PM" or "1:00 AM")
             if time_text:
@@ -177,16 +223,16 @@ class UFCEventDatetimeScraper:
                         hour += 12
                     elif am_pm == 'AM' and hour == 12:
                         hour = 0
+                    has_time = True
                 else:
                     # If time_text exists but doesn't match expected format, 
                     # still use default time rather than failing
                     print(f"Warning: Could not parse time '{time_text}', using default time")
             
-            # Create datetime object
-            # Note: This assumes UK timezone since we're scraping from ESPN UK
-            event_datetime = datetime(year, month, day, hour, minute, tzinfo=timezone.utc)
+            # Local time in the UK (GMT or BST), stored in UTC
+            event_datetime = datetime(year, month, day, hour, minute, tzinfo=ESPN_TIMEZONE).astimezone(timezone.utc)
             
-            return event_datetime
+            return event_datetime, has_time
             
         except Exception as e:
             print(f"Error parsing datetime '{date_text}' '{time_text}': {e}")
@@ -194,29 +240,19 @@ class UFCEventDatetimeScraper:
 
 
 def main():
-    """Example usage of the UFC Event Datetime Scraper - gets all events from 1993-2025."""
+    """Example usage of the UFC Event Datetime Scraper - gets all events since 1993."""
     scraper = UFCEventDatetimeScraper()
     
     try:
-        # Get page to check table structure (using 2025 as example)
-        url = scraper.base_url + "/mma/schedule/_/year/2025/league/ufc"
-        response = scraper.scraper.get(url, headers=scraper.headers)
-        soup = BeautifulSoup(response.text, "html.parser")
-        
-        # Debug: Check how many table bodies exist
-        tbodies = soup.find_all("tbody", class_="Table__TBODY")
-        print(f"Found {len(tbodies)} table bodies on the 2025 page")
-        
         # Get events
         events = scraper.get_all_events_datetimes()
         
-        print(f"Found {len(events)} total UFC events (1993-2025):")
+        print(f"Found {len(events)} total UFC events (since {FIRST_UFC_YEAR}):")
         print("-" * 80)
         
         for event_name, event_datetime in sorted(events.items(), key=lambda x: x[1]):
             print(f"Event: {event_name}")
             print(f"Datetime: {event_datetime.strftime('%Y-%m-%d %H:%M UTC')}")
-            # Note: Events without specific times use default time of 20:00 UTC (8 PM)
             print("-" * 80)
             
     except Exception as e:
@@ -1,6 +1,7 @@
 import cloudscraper
-from bs4 import BeautifulSoup
 from app.core.utils.string_utils import strip_accents
+from app.services.scrapers.http_cache import http_cache
+from app.services.scrapers.html_parser import make_soup
 
 class UFCRankingScraper:
     def __init__(self):
@@ -9,10 +10,20 @@ class UFCRankingScraper:
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/137.0.0.0 Safari/537.36",
         }
 
-    def get_ufc_rankings(self) -> dict[str, list[tuple[str, str]]]:
+    def _get(self, url: str):
+        """GET through the HTTP response cache with a Cloudflare-capable session."""
         scraper = cloudscraper.create_scraper()
-        response = scraper.get(self.base_url, headers=self.headers)
-        soup = BeautifulSoup(response.text, "html.parser")
+        return http_cache.get(scraper, url, headers=self.headers)
+
+    def get_ufc_rankings(self) -> dict[str, list[tuple[str, str]]]:
+        response = self._get(self.base_url)
+        rankings = self.parse_rankings(response.text)
+        print(rankings)
+        return rankings
+
+    def parse_rankings(self, html: str) -> dict[str, list[tuple[str, str]]]:
+        """Parse the divisional rankings page into (name, rank) pairs per weight class."""
+        soup = make_soup(html)
 
         rankings = {
             "Strawweight": [],
@@ -55,5 +66,4 @@ class UFCRankingScraper:
 
                 rankings[weight_class].append((name, rank))
 
-        print(rankings)
         return rankings
\ No newline at end of file
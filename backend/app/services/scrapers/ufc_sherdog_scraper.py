@@ -1,11 +1,13 @@
+import random
 import re
 import time
-import cloudscraper
-from bs4 import BeautifulSoup
-from typing import List
+from typing import Iterator, List
 
 from app.core.utils.string_utils import strip_accents
 from app.schemas.sherdog_schemas import Event, Fight, Fighter
+from app.services.scrapers.http_cache import HttpCacheMiss, http_cache
+from app.services.scrapers.http_client import sherdog_session
+from app.services.scrapers.html_parser import first, has_class, make_soup, parse_document, text_of, use_lxml
 from urllib.parse import urljoin
 from datetime import datetime, timezone
 from zoneinfo import ZoneInfo
@@ -18,9 +20,8 @@ class UFCSherdogScraper:
 
     def __init__(self):
         self.base_url = "https://www.sherdog.com"
-        self.scraper = cloudscraper.create_scraper(
-            browser={"browser": "chrome", "platform": "windows", "mobile": False}
-        )
+        # Pooled, rate-limited session shared by every scraper in this worker process
+        self.scraper = sherdog_session
         self.headers = {
             "User-Agent": (
                 "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
@@ -37,33 +38,36 @@ class UFCSherdogScraper:
         }
 
     def _get(self, url: str, max_retries: int = 3):
-        """GET with simple retry/backoff and cookie warm-up for Cloudflare blocks."""
+        """
+        GET through the HTTP response cache, with simple retry/backoff and cookie warm-up
+        for Cloudflare blocks.
+        """
         last_exc: Exception | None = None
         for attempt in range(max_retries):
             try:
-                response = self.scraper.get(url, headers=self.headers, timeout=30)
-                # If Cloudflare blocks (403) or we are being rate-limited (429), warm up cookies and retry
+                session = self.scraper.session
+                response = http_cache.get(self.scraper, url, headers=self.headers, timeout=30)
+                # If Cloudflare blocks (403) or we are being rate-limited (429), rotate the session,
+                # warm up its cookies and retry. Only the first greenlet to see the block rotates;
+                # the shared session has already slowed the request rate and, on sustained blocks
+                # or a Retry-After, opened the circuit breaker that the next attempt waits on.
                 if response.status_code in (403, 429):
+                    time.sleep(random.uniform(0.5, 1.5) * (attempt + 1))
+                    self.scraper.rotate(stale=session)
                     try:
                         # Visit base page to obtain/refresh cookies
                         self.scraper.get(self.base_url + "/", headers=self.headers, timeout=30)
                     except Exception:
                         pass
-                    # Backoff and rotate the scraper session to refresh any tokens
-                    time.sleep(1.5 * (attempt + 1))
-                    self.scraper = cloudscraper.create_scraper(
-                        browser={"browser": "chrome", "platform": "windows", "mobile": False}
-                    )
                     continue
                 response.raise_for_status()
                 return response
+            except HttpCacheMiss:
+                raise
             except Exception as exc:
                 last_exc = exc
+                # Network errors are retried on the same pooled session; urllib3 drops broken connections
                 time.sleep(1.5 * (attempt + 1))
-                # Recreate session on generic network errors
-                self.scraper = cloudscraper.create_scraper(
-                    browser={"browser": "chrome", "platform": "windows", "mobile": False}
-                )
         # Exhausted retries
         if last_exc:
             raise last_exc
@@ -76,13 +80,24 @@ class UFCSherdogScraper:
             return False
         return not href.strip().lower().startswith("javascript:")
 
-    def get_previous_ufc_events(self) -> List[Event]:
+    def get_previous_ufc_events(self, since: datetime | None = None) -> List[Event]:
         """
-        Scrapes every previous UFC event from Sherdog.
+        Scrapes every previous UFC event from Sherdog, or only those on or after *since*.
         Returns a list of events.
         """
+        return list(self.iter_previous_ufc_events(since=since))
+
+    def iter_previous_ufc_events(
+        self,
+        since: datetime | None = None,
+        known_urls: set[str] | None = None,
+    ) -> Iterator[Event]:
+        """
+        Streams previous UFC events from Sherdog, newest first, fetching pages lazily.
+        Stops before the first event older than *since* (timezone-aware) or the first event
+        whose URL is in *known_urls*, so no further pages are requested.
+        """
         current_url = urljoin(self.base_url, "/organizations/Ultimate-Fighting-Championship-UFC-2/recent-events/1")
-        events = []
         current_page = 1
 
         while current_url:
@@ -93,64 +108,20 @@ class UFCSherdogScraper:
                 print(f"Failed to fetch Sherdog recent events page: {exc}")
                 break
 
-            soup = BeautifulSoup(response.text, "html.parser")
-
-            events_container = soup.find("div", id="recent_tab")
-            if not events_container:
-                print("Sherdog layout changed or content blocked: 'recent_tab' not found")
+            events, older_link = self.parse_previous_events_page(response.text)
+            if events is None:
                 break
-            for tr in events_container.find_all("tr", itemtype="http://schema.org/Event"):
-                try:
-                    url_tag = tr.find("a", itemprop="url")
-                    name_tag = tr.find("span", itemprop="name")
-                    date_meta = tr.find("meta", itemprop="startDate")
-                    location_td = tr.find("td", itemprop="location")
-
-                    if not url_tag or not name_tag or not date_meta:
-                        continue
-
-                    event_url = urljoin(self.base_url, url_tag["href"]) if url_tag and url_tag.get("href") else ""
-                    event_title = name_tag.text.strip() if name_tag else ""
 
-                    start_raw = date_meta.get("content", "")
-                    try:
-                        dt = dateutil_parser.isoparse(start_raw)
-                    except Exception:
-                        # Last resort: try stdlib
-                        dt = datetime.fromisoformat(start_raw.replace("Z", "+00:00"))
-                    if dt.tzinfo is None:
-                        dt = dt.replace(tzinfo=timezone.utc)
-                    event_date = dt.astimezone(ZoneInfo("Europe/London"))
-
-                    location = location_td.get_text(" ", strip=True) if location_td else ""
-
-                    events.append(Event(
-                        url=event_url,
-                        title=event_title,
-                        date=event_date,
-                        location=location,
-                        organizer="UFC",
-                    ))
-                except Exception as row_exc:
-                    print(f"Skipping previous event row due to parse error: {row_exc}")
-
-            pagination = events_container.find("span", class_="pagination")
-            older_link = None
-            if pagination:
-                for a in pagination.find_all("a"):
-                    if "Older Events" in a.text:
-                        older_link = urljoin(self.base_url, a["href"])
-                        break
-
-            if older_link:
-                current_url = older_link
-            else:
-                current_url = None
+            for event in events:
+                if since is not None and event.date < since:
+                    return
+                if known_urls is not None and event.url in known_urls:
+                    return
+                yield event
 
+            current_url = older_link
             current_page += 1
 
-        return events
-
     def get_upcoming_ufc_events(self) -> List[Event]:
         """
         Scrapes every upcoming UFC event from Sherdog.
@@ -164,12 +135,41 @@ class UFCSherdogScraper:
         except Exception as exc:
             print(f"Failed to fetch Sherdog upcoming events page: {exc}")
             return events
-        soup = BeautifulSoup(response.text, "html.parser")
+        return self.parse_upcoming_events(response.text)
+
+    def parse_previous_events_page(self, html: str) -> tuple[List[Event] | None, str | None]:
+        """
+        Parse one page of the previous events listing.
+        Returns the events (None if the listing is missing) and the URL of the next, older page.
+        """
+        soup = make_soup(html)
+
+        events_container = soup.find("div", id="recent_tab")
+        if not events_container:
+            print("Sherdog layout changed or content blocked: 'recent_tab' not found")
+            return None, None
+        events = self._parse_event_rows(events_container, "previous")
+
+        pagination = events_container.find("span", class_="pagination")
+        if pagination:
+            for a in pagination.find_all("a"):
+                if "Older Events" in a.text:
+                    return events, urljoin(self.base_url, a["href"])
+        return events, None
+
+    def parse_upcoming_events(self, html: str) -> List[Event]:
+        """Parse the upcoming events listing of the UFC organization page."""
+        soup = make_soup(html)
 
         events_container = soup.find("div", id="upcoming_tab")
         if not events_container:
             print("Sherdog layout changed or content blocked: 'upcoming_tab' not found")
-            return events
+            return []
+        return self._parse_event_rows(events_container, "upcoming")
+
+    def _parse_event_rows(self, events_container, kind: str) -> List[Event]:
+        """Parse the schema.org event rows of an events listing table."""
+        events = []
         for tr in events_container.find_all("tr", itemtype="http://schema.org/Event"):
             try:
                 url_tag = tr.find("a", itemprop="url")
@@ -187,6 +187,7 @@ class UFCSherdogScraper:
                 try:
                     dt = dateutil_parser.isoparse(start_raw)
                 except Exception:
+                    # Last resort: try stdlib
                     dt = datetime.fromisoformat(start_raw.replace("Z", "+00:00"))
                 if dt.tzinfo is None:
                     dt = dt.replace(tzinfo=timezone.utc)
@@ -202,10 +203,9 @@ class UFCSherdogScraper:
                     organizer="UFC",
                 ))
             except Exception as row_exc:
-                print(f"Skipping upcoming event row due to parse error: {row_exc}")
-        
+                print(f"Skipping {kind} event row due to parse error: {row_exc}")
         return events
-    
+
     def get_previous_event_fights(self, event_url: str) -> List[Fight]:
         """
         Scrapes the fights for a given previous event from Sherdog.
@@ -216,7 +216,11 @@ class UFCSherdogScraper:
         except Exception as exc:
             print(f"Failed to fetch Sherdog event page for previous fights: {exc}")
             return []
-        soup = BeautifulSoup(response.text, "html.parser")
+        return self.parse_previous_event_fights(response.text, event_url)
+
+    def parse_previous_event_fights(self, html: str, event_url: str) -> List[Fight]:
+        """Parse the fights of a previous event page."""
+        soup = make_soup(html)
         fights = []
 
         main_event_container = soup.find("div", itemprop="subEvent")
@@ -357,7 +361,11 @@ class UFCSherdogScraper:
         except Exception as exc:
             print(f"Failed to fetch Sherdog event page for upcoming fights: {exc}")
             return []
-        soup = BeautifulSoup(response.text, "html.parser")
+        return self.parse_upcoming_event_fights(response.text, event_url)
+
+    def parse_upcoming_event_fights(self, html: str, event_url: str) -> List[Fight]:
+        """Parse the announced fights of an upcoming event page."""
+        soup = make_soup(html)
         fights = []
 
         fight_card_container = soup.find("div", class_="new_table_holder")
@@ -457,34 +465,96 @@ class UFCSherdogScraper:
                 association="",
             )
         response = self._get(fighter_url)
-        soup = BeautifulSoup(response.text, "html.parser")
+        return self.parse_fighter(response.text, fighter_url)
+
+    def parse_fighter(self, html: str, fighter_url: str) -> Fighter:
+        """Parse a fighter profile page."""
+        if use_lxml():
+            return self._parse_fighter_lxml(html, fighter_url)
+        return self._parse_fighter_soup(html, fighter_url)
+
+    def _parse_fighter_lxml(self, html: str, fighter_url: str) -> Fighter:
+        """lxml/XPath version of :meth:`_parse_fighter_soup`, with identical output."""
+        doc = parse_document(html)
+
+        name = strip_accents(text_of(first(doc, "//h1[@itemprop='name']")))
+        nickname = text_of(first(doc, f"//span[{has_class('nickname')}]"))
+
+        image_url = self.base_url + first(doc, "//img[@itemprop='image']").get("src")
+
+        def count(outcome: str, default: str | None = None) -> str:
+            tag = first(doc, f"//div[normalize-space(@class)='winloses {outcome}']")
+            if tag is None and default is not None:
+                return default
+            return re.search(r"\d+", text_of(tag)).group(0)
+
+        record = f"{count('win')}-{count('lose')}-{count('draws', '0')}, {count('nc', '0')} NC"
+
+        country = text_of(first(doc, "//strong[@itemprop='nationality']"))
+        city = text_of(first(doc, f"//span[@itemprop='addressLocality' and {has_class('locality')}]"))
+
+        bio_holder = first(doc, f"//div[{has_class('bio-holder')}]")
+        bio_holder_trs = bio_holder.xpath(".//tr")
+
+        dob_str = text_of(first(bio_holder_trs[0], ".//span[@itemprop='birthDate']"))
+        dob = datetime.strptime(dob_str, "%b %d, %Y").date() if dob_str else None
+
+        height = text_of(first(bio_holder_trs[1], ".//b[@itemprop='height']"))
+
+        weight_class = text_of(first(
+            bio_holder, f".//div[{has_class('association-class')}]//a[contains(@href, 'weightclass=')]"
+        ))
+        association = text_of(first(bio_holder, ".//span[@itemprop='memberOf']"))
+
+        return Fighter(
+            url=fighter_url,
+            name=name,
+            nickname=nickname,
+            image_url=image_url,
+            record=record,
+            ranking="",
+            country=country,
+            city=city,
+            dob=dob,
+            height=height,
+            weight_class=weight_class,
+            association=association,
+        )
+
+    def _parse_fighter_soup(self, html: str, fighter_url: str) -> Fighter:
+        """BeautifulSoup fallback for :meth:`parse_fighter`."""
+        soup = make_soup(html)
+
+        def text_or_empty(tag) -> str:
+            return tag.text.strip() if tag else ""
 
         name = strip_accents(soup.find("h1", itemprop="name").text.strip())
-        nickname = soup.find("span", class_="nickname").text.strip() if soup.find("span", class_="nickname") else ""
+        nickname = text_or_empty(soup.find("span", class_="nickname"))
 
         image_url = self.base_url + soup.find("img", itemprop="image")["src"]
 
         wins = re.search(r"\d+", soup.find("div", class_="winloses win").text.strip()).group(0)
         loses = re.search(r"\d+", soup.find("div", class_="winloses lose").text.strip()).group(0)
-        draws = re.search(r"\d+", soup.find("div", class_="winloses draws").text.strip()).group(0) if soup.find("div", class_="winloses draws") else "0"
-        no_contests = re.search(r"\d+", soup.find("div", class_="winloses nc").text.strip()).group(0) if soup.find("div", class_="winloses nc") else "0"
+        draws_tag = soup.find("div", class_="winloses draws")
+        draws = re.search(r"\d+", draws_tag.text.strip()).group(0) if draws_tag else "0"
+        no_contests_tag = soup.find("div", class_="winloses nc")
+        no_contests = re.search(r"\d+", no_contests_tag.text.strip()).group(0) if no_contests_tag else "0"
         record = f"{wins}-{loses}-{draws}, {no_contests} NC"
 
-        country = soup.find("strong", itemprop="nationality").text.strip() if soup.find("strong", itemprop="nationality") else ""
-        city = soup.find("span", itemprop="addressLocality", class_="locality").text.strip() if soup.find("span", itemprop="addressLocality", class_="locality") else ""
+        country = text_or_empty(soup.find("strong", itemprop="nationality"))
+        city = text_or_empty(soup.find("span", itemprop="addressLocality", class_="locality"))
 
         bio_holder = soup.find("div", class_="bio-holder")
         bio_holder_trs = bio_holder.find_all("tr")
 
-        dob_str = bio_holder_trs[0].find("span", itemprop="birthDate").text.strip() if bio_holder_trs[0].find("span", itemprop="birthDate") else ""
+        dob_str = text_or_empty(bio_holder_trs[0].find("span", itemprop="birthDate"))
         dob = datetime.strptime(dob_str, "%b %d, %Y").date() if dob_str else None
         
-        height = bio_holder_trs[1].find("b", itemprop="height").text.strip() if bio_holder_trs[1].find("b", itemprop="height") else ""
+        height = text_or_empty(bio_holder_trs[1].find("b", itemprop="height"))
         
-        weight_class_tag = bio_holder.select_one("div.association-class a[href*='weightclass=']")
-        weight_class = weight_class_tag.text.strip() if weight_class_tag else ""
+        weight_class = text_or_empty(bio_holder.select_one("div.association-class a[href*='weightclass=']"))
 
-        association = bio_holder.find("span", itemprop="memberOf").text.strip() if bio_holder.find("span", itemprop="memberOf") else ""
+        association = text_or_empty(bio_holder.find("span", itemprop="memberOf"))
 
         return Fighter(
             url=fighter_url,
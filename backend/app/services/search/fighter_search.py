@@ -0,0 +1,72 @@
+from sqlalchemy import case, func, or_, text
+from sqlalchemy.orm import Session
+from app.core.utils.string_utils import normalize_search_text
+from app.db.models.models import Fighter as FighterModel
+from app.services.search.fighter_typeahead import fighter_typeahead_index
+
+# Trigrams need at least three characters to be selective; shorter queries use the typeahead index
+MIN_TRIGRAM_QUERY_LENGTH = 3
+
+_trgm_available: bool | None = None
+
+def _has_pg_trgm(db: Session) -> bool:
+    global _trgm_available
+    if _trgm_available is None:
+        _trgm_available = db.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")).first() is not None
+    return _trgm_available
+
+class FighterSearch:
+    """
+    Class for searching fighters by name, nickname, weight class or country.
+    Matches against the normalised ``search_text`` column, which is covered by a trigram GIN index
+    when ``pg_trgm`` is installed.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def search(self, q: str, offset: int, limit: int) -> tuple[list[FighterModel], int]:
+        """Return one page of matching fighters, most relevant first, and the total number of matches."""
+        query_text = normalize_search_text(q)
+        if not query_text:
+            return [], 0
+
+        if len(query_text) < MIN_TRIGRAM_QUERY_LENGTH:
+            return self._search_typeahead_index(query_text, offset, limit)
+
+        escaped = query_text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        matches = FighterModel.search_text.ilike(f"%{escaped}%", escape="\\")
+        prefix_match = case((FighterModel.search_text.like(f"{escaped}%", escape="\\"), 1), else_=0)
+
+        if _has_pg_trgm(self.db):
+            matches = or_(matches, FighterModel.search_text.op("%>")(query_text))
+            order_by = [prefix_match.desc(), func.word_similarity(query_text, FighterModel.search_text).desc(), FighterModel.name]
+        else:
+            order_by = [prefix_match.desc(), FighterModel.name]
+
+        rows = (
+            self.db.query(FighterModel, func.count().over().label("total"))
+            .filter(matches)
+            .order_by(*order_by, FighterModel.id)
+            .offset(offset)
+            .limit(limit)
+            .all()
+        )
+
+        if not rows:
+            # The window count only rides along with returned rows; past the last page, count separately
+            total = self.db.query(func.count(FighterModel.id)).filter(matches).scalar() if offset else 0
+            return [], total
+        return [fighter for fighter, _ in rows], rows[0].total
+
+    def _search_typeahead_index(self, query_text: str, offset: int, limit: int) -> tuple[list[FighterModel], int]:
+        fighter_ids = fighter_typeahead_index.search_ids(query_text)
+        page_ids = fighter_ids[offset:offset + limit]
+        if not page_ids:
+            return [], len(fighter_ids)
+
+        fighters = {
+            fighter.id: fighter
+            for fighter in self.db.query(FighterModel).filter(FighterModel.id.in_(page_ids))
+        }
+        return [fighters[fighter_id] for fighter_id in page_ids if fighter_id in fighters], len(fighter_ids)
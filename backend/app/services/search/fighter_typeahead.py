@@ -0,0 +1,212 @@
+import bisect
+import heapq
+import re
+import threading
+from array import array
+from typing import NamedTuple
+from sqlalchemy.orm import Session
+from app.core.utils.string_utils import normalize_search_text
+from app.db.database import sessionLocal
+from app.db.models.models import Fighter as FighterModel
+
+FIGHTER_TAG = re.compile(r"^fighters:(\d+)$")
+# Refreshing more than this share of the fighters rebuilds the index instead of patching it
+REBUILD_FRACTION = 0.05
+
+class FighterSuggestionRow(NamedTuple):
+    id: int
+    name: str
+    nickname: str
+    image_url: str
+
+class _Snapshot(NamedTuple):
+    """Immutable index state; replaced wholesale so readers never need a lock."""
+    ids: array              # row -> fighter id
+    names: list[str]
+    nicknames: list[str]
+    image_urls: list[str]
+    sort_names: list[str]   # row -> normalised name, used for ranking
+    tokens: list[str]       # sorted normalised name/nickname tokens
+    token_rows: array       # parallel to tokens: row the token belongs to
+    rows_by_id: dict[int, int]  # only live rows; a deleted fighter keeps its row until the next rebuild
+
+def _empty_snapshot() -> _Snapshot:
+    return _Snapshot(array("i"), [], [], [], [], [], array("i"), {})
+
+def _tokens_for(name: str, nickname: str) -> set[str]:
+    return set(normalize_search_text(f"{name} {nickname}").split())
+
+def _token_position(tokens: list[str], token_rows: array, token: str, row: int) -> int:
+    """Index of ``(token, row)`` in the token arrays, or where it would be inserted to keep them sorted."""
+    start = bisect.bisect_left(tokens, token)
+    end = bisect.bisect_right(tokens, token, lo=start)
+    return bisect.bisect_left(token_rows, row, start, end)
+
+class FighterTypeaheadIndex:
+    """
+    Compact in-process index of fighter names and nicknames for search-as-you-type.
+
+    Fighters live in array-backed columns addressed by row number; a sorted token array with a
+    parallel array of rows answers prefix lookups with a binary search, so autocomplete never
+    touches Postgres. The index is built once at startup and refreshed per fighter when the
+    importers invalidate ``fighters:{id}`` cache tags: a refresh copies the snapshot and moves
+    only the changed fighters' tokens with bisect, and a full rebuild is reserved for refreshes
+    that touch a large share of the fighters.
+    """
+
+    def __init__(self):
+        self._snapshot = _empty_snapshot()
+        self._write_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._snapshot.rows_by_id)
+
+    def build(self, db: Session) -> None:
+        """Load every fighter and replace the index."""
+        rows = db.query(FighterModel.id, FighterModel.name, FighterModel.nickname, FighterModel.image_url).all()
+        with self._write_lock:
+            self._snapshot = self._make_snapshot(
+                [FighterSuggestionRow(row.id, row.name, row.nickname or "", row.image_url or "") for row in rows]
+            )
+
+    def refresh(self, db: Session, fighter_ids: set[int]) -> None:
+        """Reload only *fighter_ids* from the database; ids that no longer exist are dropped."""
+        if not fighter_ids:
+            return
+        fresh = {
+            row.id: FighterSuggestionRow(row.id, row.name, row.nickname or "", row.image_url or "")
+            for row in db.query(FighterModel.id, FighterModel.name, FighterModel.nickname, FighterModel.image_url)
+            .filter(FighterModel.id.in_(fighter_ids))
+        }
+        with self._write_lock:
+            snapshot = self._snapshot
+            if len(fighter_ids) <= len(snapshot.rows_by_id) * REBUILD_FRACTION:
+                self._snapshot = self._patch_snapshot(snapshot, fresh, fighter_ids)
+                return
+            rows = []
+            for fighter_id, row in snapshot.rows_by_id.items():
+                if fighter_id in fresh:
+                    rows.append(fresh.pop(fighter_id))
+                elif fighter_id not in fighter_ids:
+                    rows.append(FighterSuggestionRow(fighter_id, snapshot.names[row], snapshot.nicknames[row], snapshot.image_urls[row]))
+            rows.extend(fresh.values())
+            self._snapshot = self._make_snapshot(rows)
+
+    def handle_invalidation(self, tags: set[str]) -> None:
+        """Response cache listener: refresh the fighters named by ``fighters:{id}`` tags."""
+        fighter_ids = {int(match.group(1)) for match in map(FIGHTER_TAG.match, tags) if match}
+        if not fighter_ids:
+            return
+        db = sessionLocal()
+        try:
+            self.refresh(db, fighter_ids)
+        finally:
+            db.close()
+
+    @staticmethod
+    def _make_snapshot(rows: list[FighterSuggestionRow]) -> _Snapshot:
+        ids = array("i", (row.id for row in rows))
+        sort_names = [normalize_search_text(row.name) for row in rows]
+        pairs = sorted(
+            (token, position)
+            for position, row in enumerate(rows)
+            for token in _tokens_for(row.name, row.nickname)
+        )
+        return _Snapshot(
+            ids=ids,
+            names=[row.name for row in rows],
+            nicknames=[row.nickname for row in rows],
+            image_urls=[row.image_url for row in rows],
+            sort_names=sort_names,
+            tokens=[token for token, _ in pairs],
+            token_rows=array("i", (position for _, position in pairs)),
+            rows_by_id={fighter_id: position for position, fighter_id in enumerate(ids)},
+        )
+
+    @staticmethod
+    def _patch_snapshot(snapshot: _Snapshot, fresh: dict[int, FighterSuggestionRow], fighter_ids: set[int]) -> _Snapshot:
+        """
+        Copy of *snapshot* with the fighters in *fighter_ids* replaced by their *fresh* rows.
+        Only their tokens are removed and re-inserted; fighters missing from *fresh* lose their
+        tokens and leave an unindexed row behind.
+        """
+        ids = array("i", snapshot.ids)
+        names = list(snapshot.names)
+        nicknames = list(snapshot.nicknames)
+        image_urls = list(snapshot.image_urls)
+        sort_names = list(snapshot.sort_names)
+        tokens = list(snapshot.tokens)
+        token_rows = array("i", snapshot.token_rows)
+        rows_by_id = dict(snapshot.rows_by_id)
+
+        for fighter_id in fighter_ids:
+            row = rows_by_id.get(fighter_id)
+            if row is not None:
+                for token in _tokens_for(names[row], nicknames[row]):
+                    position = _token_position(tokens, token_rows, token, row)
+                    del tokens[position]
+                    del token_rows[position]
+
+            fighter = fresh.get(fighter_id)
+            if fighter is None:
+                rows_by_id.pop(fighter_id, None)
+                continue
+            if row is None:
+                row = rows_by_id[fighter_id] = len(ids)
+                ids.append(fighter_id)
+                for column in (names, nicknames, image_urls, sort_names):
+                    column.append("")
+
+            names[row] = fighter.name
+            nicknames[row] = fighter.nickname
+            image_urls[row] = fighter.image_url
+            sort_names[row] = normalize_search_text(fighter.name)
+            for token in _tokens_for(fighter.name, fighter.nickname):
+                position = _token_position(tokens, token_rows, token, row)
+                tokens.insert(position, token)
+                token_rows.insert(position, row)
+
+        return _Snapshot(ids, names, nicknames, image_urls, sort_names, tokens, token_rows, rows_by_id)
+
+    def _matching_rows(self, snapshot: _Snapshot, prefix: str) -> set[int]:
+        start = bisect.bisect_left(snapshot.tokens, prefix)
+        end = bisect.bisect_left(snapshot.tokens, prefix + "\uffff", lo=start)
+        return set(snapshot.token_rows[start:end])
+
+    def search_ids(self, q: str) -> list[int]:
+        """Return the ids of every fighter matching *q*, ordered by name."""
+        snapshot = self._snapshot
+        rows = self._rows_for_query(snapshot, q)
+        return [snapshot.ids[row] for row in sorted(rows, key=lambda row: (snapshot.sort_names[row], snapshot.ids[row]))]
+
+    def suggest(self, q: str, limit: int) -> list[FighterSuggestionRow]:
+        """
+        Return the top *limit* fighters for *q*. Every query word must prefix a name or nickname token;
+        fighters whose name starts with the query rank first, then alphabetical order.
+        """
+        snapshot = self._snapshot
+        query_text = normalize_search_text(q)
+        rows = self._rows_for_query(snapshot, query_text)
+
+        best = heapq.nsmallest(
+            limit,
+            rows,
+            key=lambda row: (not snapshot.sort_names[row].startswith(query_text), snapshot.sort_names[row], snapshot.ids[row]),
+        )
+        return [
+            FighterSuggestionRow(snapshot.ids[row], snapshot.names[row], snapshot.nicknames[row], snapshot.image_urls[row])
+            for row in best
+        ]
+
+    def _rows_for_query(self, snapshot: _Snapshot, q: str) -> set[int]:
+        words = normalize_search_text(q).split()
+        if not words:
+            return set()
+        rows = self._matching_rows(snapshot, words[0])
+        for word in words[1:]:
+            if not rows:
+                break
+            rows &= self._matching_rows(snapshot, word)
+        return rows
+
+fighter_typeahead_index = FighterTypeaheadIndex()
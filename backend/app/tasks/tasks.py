@@ -1,15 +1,25 @@
 from app.common.celery import celery_app
 from app.db.database import sessionLocal
 from app.services.importers.events import EventsImporter
+from app.services.importers.event_reconciler import EventReconciler
 from app.services.importers.fighters import FightersImporter
 from app.services.importers.fights import FightsImporter
 from app.services.importers.rankings import RankingsImporter
+from app.services.scoring.prediction_scorer import PredictionScorer
 from app.schemas.sherdog_schemas import Event as EventSchema, Fight as FightSchema, Fighter as FighterSchema
+from app.services.scrapers.ufc_event_datetime_scraper import UFCEventDatetimeScraper, FIRST_UFC_YEAR
 from app.services.scrapers.ufc_ranking_scraper import UFCRankingScraper
 from app.services.scrapers.ufc_sherdog_scraper import UFCSherdogScraper
+from app.core.sync_registry import sync_run_registry
+from app.services.crawl.planner import CrawlPlanner
 from celery import group, chord
 from contextlib import contextmanager
 from datetime import datetime, timezone, timedelta
+import os
+
+# "card": fighters are scraped in parallel and one import_event_card task writes the whole card.
+# "per_fight": the original layout with one upsert_fight task (and transaction) per bout.
+FIGHT_IMPORT_MODE = os.getenv("FIGHT_IMPORT_MODE", "card").lower()
 
 
 @contextmanager
@@ -24,11 +34,20 @@ def session_scope():
     finally:
         db.close()
 
+def _due_events(upcoming_events: list[EventSchema], previous_events: list[EventSchema]):
+    """Drop the events whose last crawl is still fresh. Returns (upcoming, previous, num_skipped)."""
+    with session_scope() as db:
+        planner = CrawlPlanner(db)
+        due_upcoming = planner.due_events(upcoming_events, is_upcoming=True)
+        due_previous = planner.due_events(previous_events, is_upcoming=False)
+    num_skipped = len(upcoming_events) + len(previous_events) - len(due_upcoming) - len(due_previous)
+    return due_upcoming, due_previous, num_skipped
+
 @celery_app.task(bind=True, name="sync_all_ufc_events")
-def sync_all_ufc_events(self):
+def sync_all_ufc_events(self, force: bool = False):
     """
     Fetches and imports all UFC events (both upcoming and previous).
-    Schedules import tasks for each event.
+    Schedules import tasks for each event that is due for a re-crawl, or for every event with force=True.
     """
     scraper = UFCSherdogScraper()
 
@@ -38,58 +57,64 @@ def sync_all_ufc_events(self):
     seen_upcoming_urls: set[str] = {e.url for e in upcoming_events}
     previous_events = [e for e in previous_events if e.url not in seen_upcoming_urls]
 
+    num_skipped = 0
+    if not force:
+        upcoming_events, previous_events, num_skipped = _due_events(upcoming_events, previous_events)
+
     jobs = []
     for event in upcoming_events:
-        jobs.append(import_event.s(event.model_dump(mode="json"), is_upcoming=True).set(queue="db"))
+        jobs.append(import_event.s(event.model_dump(mode="json"), is_upcoming=True, run_id=self.request.id, force=force).set(queue="db"))
     for event in previous_events:
-        jobs.append(import_event.s(event.model_dump(mode="json"), is_upcoming=False).set(queue="db"))
+        jobs.append(import_event.s(event.model_dump(mode="json"), is_upcoming=False, run_id=self.request.id, force=force).set(queue="db"))
 
     if not jobs:
-        return {"status": "no_events"}
+        return {"status": "no_events", "num_skipped": num_skipped}
 
     chord_result = chord(jobs)(import_rankings.s().set(queue="db", countdown=60))
-    print(f"Scheduled {len(jobs)} event import tasks with delayed chord rankings import")
+    print(f"Scheduled {len(jobs)} event import tasks ({num_skipped} still fresh) with delayed chord rankings import")
 
-    return {"status": "scheduled", "num_events": len(jobs), "job_id": chord_result.id}
+    return {"status": "scheduled", "num_events": len(jobs), "num_skipped": num_skipped, "job_id": chord_result.id}
 
 @celery_app.task(bind=True, name="sync_recent_ufc_events")
 def sync_recent_ufc_events(self):
     """
     Syncs upcoming events and previous events from the past 30 days only.
+    Pagination of the previous events stops once it passes the window, and events whose
+    last crawl is still fresh are skipped.
     """
     scraper = UFCSherdogScraper()
         
-    previous_events: list[EventSchema] = scraper.get_previous_ufc_events()
+    recent_previous_events: list[EventSchema] = list(scraper.iter_previous_ufc_events(
+        since=datetime.now(timezone.utc) - timedelta(days=30)
+    ))
     upcoming_events: list[EventSchema] = scraper.get_upcoming_ufc_events()
     
-    recent_previous_events = [
-        event for event in previous_events 
-        if event.date.replace(tzinfo=timezone.utc) >= datetime.now(timezone.utc)-timedelta(days=30)
-    ]
-    
     seen_upcoming_urls: set[str] = {e.url for e in upcoming_events}
     recent_previous_events = [e for e in recent_previous_events if e.url not in seen_upcoming_urls]
+    upcoming_events, recent_previous_events, num_skipped = _due_events(upcoming_events, recent_previous_events)
 
     jobs = []
     for event in upcoming_events:
-        jobs.append(import_event.s(event.model_dump(mode="json"), is_upcoming=True).set(queue="db"))
+        jobs.append(import_event.s(event.model_dump(mode="json"), is_upcoming=True, run_id=self.request.id).set(queue="db"))
     for event in recent_previous_events:
-        jobs.append(import_event.s(event.model_dump(mode="json"), is_upcoming=False).set(queue="db"))
+        jobs.append(import_event.s(event.model_dump(mode="json"), is_upcoming=False, run_id=self.request.id).set(queue="db"))
     
     if not jobs:
-        print("No recent events found to import")
-        return {"status": "no_events"}
+        print(f"No recent events due for import ({num_skipped} still fresh)")
+        return {"status": "no_events", "num_skipped": num_skipped}
 
     chord_result = chord(jobs)(import_rankings.s().set(queue="db", countdown=60))
-    print(f"Scheduled {len(jobs)} recent event import tasks with delayed chord rankings import")
+    print(f"Scheduled {len(jobs)} recent event import tasks ({num_skipped} still fresh) with delayed chord rankings import")
     
-    return {"status": "scheduled", "num_events": len(jobs), "job_id": chord_result.id}
+    return {"status": "scheduled", "num_events": len(jobs), "num_skipped": num_skipped, "job_id": chord_result.id}
 
 @celery_app.task(bind=True, name="import_event")
-def import_event(self, event: dict, is_upcoming: bool):
+def import_event(self, event: dict, is_upcoming: bool, run_id: str | None = None, force: bool = False):
     """
     Upsert the event.
     Delegate scraping of the event's fights to the scrape queue.
+    run_id identifies the sync run, so fighters shared between its events are scraped once;
+    force re-scrapes every fighter on the card, fresh or not.
     """
     with session_scope() as db:
         try:
@@ -97,18 +122,19 @@ def import_event(self, event: dict, is_upcoming: bool):
             event_importer = EventsImporter(db)
             event_importer.upsert(EventSchema(**event))
             db.commit()
-            scrape_event_fights.s(event, is_upcoming).set(queue="scrape").delay()
+            scrape_event_fights.s(event, is_upcoming, run_id, force=force).set(queue="scrape").delay()
 
-            return {"event_url": event["url"], "dispatched_scrape": True}
+            return {"event_url": event["url"], "dispatched_scrape": True, "counts": event_importer.counts}
         except Exception as exc:
             print(f"Error importing event: {event['title']}")
             raise self.retry(exc=exc, countdown=min(60 * 2 ** self.request.retries, 3600))
 
 @celery_app.task(bind=True, name="scrape_event_fights", max_retries=3, ignore_result=True)
-def scrape_event_fights(self, event: dict, is_upcoming: bool):
+def scrape_event_fights(self, event: dict, is_upcoming: bool, run_id: str | None = None, force: bool = False):
     """
     Scrape fights for an event (I/O-bound) and schedule fighter imports (scrape)
-    and fight upserts (db) using a chord.
+    and fight upserts (db) using a chord. Fighters whose last crawl is still fresh are
+    skipped unless force is set.
     """
     scraper = UFCSherdogScraper()
     try:
@@ -128,54 +154,153 @@ def scrape_event_fights(self, event: dict, is_upcoming: bool):
             if f.fighter_2_url:
                 unique_fighter_urls.add(f.fighter_2_url)
 
-        header = group(
-            import_fighter.s(url).set(queue="scrape") for url in unique_fighter_urls
-        )
-        body = group(
-            upsert_fight.s(f.model_dump(mode="json")).set(queue="db") for f in fights
-        )
+        # Fresh fighters are already stored, so the card can link them without a re-scrape.
+        # The event is only marked as crawled by the db tasks, together with its fights:
+        # a card whose import fails (or an event that came back empty) is crawled again next run.
+        num_known_fighters = len(unique_fighter_urls)
+        if not force:
+            with session_scope() as db:
+                unique_fighter_urls = CrawlPlanner(db).due_fighters(list(unique_fighter_urls))
+
+        if FIGHT_IMPORT_MODE == "per_fight":
+            header = group(
+                import_fighter.s(url, run_id).set(queue="scrape") for url in unique_fighter_urls
+            )
+            body = group(
+                upsert_fight.s(f.model_dump(mode="json"), event, is_upcoming).set(queue="db") for f in fights
+            )
+            num_db_tasks = len(fights)
+        else:
+            header = group(
+                scrape_fighter.s(url, run_id).set(queue="scrape") for url in unique_fighter_urls
+            )
+            body = import_event_card.s([f.model_dump(mode="json") for f in fights], event, is_upcoming).set(queue="db")
+            num_db_tasks = 1
         chord(header)(body)
         print(
-            f"Scheduled {len(unique_fighter_urls)} fighter imports and {len(fights)} fight upserts for event: {event.get('title')}"
+            f"Scheduled {len(unique_fighter_urls)} fighter tasks ({num_known_fighters - len(unique_fighter_urls)} still fresh) "
+            f"and {num_db_tasks} db tasks for {len(fights)} fights of event: {event.get('title')}"
         )
 
-        return {"event_url": event["url"], "num_fighters": len(unique_fighter_urls), "num_fights": len(fights)}
+        return {
+            "event_url": event["url"],
+            "mode": FIGHT_IMPORT_MODE,
+            "num_fighters": len(unique_fighter_urls),
+            "num_fresh_fighters": num_known_fighters - len(unique_fighter_urls),
+            "num_fights": len(fights),
+            "num_tasks": len(unique_fighter_urls) + num_db_tasks,
+        }
     except Exception as exc:
         print(f"Failed to scrape fights for event: {event.get('title')}")
         raise self.retry(exc=exc, countdown=min(60 * 2 ** self.request.retries, 3600))
 
 @celery_app.task(bind=True, name="import_fighter", max_retries=3)
-def import_fighter(self, fighter_url: str):
+def import_fighter(self, fighter_url: str, run_id: str | None = None):
     """
     Scrape fighter stats and upsert the fighter.
+    Within a sync run the fighter is only imported by the first task that gets to it.
     Returns a small dict that identifies the fighter.
     """
+    registry = sync_run_registry(run_id)
+    if registry and registry.acquire(fighter_url) is not None:
+        print(f"Fighter already imported in this sync run: {fighter_url}")
+        return {"fighter_url": fighter_url}
+
     scraper = UFCSherdogScraper()
-    with session_scope() as db:
-        try:
+    try:
+        with session_scope() as db:
             print(f"Importing fighter: {fighter_url}")
             fighter = scraper.get_fighter_stats(fighter_url)
             fighter_importer = FightersImporter(db)
             fighter_importer.upsert(fighter)
+            db.flush()
+            CrawlPlanner(db).mark_fighters([fighter_url])
+        if registry:
+            # Only publish once committed, so the waiting chords see the fighter row
+            registry.store(fighter_url, fighter.model_dump(mode="json"))
+
+        return {"fighter_url": fighter_url, "counts": fighter_importer.counts}
+    except Exception as exc:
+        if registry:
+            registry.release(fighter_url)
+        print(f"Failed to import fighter: {fighter_url}")
+        raise self.retry(exc=exc, countdown=min(60 * 2 ** self.request.retries, 3600))
+
+@celery_app.task(bind=True, name="scrape_fighter", max_retries=3)
+def scrape_fighter(self, fighter_url: str, run_id: str | None = None):
+    """
+    Scrape fighter stats without touching the database.
+    Within a sync run each fighter page is fetched once and the result is shared between cards.
+    Returns the serialised fighter for import_event_card.
+    """
+    registry = sync_run_registry(run_id)
+    if registry:
+        fighter = registry.acquire(fighter_url)
+        if fighter is not None:
+            print(f"Reusing fighter scraped in this sync run: {fighter_url}")
+            return fighter
+
+    scraper = UFCSherdogScraper()
+    try:
+        print(f"Scraping fighter: {fighter_url}")
+        fighter = scraper.get_fighter_stats(fighter_url).model_dump(mode="json")
+        if registry:
+            registry.store(fighter_url, fighter)
+        return fighter
+    except Exception as exc:
+        if registry:
+            registry.release(fighter_url)
+        print(f"Failed to scrape fighter: {fighter_url}")
+        raise self.retry(exc=exc, countdown=min(60 * 2 ** self.request.retries, 3600))
+
+@celery_app.task(bind=True, name="import_event_card", max_retries=3, ignore_result=True)
+def import_event_card(self, fighter_results: list[dict], fights: list[dict], event: dict | None = None, is_upcoming: bool = False):
+    """
+    Chord callback for a scraped card: upsert all fighters and all fights in one transaction.
+    fighter_results is the list of return values from the scrape_fighter tasks.
+    The event, when given, is marked as crawled in the same transaction.
+    """
+    with session_scope() as db:
+        try:
+            event_url = fights[0].get("event_url") if fights else None
+            print(f"Importing card: {event_url} ({len(fighter_results)} fighters, {len(fights)} fights)")
+            fighters_importer = FightersImporter(db)
+            fighters_importer.upsert_many([FighterSchema(**fighter) for fighter in fighter_results])
+            fights_importer = FightsImporter(db)
+            fights_importer.upsert_card([FightSchema(**fight) for fight in fights])
+            planner = CrawlPlanner(db)
+            planner.mark_fighters([fighter["url"] for fighter in fighter_results])
+            if event:
+                planner.mark_events([EventSchema(**event)], is_upcoming)
+            print(f"Imported card: {event_url} (fighters {fighters_importer.counts}, fights {fights_importer.counts})")
 
-            return {"fighter_url": fighter_url}
+            return {
+                "event_url": event_url,
+                "num_fighters": len(fighter_results),
+                "num_fights": len(fights),
+                "fighters": fighters_importer.counts,
+                "fights": fights_importer.counts,
+            }
         except Exception as exc:
-            print(f"Failed to import fighter: {fighter_url}")
-            raise self.retry(exc=exc, countdown=min(60 * 2 ** self.request.retries, 3600))
+            print(f"Failed to import card: {event_url}")
+            raise self.retry(exc=exc, countdown=min(30 * 2 ** self.request.retries, 600))
 
 @celery_app.task(bind=True, name="upsert_fight", max_retries=3, ignore_result=True)
-def upsert_fight(self, fighter_results: list[dict], fight: dict):
+def upsert_fight(self, fighter_results: list[dict], fight: dict, event: dict | None = None, is_upcoming: bool = False):
     """
     After the fighters have been imported, upsert the fight itself.
     fighter_results is a list of the return values from import_fighter tasks (in order).
+    The event, when given, is marked as crawled in the same transaction.
     """
     with session_scope() as db:
         try:
             print(f"Upserting fight: {fight.get('fighter_1_url')} vs {fight.get('fighter_2_url')}")
             fight_importer = FightsImporter(db)
             fight_importer.upsert(FightSchema(**fight))
+            if event:
+                CrawlPlanner(db).mark_events([EventSchema(**event)], is_upcoming)
 
-            return {"fight_url": fight.get("url")}
+            return {"fight_url": fight.get("url"), "counts": fight_importer.counts}
         except Exception as exc:
             print(f"Failed to upsert fight: {fight.get('fighter_1_url')} vs {fight.get('fighter_2_url')}")
             raise self.retry(exc=exc, countdown=min(30 * 2 ** self.request.retries, 600))
@@ -213,4 +338,40 @@ def import_rankings(self, *args, **kwargs):
             return {"status": "ok"}
         except Exception as exc:
             print(f"❌ Failed to import rankings: {exc}")
+            raise self.retry(exc=exc, countdown=min(60 * 2 ** self.request.retries, 3600))
+
+@celery_app.task(bind=True, name="import_event_datetimes", max_retries=3, ignore_result=True)
+def import_event_datetimes(self, start_year: int = FIRST_UFC_YEAR, end_year: int | None = None):
+    """
+    Correct event start times from the ESPN schedule.
+    Past years come from the permanent HTTP cache once fetched after they ended, so repeat runs only fetch the current and next year.
+    """
+    with session_scope() as db:
+        try:
+            print("Starting event datetime import")
+            espn_events = UFCEventDatetimeScraper().get_all_events_datetimes(start_year, end_year)
+            counts = EventReconciler(db).reconcile(espn_events)
+            print(
+                f"Matched {counts['matched']} events, corrected {counts['updated']} start times, "
+                f"{counts['unmatched']} ESPN events unmatched"
+            )
+            return {"status": "ok", **counts}
+        except Exception as exc:
+            print(f"Failed to import event datetimes: {exc}")
+            raise self.retry(exc=exc, countdown=min(60 * 2 ** self.request.retries, 3600))
+
+@celery_app.task(bind=True, name="rescore_predictions", max_retries=3, ignore_result=True)
+def rescore_predictions(self):
+    """
+    Backfill: re-score every prediction against the stored fight results.
+    Run after changing the scoring rules, e.g. `celery -A app.common.celery:celery_app call rescore_predictions`.
+    """
+    with session_scope() as db:
+        try:
+            print("Re-scoring all predictions")
+            scored = PredictionScorer(db).rescore_all()
+            print(f"Re-scored {scored} predictions")
+            return {"status": "ok", "num_scored": scored}
+        except Exception as exc:
+            print(f"Failed to re-score predictions: {exc}")
             raise self.retry(exc=exc, countdown=min(60 * 2 ** self.request.retries, 3600))
\ No newline at end of file
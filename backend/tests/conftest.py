@@ -0,0 +1,10 @@
+import os
+import sys
+
+# Run from anywhere: make the backend's ``app`` package importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Database tests run against TEST_DATABASE_URL (a scratch database, never production);
+# it has to be in place before app.db.database creates its engine
+if os.getenv("TEST_DATABASE_URL"):
+    os.environ["DATABASE_URL"] = os.environ["TEST_DATABASE_URL"]
@@ -0,0 +1,103 @@
+"""
+Statement counts of the fight card route, against TEST_DATABASE_URL.
+
+Cards of different sizes are inserted in a transaction that is rolled back afterwards; loading
+any of them must take the same number of statements, i.e. no query per fight or fighter.
+"""
+import os
+from datetime import datetime, timezone
+import pytest
+
+if not os.getenv("TEST_DATABASE_URL"):
+    pytest.skip("TEST_DATABASE_URL is not set", allow_module_level=True)
+
+from sqlalchemy import event
+from starlette.requests import Request
+from app.db.database import engine, sessionLocal
+from app.db.models import models
+
+CARD_SIZES = (2, 14)
+
+@pytest.fixture
+def db():
+    # Importing the app creates the schema and applies the migrations, as on startup
+    from app.core.cache import response_cache
+    import app.main  # noqa: F401
+
+    # A cached card would be answered without any statement
+    response_cache.enabled = False
+    session = sessionLocal()
+    try:
+        yield session
+    finally:
+        session.rollback()
+        session.close()
+        response_cache.enabled = True
+
+def _seed_card(db, num_fights: int) -> int:
+    """Insert an event with *num_fights* bouts between fresh fighters; returns the event id."""
+    card = models.Event(
+        url=f"https://www.sherdog.com/events/fight-routes-test-{num_fights}",
+        title=f"UFC Card of {num_fights}",
+        date=datetime(2024, 4, 13, 22, tzinfo=timezone.utc),
+        location="Las Vegas, Nevada, United States",
+        organizer="UFC",
+    )
+    fighters = [
+        models.Fighter(
+            url=f"https://www.sherdog.com/fighter/fight-routes-test-{num_fights}-{i}",
+            name=f"Card {num_fights} Fighter {i}",
+            image_url="",
+            ranking="",
+            weight_class="Lightweight",
+            flag_code="us",
+        )
+        for i in range(2 * num_fights)
+    ]
+    db.add_all([card, *fighters])
+    db.flush()
+    db.add_all([
+        models.Fight(
+            event_id=card.id,
+            fighter_1_id=fighters[2 * i].id,
+            fighter_2_id=fighters[2 * i + 1].id,
+            match_number=i + 1,
+            weight_class="Lightweight",
+            winner="",
+            method="",
+            round=0,
+            time="",
+        )
+        for i in range(num_fights)
+    ])
+    db.flush()
+    # Loaded from the database by the route, not from the identity map
+    db.expire_all()
+    return card.id
+
+def _count_statements(db, event_id: int) -> tuple[int, int]:
+    """Load the card of *event_id* through the route; returns (statements, fights)."""
+    from app.api.fight_routes import get_fights_by_event
+
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    request = Request({"type": "http", "method": "GET", "path": f"/fights/event/{event_id}", "headers": []})
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        response = get_fights_by_event(event_id=event_id, request=request, db=db)
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+    assert response.status_code == 200
+    return len(statements), response.body.count(b'"fighter_1_id"')
+
+def test_card_statements_do_not_grow_with_card_size(db):
+    event_ids = [_seed_card(db, size) for size in CARD_SIZES]
+
+    counts = [_count_statements(db, event_id) for event_id in event_ids]
+
+    assert [num_fights for _, num_fights in counts] == list(CARD_SIZES)
+    small, large = (num_statements for num_statements, _ in counts)
+    assert small == large
@@ -0,0 +1,125 @@
+"""
+Fighter search at production scale, against TEST_DATABASE_URL.
+
+50k fighters are inserted in a transaction that is rolled back afterwards. Besides the paging
+checks, the benchmark compares the latency of FighterSearch with the four-column ILIKE scan it
+replaced; run with ``-s`` to see the table.
+"""
+import os
+import random
+import statistics
+import time
+import pytest
+
+if not os.getenv("TEST_DATABASE_URL"):
+    pytest.skip("TEST_DATABASE_URL is not set", allow_module_level=True)
+
+from sqlalchemy import insert, text
+from app.core.utils.flag_utils import resolve_flag_code
+from app.core.utils.string_utils import fighter_search_text
+from app.db.database import sessionLocal
+from app.db.models import models
+from app.services.search import fighter_search
+from app.services.search.fighter_search import FighterSearch
+from app.services.search.fighter_typeahead import FighterTypeaheadIndex
+
+NUM_FIGHTERS = 50_000
+BENCH_QUERIES = ["jo", "silva", "josé", "lightweight", "brazil", "mc gr", "zzzz"]
+SYLLABLES = ["jo", "se", "al", "do", "ma", "ri", "ko", "sa", "te", "lu", "no", "be", "mc", "gr", "ég", "or", "va", "sil"]
+WEIGHT_CLASSES = ["Flyweight", "Bantamweight", "Featherweight", "Lightweight", "Welterweight", "Middleweight", "Heavyweight"]
+COUNTRIES = ["Brazil", "United States", "Ireland", "Russia", "Mexico", "Poland", "Japan", "Georgia"]
+
+def _word(rng: random.Random) -> str:
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(1, 3))).title()
+
+@pytest.fixture(scope="module")
+def db():
+    # Importing the app creates the schema and applies the migrations, as on startup
+    import app.main  # noqa: F401
+
+    rng = random.Random(7)
+    session = sessionLocal()
+    rows = []
+    seen = set()
+    for i in range(NUM_FIGHTERS):
+        name, weight_class = f"{_word(rng)} {_word(rng)}", rng.choice(WEIGHT_CLASSES)
+        while (name, weight_class) in seen:
+            # Fighters are unique per name and weight class
+            name = f"{name} {_word(rng)}"
+        seen.add((name, weight_class))
+        nickname = _word(rng) if rng.random() < 0.4 else ""
+        country = rng.choice(COUNTRIES)
+        rows.append({
+            "url": f"https://www.sherdog.com/fighter/search-bench-{i}",
+            "name": name,
+            "nickname": nickname,
+            "weight_class": weight_class,
+            "country": country,
+            "search_text": fighter_search_text(name, nickname, weight_class, country),
+            "flag_code": resolve_flag_code(country),
+        })
+    for start in range(0, len(rows), 5000):
+        session.execute(insert(models.Fighter), rows[start:start + 5000])
+    session.execute(text("ANALYZE fighters"))
+    try:
+        yield session
+    finally:
+        session.rollback()
+        session.close()
+
+@pytest.fixture(scope="module")
+def typeahead_index(db):
+    index = FighterTypeaheadIndex()
+    index.build(db)
+    return index
+
+@pytest.fixture(autouse=True)
+def use_typeahead_index(typeahead_index, monkeypatch):
+    monkeypatch.setattr(fighter_search, "fighter_typeahead_index", typeahead_index)
+
+@pytest.mark.parametrize("q", ["silva", "jo"])
+def test_total_is_kept_past_the_last_page(db, q):
+    fighters, total = FighterSearch(db).search(q, 0, 20)
+    assert fighters and total >= len(fighters)
+
+    assert FighterSearch(db).search(q, total + 100, 20) == ([], total)
+
+def test_no_matches_has_zero_total(db):
+    assert FighterSearch(db).search("zzzz", 0, 20) == ([], 0)
+    assert FighterSearch(db).search("zzzz", 40, 20) == ([], 0)
+
+def _legacy_search(db, q: str) -> list[int]:
+    """The search this replaced: every fighter matching any of four ILIKE scans, unpaged."""
+    pattern = f"%{q.lower()}%"
+    return [
+        fighter.id
+        for fighter in db.query(models.Fighter).filter(
+            models.Fighter.name.ilike(pattern)
+            | models.Fighter.nickname.ilike(pattern)
+            | models.Fighter.weight_class.ilike(pattern)
+            | models.Fighter.country.ilike(pattern)
+        )
+    ]
+
+def _median_ms(function, repeat: int = 5) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+def test_search_latency_at_50k_fighters(db):
+    print(f"\n{'query':<14} {'legacy ms':>10} {'legacy rows':>12} {'search ms':>10} {'total':>7}")
+    for q in BENCH_QUERIES:
+        legacy_ids = _legacy_search(db, q)
+        fighters, total = FighterSearch(db).search(q, 0, 20)
+        if len(q) >= fighter_search.MIN_TRIGRAM_QUERY_LENGTH:
+            # search_text covers the same four columns, accent- and case-folded; shorter
+            # queries only prefix-match name and nickname words in the typeahead index
+            assert total >= len(legacy_ids)
+        assert len(fighters) == min(total, 20)
+
+        legacy_ms = _median_ms(lambda: _legacy_search(db, q))
+        search_ms = _median_ms(lambda: FighterSearch(db).search(q, 0, 20))
+        print(f"{q:<14} {legacy_ms:>10.1f} {len(legacy_ids):>12} {search_ms:>10.1f} {total:>7}")
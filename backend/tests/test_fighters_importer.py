@@ -0,0 +1,134 @@
+"""
+FightersImporter.upsert_many against TEST_DATABASE_URL.
+
+Every test runs in a transaction that is rolled back afterwards. Besides the takeover, duplicate
+and unchanged-row paths, the benchmark imports 10k fighters with upsert_many and with one upsert
+per fighter; run with ``-s`` to see the table.
+"""
+import os
+import time
+import pytest
+
+if not os.getenv("TEST_DATABASE_URL"):
+    pytest.skip("TEST_DATABASE_URL is not set", allow_module_level=True)
+
+from app.db.database import sessionLocal
+from app.db.models import models
+from app.schemas.sherdog_schemas import Fighter as FighterSchema
+from app.services.importers.fighters import FightersImporter
+
+BENCH_FIGHTERS = 10_000
+
+@pytest.fixture
+def db():
+    # Importing the app creates the schema and applies the migrations, as on startup
+    import app.main  # noqa: F401
+
+    session = sessionLocal()
+    try:
+        yield session
+    finally:
+        session.rollback()
+        session.close()
+
+def _fighter(key: str, name: str | None = None, weight_class: str = "Lightweight", **fields) -> FighterSchema:
+    values = {
+        "url": f"https://www.sherdog.com/fighter/importer-test-{key}",
+        "name": name or f"Importer Test {key}",
+        "nickname": "",
+        "image_url": "",
+        "record": "10-2-0",
+        "ranking": "",
+        "country": "Brazil",
+        "city": "",
+        "dob": None,
+        "height": "",
+        "weight_class": weight_class,
+        "association": "",
+    }
+    values.update(fields)
+    return FighterSchema(**values)
+
+def _stored(db, ids) -> list[tuple]:
+    return (
+        db.query(models.Fighter.id, models.Fighter.url, models.Fighter.name, models.Fighter.nickname)
+        .filter(models.Fighter.id.in_(ids))
+        .order_by(models.Fighter.id)
+        .all()
+    )
+
+def test_new_url_takes_over_the_name_and_weight_class_row(db):
+    old = _fighter("old-url", name="Importer Takeover")
+    old_id = FightersImporter(db).upsert_many([old])[old.url]
+
+    moved = _fighter("new-url", name="Importer Takeover", nickname="Moved")
+    importer = FightersImporter(db)
+    ids = importer.upsert_many([moved])
+
+    assert ids == {moved.url: old_id}
+    assert importer.counts == {"inserted": 0, "updated": 1, "unchanged": 0}
+    assert _stored(db, [old_id]) == [(old_id, moved.url, "Importer Takeover", "Moved")]
+    assert db.query(models.Fighter).filter_by(url=old.url).count() == 0
+
+def test_duplicates_within_one_chunk_keep_the_last_fighter(db):
+    first = _fighter("duplicate", nickname="First")
+    last = _fighter("duplicate", nickname="Last")
+    renamed = _fighter("renamed-before", name="Importer Renamed")
+    renamed_again = _fighter("renamed-after", name="Importer Renamed", nickname="Again")
+
+    importer = FightersImporter(db)
+    ids = importer.upsert_many([first, renamed, last, renamed_again])
+
+    # Both URLs of the name/weight-class duplicate resolve to the row the later one wrote
+    assert ids[renamed.url] == ids[renamed_again.url]
+    assert importer.counts == {"inserted": 2, "updated": 0, "unchanged": 0}
+    assert _stored(db, ids.values()) == [
+        (ids[last.url], last.url, last.name, "Last"),
+        (ids[renamed_again.url], renamed_again.url, "Importer Renamed", "Again"),
+    ]
+
+def test_unchanged_fighters_are_not_written(db):
+    fighters = [_fighter(f"unchanged-{i}") for i in range(3)]
+    ids = FightersImporter(db).upsert_many(fighters)
+    written_at = dict(db.query(models.Fighter.id, models.Fighter.last_updated_at).filter(models.Fighter.id.in_(ids.values())))
+
+    changed = _fighter("unchanged-1", nickname="Changed")
+    importer = FightersImporter(db)
+    assert importer.upsert_many([fighters[0], changed, fighters[2]]) == ids
+    assert importer.counts == {"inserted": 0, "updated": 1, "unchanged": 2}
+
+    rewritten = {
+        fighter_id
+        for fighter_id, last_updated_at in db.query(models.Fighter.id, models.Fighter.last_updated_at)
+        .filter(models.Fighter.id.in_(ids.values()))
+        if last_updated_at != written_at[fighter_id]
+    }
+    assert rewritten == {ids[changed.url]}
+
+def _timed(function) -> float:
+    started = time.perf_counter()
+    function()
+    return time.perf_counter() - started
+
+def test_upsert_many_benchmark_at_10k_fighters(db):
+    batches = {
+        mode: [_fighter(f"bench-{mode}-{i}", weight_class="Welterweight") for i in range(BENCH_FIGHTERS)]
+        for mode in ("upsert_many", "upsert")
+    }
+
+    def per_row(fighters):
+        importer = FightersImporter(db)
+        for fighter in fighters:
+            importer.upsert(fighter)
+        db.flush()
+
+    print(f"\n{'pass':<10} {'upsert_many s':>14} {'per-row upsert s':>17}")
+    for label in ("insert", "unchanged"):
+        bulk_s = _timed(lambda: FightersImporter(db).upsert_many(batches["upsert_many"]))
+        row_s = _timed(lambda: per_row(batches["upsert"]))
+        print(f"{label:<10} {bulk_s:>14.2f} {row_s:>17.2f}")
+
+    # Both paths store the same fighters
+    for mode, fighters in batches.items():
+        stored = db.query(models.Fighter.url).filter(models.Fighter.url.like(f"%importer-test-bench-{mode}-%")).count()
+        assert stored == BENCH_FIGHTERS
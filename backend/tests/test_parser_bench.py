@@ -0,0 +1,26 @@
+"""
+Replays the committed scraper fixture corpus through parser_bench.
+
+The pages in fixtures/scraper_pages are small hand-trimmed copies of each page kind, recorded
+with ``parser_bench.add_page``; after an intended parser change, re-snapshot them with
+
+    python -m app.services.scrapers.parser_bench --corpus tests/fixtures/scraper_pages run --update
+"""
+import os
+import pytest
+from app.services.scrapers import html_parser
+from app.services.scrapers.parser_bench import PAGE_KINDS, run
+
+CORPUS = os.path.join(os.path.dirname(__file__), "fixtures", "scraper_pages")
+
+def test_corpus_covers_every_page_kind():
+    assert {row["kind"] for row in run(CORPUS, repeat=1)} == set(PAGE_KINDS)
+
+# The lxml fast paths must give the same output as the BeautifulSoup fallback
+@pytest.mark.parametrize("parser", ["lxml", "html.parser"])
+def test_parsed_output_matches_snapshot(parser, monkeypatch):
+    monkeypatch.setattr(html_parser, "HTML_PARSER", parser)
+    results = run(CORPUS, repeat=1)
+
+    assert results
+    assert [row["name"] for row in results if not row["ok"]] == []
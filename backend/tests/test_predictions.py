@@ -0,0 +1,86 @@
+"""
+Keyset pagination of a user's prediction history, against TEST_DATABASE_URL.
+
+The card and predictions are inserted in a transaction that is rolled back afterwards.
+"""
+import asyncio
+import os
+from datetime import datetime, timezone
+import pytest
+
+if not os.getenv("TEST_DATABASE_URL"):
+    pytest.skip("TEST_DATABASE_URL is not set", allow_module_level=True)
+
+from fastapi import HTTPException
+from app.db.database import sessionLocal
+from app.db.models import models
+
+NUM_FIGHTS = 5
+
+@pytest.fixture
+def db():
+    # Importing the app creates the schema and applies the migrations, as on startup
+    import app.main  # noqa: F401
+
+    session = sessionLocal()
+    try:
+        yield session
+    finally:
+        session.rollback()
+        session.close()
+
+@pytest.fixture
+def user_id(db):
+    user = models.User(username="prediction-pagination-test", hashed_password="!")
+    event = models.Event(
+        url="https://www.sherdog.com/events/prediction-pagination-test",
+        title="UFC Pagination",
+        date=datetime(2024, 4, 13, 22, tzinfo=timezone.utc),
+        location="Las Vegas, Nevada, United States",
+        organizer="UFC",
+    )
+    fighters = [
+        models.Fighter(url=f"https://www.sherdog.com/fighter/prediction-pagination-{i}", name=f"Pagination {i}", weight_class="Lightweight")
+        for i in range(2 * NUM_FIGHTS)
+    ]
+    db.add_all([user, event, *fighters])
+    db.flush()
+    for match_number in range(1, NUM_FIGHTS + 1):
+        fighter_1, fighter_2 = fighters[2 * match_number - 2], fighters[2 * match_number - 1]
+        fight = models.Fight(
+            event_id=event.id,
+            fighter_1_id=fighter_1.id,
+            fighter_2_id=fighter_2.id,
+            match_number=match_number,
+            weight_class="Lightweight",
+        )
+        db.add(fight)
+        db.flush()
+        db.add(models.Prediction(user_id=user.id, fight_id=fight.id, fighter_id=fighter_1.id, method="KO", round=1))
+    db.flush()
+    return user.id
+
+def _get_all(db, user_id: int, after_id: int | None = None, limit: int | None = None):
+    from app.api.predict_routes import get_all_predictions
+
+    return asyncio.run(get_all_predictions(user_id=user_id, db=db, after_id=after_id, limit=limit))
+
+def test_pages_cover_every_prediction_once(db, user_id):
+    everything = [prediction.id for prediction in _get_all(db, user_id)]
+    assert len(everything) == NUM_FIGHTS
+
+    paged, after_id = [], None
+    while page := _get_all(db, user_id, after_id, limit=2):
+        paged.extend(prediction.id for prediction in page)
+        after_id = page[-1].id
+    assert paged == everything
+
+def test_page_past_the_end_is_empty(db, user_id):
+    last_id = _get_all(db, user_id)[-1].id
+
+    assert _get_all(db, user_id, after_id=last_id, limit=2) == []
+
+def test_user_without_predictions_is_not_found(db):
+    with pytest.raises(HTTPException) as error:
+        _get_all(db, -1)
+    assert error.value.status_code == 404
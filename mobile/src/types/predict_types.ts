@@ -22,9 +22,11 @@ export interface PredictionResult {
     fighter: boolean;
     method: boolean;
     round: boolean;
+    points: number;
 }
 
 export interface PredictionOutPredict {
+    id: number;
     event_title: string;
     event_date: Date;
     fighter_1_name: string;